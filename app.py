@@ -1,25 +1,29 @@
-import pytesseract
-import pyautogui
 import os
 import logging
-import cv2
 import random
 import json
 import time
-
-import numpy as np
+import threading
 
 from glob import glob
+from bisect import bisect_right
+from itertools import accumulate
+from collections import Counter
 from uuid import uuid4
 from datetime import datetime
-from requests import HTTPError
 
 from configurable import Configurable
-from overlay import Overlay
+from capture_planner import CapturePlanner
+from read_pipeline import ReadPipeline
+from frame_source import LiveSource
+from reader import Reader, PyTesseractEngine
+from screen_classifier import ScreenClassifier
+from settle_detector import SettleDetector
+from slice import Slice
+from state_machine import StateMachine
+from submission_outbox import SubmissionOutbox
+from data_store import DataStore
 from lobby_reader import LobbyReader
-from loot_reader import LootReader
-from bounty_reader import BountyReader
-from data_sender import DataSender
 
 '''
 Primary application class, with all necessary components
@@ -45,17 +49,35 @@ class App(Configurable):
     LOG_PATH = './logging/log/'
     ERR_PATH = './logging/err/'
     IMG_PATH = './logging/img/'
+    DAT_PATH = './logging/data/'
 
     # max exceptions before abandoning the reading
     MAX_EXC = 5
 
+    # ticks without the bounty draft on screen after which the draft is considered left
+    DRFT_MISS = 10
+
     # time variables
     LOOP_INTER = 0.2
-    BNTY_INTER = 1.5
-    LBBY_INTER = 0.25
-    LOOT_INTER = 0.5
 
-    def __init__(self):
+    # regions watched for the end of the initial animation before reading, per kind of read:
+    # screen they are on, path to their slices, slice codes, stable frames needed and timeout in seconds
+    SETL_SPEC = {
+        'lobby': ('lobby', './data/json/screen/lobby', ['behemoth', 'threat', 'escalation'], 1, 1.0),
+        'loot': ('loot', './data/json/screen/loot', ['base_drops', 'bonus_drops'], 2, 2.0),
+        'bounty': ('draft', './data/json/screen/bounty', ['value'], 2, 3.0)
+    }
+
+    # components not needed for the first frame, with the methods creating them
+    # they are created on first use, or warmed up in the background after startup
+    LAZY_PART = {
+        'loot_reader': '_makeLootReader',
+        'bounty_reader': '_makeBountyReader',
+        'data_sender': '_makeDataSender',
+        'drop_stats': '_makeDropStats'
+    }
+
+    def __init__(self, source=None, patch=None):
         
         # PREPARE LOGGING FIRST TO ENSURE
         # THE ABILITY TO OUTPUT ERROR LOGS
@@ -72,32 +94,41 @@ class App(Configurable):
             # call parent class constructor
             Configurable.__init__(self, self.SLF_PATH)
 
-            # initialise overlay
-            self.overlay = Overlay(f'{self.PRG_NAME.upper()} {self.PRG_VERS}')
-            
-            # point pytesseract at tesseract installation
-            self._setPyTesseract()
+            # initialise the source of frames, live screen by default
+            self.source = LiveSource() if source is None else source
 
-            # initialise a lobby reader
-            self.lobby_reader = LobbyReader()
+            # initialise overlay over the live game
+            self.overlay = self._setOverlay()
 
-            # initialise a loot reader
-            self.loot_reader = LootReader()
+            # point the OCR engine at tesseract installation
+            self.ocr_engine = self._setOcrEngine()
 
-            # initialise a bounty reader
-            self.bounty_reader = BountyReader()
+            # initialise a screen classifier
+            self.classifier = ScreenClassifier()
+
+            # initialise a lobby reader
+            self.lobby_reader = LobbyReader()
 
-            # initialise a data sender
-            self.data_sender = DataSender()
+            # loot reader, bounty reader, data sender and drop statistics are created on first use
+            self.lazy_parts = {}
+            self.lazy_locks = {name: threading.Lock() for name in self.LAZY_PART}
 
             # read user from config file
             self.user = self._setUser()
 
-            # read game patch
-            self.patch = self._setGamePatch()
+            # read game patch, unless given
+            self.patch = self._setGamePatch() if patch is None else patch
 
-            # initialise screen capture as empty
-            self.screen_capture = None
+            # initialise the planner of partial screen captures
+            self.capture_planner = CapturePlanner(self.source)
+
+            # initialise captured frame as empty
+            self.frame = None
+            self.frame_id = 0
+            self.capture_full = False
+
+            # state of the application flow, which also schedules the polls
+            self.state_machine = StateMachine()
 
             # data holders
             self.bounty_data = {}
@@ -107,9 +138,30 @@ class App(Configurable):
             # exception counter for repeated issue handling
             self.exc_counter = 0
 
+            # initialise the pipeline of background reads
+            self.pipeline = ReadPipeline()
+
+            # initialise the outbox of submissions, sending whatever was left from earlier sessions
+            self.outbox = SubmissionOutbox(self._sendRequest)
+
+            # initialise the local store of submitted data
+            self.data_store = DataStore()
+
+            # screen recognised in the previous tick
+            self.last_screen = None
+
+            # ticks in the draft state without the draft on screen
+            self.draft_misses = 0
+
+            # initialise detectors telling when the screens to read have settled
+            self.settle = self._setSettleDetectors()
+
             # welcome the user
             self.welcomeMessage()
 
+            # create the remaining components in the background
+            threading.Thread(target=self._warmUp, name='warm-up', daemon=True).start()
+
         except Exception as e:
 
             # log the exception
@@ -121,33 +173,97 @@ class App(Configurable):
     '''
     Capture new screenshot and store it within
     the instance of this class
+    Unless a full capture is requested, only the slices needed to detect
+    screens in the current state of the app are captured
+    Raises an exception once the frame source is exhausted
     '''
-    def screenCap(self):
+    def screenCap(self, full=False, advance=True):
+
+        # replays move on only once the reads of the current frame are finished,
+        # so that no result arrives after the frames it relates to are gone
+        if advance and not self.source.realtime:
+            self.pipeline.wait()
+
+        # move the source to its next frame
+        if advance and not self.source.advance():
+            raise EOFError(f'frame source exhausted')
 
-        # take the screencap
-        screencap = pyautogui.screenshot(region=(0, 0, 1920, 1080))
+        # new frame, shared by all readers
+        self.frame_id += 1
+
+        # capture the whole screen if needed
+        if full:
+            self.frame = self.capture_planner.captureFull(self.frame_id)
+
+        # otherwise capture only the slices of interest
+        else:
+            self.frame = self.capture_planner.captureSlices(self._captureSlices(), self.frame_id)
 
-        #  overwrite the capture with screencap converted to a numpy array
-        self.screen_capture = np.array(screencap)
+        # remember what kind of capture is held
+        self.capture_full = full
 
     '''
-    Main method of operation, calls associated readers to detect the screen and read it out
-    if recognised.
+    Main method of operation, recognises the screen in a single pass over the screens
+    expected in the current state, then calls associated readers to read it out
+    if recognised, and moves on to the state the screen leads to
     '''
     def processScreen(self):
 
-        # process the lobby if needed
-        self._processLobby()
+        # handle reads finished in the background
+        self._processResults()
 
-        # process the loot if needed
-        self._processLoot()
+        # inform about submissions failing in the background
+        for error in self.outbox.collectErrors():
+            self.writeOutput(error, 'warning')
 
-        # process bounty draft if needed
-        self._processBounty()
+        # recognise the screen
+        screen = self.classifier.classify(self.frame, self._expectedScreens())
+
+        # process the lobby if detected, unless it was read already
+        if screen == 'lobby' and self.state_machine.state == 'idle':
+            self._processLobby()
+
+        # process the loot or trial end if detected
+        elif screen in ['loot', 'trial']:
+            self._processLoot(screen)
+
+        # process bounty draft if detected
+        elif screen == 'draft':
+            self._processBounty()
+
+        # move on to the state the screen leads to
+        self._advanceState(screen)
 
         # submit data if needed
         self._submitData()
 
+        # remember the screen for the next tick
+        self.last_screen = screen
+
+        # schedule the next poll, according to the current state
+        self.state_machine.polled(time.time())
+
+    '''
+    Method for checking if the screen is due to be polled in the current state
+    Frames which do not come from a realtime source are always processed
+    In: none
+    Out: boolean value
+    '''
+    def isDue(self):
+        return not self.source.realtime or self.state_machine.isDue(time.time())
+
+    '''
+    Method for waiting between operations, skipped when the frames
+    do not come from a realtime source
+    In: time to wait in seconds
+    Out: none
+    '''
+    def wait(self, seconds):
+
+        # only sleep when following wall-clock time
+        if self.source.realtime:
+            time.sleep(seconds)
+
     '''
     Method for quickly clearing all data in the app
     '''
@@ -158,6 +274,40 @@ class App(Configurable):
         self.lobby_data = {}
         self.loot_data = []
 
+        # fall back to the initial state
+        self.state_machine.reset()
+
+        # persist corrections of OCR reads learned so far
+        Reader.corrections.save()
+
+    '''
+    Reader of the loot screen, created on first use
+    '''
+    @property
+    def loot_reader(self):
+        return self._getPart('loot_reader')
+
+    '''
+    Reader of the bounty screen, created on first use
+    '''
+    @property
+    def bounty_reader(self):
+        return self._getPart('bounty_reader')
+
+    '''
+    Sender of the collected data, created on first use
+    '''
+    @property
+    def data_sender(self):
+        return self._getPart('data_sender')
+
+    '''
+    Drop-rate statistics of stored hunts, created on first use
+    '''
+    @property
+    def drop_stats(self):
+        return self._getPart('drop_stats')
+
     '''
     Method for writing out a welcome message in the application
     '''
@@ -166,6 +316,7 @@ class App(Configurable):
         self.logger.info(f'==== WELCOME TO SCRAPLESS {self.PRG_VERS} ====')
         self.logger.info(f'Dauntless ver {self.patch}')
         self.logger.info(f'Username set to {self.user}')
+        self.logger.info(f'OCR engine set to {self.ocr_engine.NAME}')
 
         print('\n')
 
@@ -173,8 +324,9 @@ class App(Configurable):
     Method for printing out an output to logs and to overlay
     This is a convenience function to reduce clutter and keep 
     user information level high
+    Errors save the frame they relate to, or the current screen if none is given
     '''
-    def writeOutput(self, text, colour):
+    def writeOutput(self, text, colour, frame=None):
 
         # only call the overlay method if said overlay is enabled
         if self.overlay:
@@ -192,12 +344,103 @@ class App(Configurable):
         # in case of error
         if colour == 'error':
 
-            # save current screen
-            cv2.imwrite(f'{self.IMG_PATH}{uuid4()}.png', cv2.cvtColor(self.screen_capture, cv2.COLOR_RGB2BGR))
+            # without a frame the error relates to, use the current screen
+            if frame is None:
+
+                # ensure the whole screen is available to save
+                if not self.capture_full:
+                    self.screenCap(full=True, advance=False)
+
+                frame = self.frame
+
+            # import here, as it is only needed to save the screen
+            import cv2
+
+            # save the screen
+            cv2.imwrite(f'{self.IMG_PATH}{uuid4()}.png', cv2.cvtColor(frame.image, cv2.COLOR_RGB2BGR))
 
             # clear data
             self.clearData()
 
+    '''
+    Internal method for listing the slices needed to recognise screens
+    expected in the current state of the app
+    In: none
+    Out: list of slices
+    '''
+    def _captureSlices(self):
+
+        # screens expected in the current state
+        screens = self._expectedScreens()
+
+        # slices recognising the screens
+        slices = self.classifier.slicesFor(screens)
+
+        # along with regions watched for their animation, once their screen is seen
+        for kind, (screen, slc_path, codes, frames, timeout) in self.SETL_SPEC.items():
+            if screen in screens and screen == self.last_screen:
+                slices += self.settle[kind].slices
+
+        # return the slices
+        return slices
+
+    '''
+    Internal method for listing the screens which matter in the current state of the app,
+    ordered from the most likely one
+    In: none
+    Out: list of screen names
+    '''
+    def _expectedScreens(self):
+
+        # screens of the current state
+        screens = self.state_machine.screens()
+
+        # hunts of trials end with the trial end screen instead of the loot screen
+        if 'loot' in screens and 'Trial' in self.lobby_data.get('tier', ''):
+            screens[screens.index('loot')] = 'trial'
+
+        # return the screens
+        return screens
+
+    '''
+    Internal method for moving on to the state a recognised screen leads to
+    Transitions caused by finished reads are made where they are handled
+    In: name of the recognised screen
+    Out: none
+    '''
+    def _advanceState(self, screen):
+
+        # current state
+        state = self.state_machine.state
+
+        # the hunt starts once the lobby is left
+        if state == 'lobby' and screen != 'lobby':
+            self.state_machine.go('hunt')
+
+        # the hunt ends with its end screen
+        elif state == 'hunt' and screen in ['loot', 'trial']:
+            self.state_machine.go('loot')
+
+        # a bounty draft may come up unless something is being submitted
+        elif state in ['idle', 'hunt', 'loot'] and screen == 'draft':
+            self.state_machine.go('draft')
+            self.draft_misses = 0
+
+        # the draft may be left before the bounty was read
+        elif state == 'draft':
+
+            # count the ticks the draft has been gone for
+            self.draft_misses = 0 if screen == 'draft' else self.draft_misses + 1
+
+            # go back to idle once the menu comes up, or the draft has been gone for a while
+            if screen == 'menu' or self.draft_misses >= self.DRFT_MISS:
+                self.writeOutput(f'Bounty draft left before the bounty was read', 'warning')
+                self.clearData()
+
+        # the bounty is submitted once the draft ends
+        elif state == 'bounty' and screen == 'menu':
+            self.state_machine.go('submit')
+
     '''
     Internal method for keeping track of repeating reading issues; clears all data
     after enough issues happened
@@ -224,112 +467,131 @@ class App(Configurable):
     def _makeLogDirs(self):
 
         # iterate over necessary paths
-        for path in [self.LOG_PATH, self.ERR_PATH, self.IMG_PATH]:
+        for path in [self.LOG_PATH, self.ERR_PATH, self.IMG_PATH, self.DAT_PATH]:
 
             # create folder if it does not exist
             if not os.path.exists(path):
                 os.makedirs(path)
 
     '''
-    Internal method for detecting and processing bounty draft
-    Updates bounty data as a result, unless an exception happens
+    Internal method for processing a detected bounty draft
+    Submits a background read of the draft, which updates bounty data once finished
     '''
     def _processBounty(self):
 
-        # read only if both bounty and loot data is empty
-        if len(self.bounty_data) <= 0 and len(self.loot_data) <= 0:
-            
-            # proceed if draft can be detected
-            if self.bounty_reader.detectDraftStart(self.screen_capture):
+        # nothing to do while a read is in progress
+        if self.pipeline.isPending('bounty'):
+            return
+
+        # on first sight of the draft
+        if self.last_screen != 'draft':
 
-                # inform the user about the fact
-                self.writeOutput(f'Bounty draft detected, processing...', 'info')
+            # inform the user about the fact
+            self.writeOutput(f'Bounty draft detected, processing...', 'info')
 
-                # wait out the initial animation
-                time.sleep(self.BNTY_INTER)
+            # wait out the initial animation
+            self.settle['bounty'].reset(time.time())
 
-                # enter a loop of attempting to read the bounty
-                self._processBountyLoop()
+        # attempt to read the bounty
+        self._submitRead('bounty', self._readBounty)
 
     '''
-    Convenience function to keep attempting a bounty read until succeeding or
-    detecting that user exited the screen
+    Internal method run in the background, reading the bounty draft
+    In: captured frame, unused context
+    Out: bounty data
     '''
-    def _processBountyLoop(self):
+    def _readBounty(self, frame, context):
 
-        # keep looping until valid bounty was read, or the user left the draft screen
-        while len(self.bounty_data) <= 0 and not self.bounty_reader.detectDraftEnd(self.screen_capture):
+        # return the data read off the draft
+        return self.bounty_reader.readScreen(frame)
 
-            # capture a new screenshot
-            self.screenCap()
+    '''
+    Internal method for handling a finished bounty read
+    Stores the data if valid; otherwise the read is attempted again while the draft is displayed
+    In: finished job
+    Out: none
+    '''
+    def _processBountyResult(self, job):
 
-            # attempt to read the bounty
-            try:
+        # ignore the result if a bounty was read in the meantime, or the app moved on
+        if len(self.bounty_data) > 0 or self.state_machine.state != 'draft':
+            return
 
-                # store the data 
-                self.bounty_data = self.bounty_reader.readScreen(self.screen_capture)
+        # in case illegal value was found
+        if isinstance(job.error, ValueError):
+            self.writeOutput(str(job.error), 'warning')
 
-                # inform the user
-                self.writeOutput(f'{self.bounty_data["rarity"]} bounty detected. Awaiting draft end...', 'success')
+        # log unexpected exceptions, keeping the app running
+        elif job.error is not None:
+            self._processJobError(job)
 
-            # in case illegal value was found
-            except ValueError as e:
-                self.writeOutput(str(e), 'warning')
+        # otherwise store the data, and wait for the draft to end
+        else:
+            self.bounty_data = job.result
+            self.state_machine.go('bounty')
 
-            # wait briefly to get a better screen read
-            time.sleep(self.LOOP_INTER)
+            # inform the user
+            self.writeOutput(f'{self.bounty_data["rarity"]} bounty detected. Awaiting draft end...', 'success')
 
     '''
-    Internal method for detecting and processing lobby screen
-    more functional
-    Updates lobby data as a result, unless an exception happens
+    Internal method for processing a detected lobby screen
+    Submits a background read of the lobby, which updates lobby data once finished
     '''
     def _processLobby(self):
 
-        # try to read lobby only if no hunt data yet
-        if len(self.lobby_data) <= 0:
+        # nothing to do while a read is in progress
+        if self.pipeline.isPending('lobby'):
+            return
 
-            # detect if the screen is a lobby
-            if self.lobby_reader.detectScreen(self.screen_capture):
+        # on first sight of the lobby
+        if self.last_screen != 'lobby':
 
-                # inform about detection
-                self.writeOutput(f'Lobby screen detected, processing...', 'info')
+            # inform about detection
+            self.writeOutput(f'Lobby screen detected, processing...', 'info')
 
-                # wait briefly to avoid unnecessary errors
-                time.sleep(self.LBBY_INTER)
+            # wait for the screen to settle to avoid unnecessary errors
+            self.settle['lobby'].reset(time.time())
 
-                # enter the lobby-reading loop
-                self._processLobbyLoop()
+        # attempt reading the screen
+        self._submitRead('lobby', self._readLobby)
 
     '''
-    Convenience function to keep attempting a lobby read until succeeding or
-    detecting that user exited the screen
+    Internal method run in the background, reading the lobby screen
+    In: captured frame, unused context
+    Out: lobby data
     '''
-    def _processLobbyLoop(self):
-
-        # while we can still see the lobby and we have no lobby data
-        while self.lobby_reader.detectScreen(self.screen_capture) and len(self.lobby_data) <= 0:
+    def _readLobby(self, frame, context):
 
-            # update screen grab
-            self.screenCap()
+        # return the data read off the lobby
+        return self.lobby_reader.readScreen(frame)
 
-            # attempt reading the screen
-            try:
+    '''
+    Internal method for handling a finished lobby read
+    Stores the data if valid; otherwise the read is attempted again while the lobby is displayed
+    In: finished job
+    Out: none
+    '''
+    def _processLobbyResult(self, job):
 
-                # process lobby screen and save the data
-                self.lobby_data = self.lobby_reader.readScreen(self.screen_capture)
+        # ignore the result if the lobby was read in the meantime, or the app moved on
+        if len(self.lobby_data) > 0 or self.state_machine.state != 'idle':
+            return
 
-                # write appropriate output
-                self._processLobbyOutput()
+        # communicate the exception to the user
+        if isinstance(job.error, ValueError):
+            self.writeOutput(str(job.error), 'warning')
 
-            # handle an exception
-            except ValueError as e:
+        # log unexpected exceptions, keeping the app running
+        elif job.error is not None:
+            self._processJobError(job)
 
-                # communicate the exception to the user
-                self.writeOutput(str(e), 'warning')
+        # otherwise save the data, and wait for the lobby to be left
+        else:
+            self.lobby_data = job.result
+            self.state_machine.go('lobby')
 
-            # wait briefly to get a better screen read
-            time.sleep(self.LOOP_INTER)
+            # write appropriate output
+            self._processLobbyOutput()
 
     '''
     Convenience function encompassing all possible text output for
@@ -364,106 +626,177 @@ class App(Configurable):
                             f'Awaiting loot screen...', 'success')
 
     '''
-    Internal method for detecting and processing loot screen
-    Updates loot data as a result, unless an exception happens
-    In: none
+    Internal method for processing a detected loot or trial end screen
+    Submits a background read of the loot, which updates loot data once finished
+    In: name of the detected screen
     Out: none
     '''
-    def _processLoot(self):
+    def _processLoot(self, screen):
 
-        # try to read loot only if lobby data present
-        if len(self.lobby_data) > 0 and len(self.loot_data) <= 0:
+        # if trial end screen, abandon processing
+        if screen == 'trial':
 
-            # if trial, detect for trial end screen
-            if 'Trial' in self.lobby_data['tier']:
-                
-                # check for trial end screen
-                if self.loot_reader.detectTrialEnd(self.screen_capture):
+            # inform the user
+            self.writeOutput(f'{self.lobby_data["tier"]} has ended', 'success')
+            self.clearData()
 
-                    # inform the user, abandon processing
-                    self.writeOutput(f'{self.lobby_data["tier"]} has ended', 'success')
-                    self.clearData()
+        # otherwise check if the hunt was an Escalation
+        elif self.lobby_data['escalation'] != '':
 
+            # inform the user, abandon processing
+            self.writeOutput(f'Escalation run ended, no data will be submitted', 'success')
+            self.clearData()
 
-            # otherwise detect for loot screen
-            else:
+        # otherwise read the screen, unless a read is in progress
+        elif not self.pipeline.isPending('loot'):
 
-                # detect if screen is a loot screen
-                if self.loot_reader.detectLootScreen(self.screen_capture):
+            # wait for the animation to end on first sight
+            if self.last_screen != 'loot':
+                self.settle['loot'].reset(time.time())
 
-                    # check if the hunt was an Escalation
-                    if self.lobby_data['escalation'] != '':
+            # attempt reading the loot, in the context of the current hunt
+            self._submitRead('loot', self._readLoot, self.lobby_data)
 
-                        # inform the user, abandon processing
-                        self.writeOutput(f'Escalation run ended, no data will be submitted', 'success')
-                        self.clearData()
+    '''
+    Internal method run in the background, reading the loot screen
+    The drops are read only if the screen belongs to the hunt of the lobby
+    In: captured frame, lobby data of the hunt
+    Out: basic loot screen data, list of drops
+    '''
+    def _readLoot(self, frame, lobby):
 
-                    # otherwise enter the loop of reading the screen
-                    else:
+        # process basic loot screen data
+        data = self.loot_reader.readScreen(frame)
 
-                        # wait briefly to ensure animation end
-                        time.sleep(self.LOOT_INTER)
+        # read the drops only for a valid hunt, which did not end in a defeat
+        if not data['defeat'] and (data['behemoth'] == lobby['behemoth'] or lobby['behemoth'] in self.lobby_reader.valid_hunts.keys()):
+            return data, self.loot_reader.readLoot(frame, lobby['behemoth'])
 
-                        # start the loop
-                        self._processLootLoop()
+        # otherwise return no drops
+        return data, []
 
     '''
-    Convenience function for loot screen reading loop
+    Internal method for handling a finished loot read
+    Stores the sampled loot data if valid; otherwise the read is attempted again
+    while the loot screen is displayed
+    In: finished job
+    Out: none
     '''
-    def _processLootLoop(self):
+    def _processLootResult(self, job):
 
-        # only try reading until we have loot data or until we leave the screen
-        while len(self.loot_data) <= 0 and self.loot_reader.detectLootScreen(self.screen_capture) and len(self.lobby_data) > 0:
+        # ignore the result if the hunt changed or loot was read in the meantime, or the app moved on
+        if job.context is not self.lobby_data or len(self.loot_data) > 0 or self.state_machine.state != 'loot':
+            return
 
-            # take a new screencap
-            self.screenCap()
+        # in case OCR read anomalous stack of items, handle error internally
+        if isinstance(job.error, ValueError):
+            self.writeOutput(str(job.error), 'error', job.frame)
+            return
 
-            # process basic loot screen data
-            data = self.loot_reader.readScreen(self.screen_capture)
+        # log unexpected exceptions, keeping the app running
+        elif job.error is not None:
+            self._processJobError(job)
+            return
 
-            # check if the party was defeated
-            if data['defeat']:
+        # retrieve the results
+        data, loot = job.result
 
-                # inform the user, abandon processing
-                self.writeOutput(f'Party defeated, no data will be submitted', 'warning')
-                self.clearData()
+        # check if the party was defeated
+        if data['defeat']:
 
+            # inform the user, abandon processing
+            self.writeOutput(f'Party defeated, no data will be submitted', 'warning')
+            self.clearData()
 
-            # otherwise, check if valid hunt
-            elif data['behemoth'] == self.lobby_data['behemoth'] or self.lobby_data['behemoth'] in self.lobby_reader.valid_hunts.keys():
+        # otherwise, check if valid hunt
+        elif data['behemoth'] == self.lobby_data['behemoth'] or self.lobby_data['behemoth'] in self.lobby_reader.valid_hunts.keys():
 
-                # inform that more in-depth reading will now take place
-                self.writeOutput(f'Loot screen detected, verifying...', 'info')
+            # inform that the reading is being verified
+            self.writeOutput(f'Loot screen detected, verifying...', 'info')
 
-                # update lobby data
-                self.lobby_data.update(data)
+            # update lobby data
+            self.lobby_data.update(data)
 
-                # attempt to read the loot
-                try:
-                    # store loot data in memory
-                    self.loot_data = self.loot_reader.readLoot(self.screen_capture, self.lobby_data['behemoth'])
-                    self.loot_data = self._processLootData()
+            # store sampled loot data in memory
+            try:
+                self.loot_data = loot
+                self.loot_data = self._processLootData()
 
-                    # inform that everything is okay
-                    self.writeOutput(f'Valid loot data read, you may now leave the screen', 'success')
+            # in case the loot can't be sampled, such as with more rolls than drops, handle error internally
+            except ValueError as e:
+                self.writeOutput(str(e), 'error', job.frame)
+                return
 
-                # in case OCR read anomalous stack of items, handle error internally
-                except ValueError as e:
-                    self.writeOutput(str(e), 'error')
+            # submit the data
+            self.state_machine.go('submit')
 
-            # inform the reading will be attempted again
-            else:
-                self.writeOutput(f'Expected behemoth {self.lobby_data["behemoth"]} but found ' + 
-                                f'{data["behemoth"]}, retrying...', 'warning')
-                self._incrementException()
+            # inform that everything is okay
+            self.writeOutput(f'Valid loot data read, you may now leave the screen', 'success')
 
-            # wait briefly to get a better screenshot
-            time.sleep(self.LOOP_INTER)
+        # inform the reading will be attempted again
+        else:
+            self.writeOutput(f'Expected behemoth {self.lobby_data["behemoth"]} but found ' + 
+                            f'{data["behemoth"]}, retrying...', 'warning')
+            self._incrementException()
+
+    '''
+    Internal method for handling an unexpected exception raised by a background read
+    The exception is logged with its traceback and the frame is saved, then the app carries on
+    In: finished job
+    Out: none
+    '''
+    def _processJobError(self, job):
+
+        # log the traceback
+        self.logger.error(f'Reading the {job.kind} failed', exc_info=job.error)
+
+        # inform the user, saving the frame and clearing the data
+        self.writeOutput(f'Unexpected error while reading the {job.kind}: {job.error}', 'error', job.frame)
+
+    '''
+    Internal method for handling reads finished in the background since the last call
+    In: none
+    Out: none
+    '''
+    def _processResults(self):
+
+        # iterate over finished jobs
+        for job in self.pipeline.collect():
+
+            # pass each job to its handler
+            if job.kind == 'lobby':
+                self._processLobbyResult(job)
+
+            elif job.kind == 'loot':
+                self._processLootResult(job)
+
+            elif job.kind == 'bounty':
+                self._processBountyResult(job)
+
+    '''
+    Internal method for submitting a background read of the whole screen,
+    once the screen has settled after its initial animation
+    In: kind of the read, reading function, context of the read
+    Out: none
+    '''
+    def _submitRead(self, kind, read, context=None):
+
+        # reads wait for the screen to settle only when following wall-clock time
+        if self.source.realtime and not self.settle[kind].update(self.frame, time.time()):
+            return
+
+        # capture the whole screen for reading
+        self.screenCap(full=True, advance=False)
+
+        # submit the read
+        self.pipeline.submit(kind, read, self.frame, context)
 
     '''
     Internal method for sampling the loot data into what will be submitted
+    Drops are counted, each standing for as many rolls as it took; rolls are sampled
+    without replacement, then counted again per drop
     In: nothing
-    Out: sampled data
+    Out: sampled data, as counted drops
     '''
     def _processLootData(self):
 
@@ -475,9 +808,12 @@ class App(Configurable):
                             self.lobby_data['behemoth'] not in ['Shrowd', 'Rezakiri'] and
                             self.lobby_data['elite'])
 
+        # count all rolls read off the loot screen
+        roll_count = sum(drop['rolls'] for drop in self.loot_data)
+
         # calculate how many drops to sample out from the data
         # sampling is necessary because of numerous display bugs on loot screen
-        sample_count = slay_rolls * 2 if len(self.loot_data) >= slay_rolls * 2 else slay_rolls
+        sample_count = slay_rolls * 2 if roll_count >= slay_rolls * 2 else slay_rolls
 
         # fill submission data with dyes and cells if present -- we always add them to submission data
         # because they can't drop from part break
@@ -489,10 +825,21 @@ class App(Configurable):
         # in the event of sample count being higher than valid loot, take number of items
         # in the loot - this is a safeguard against low-level hunts dropping part breaks on
         # slay rolls
-        sample_count = min(sample_count, len(self.loot_data))
+        sample_count = min(sample_count, roll_count)
 
-        # draw the samples, reducing their number by dye drops present
-        sample_data = random.sample(source_data, sample_count - len(submit_data))
+        # index the rolls of source drops by their running total
+        bounds = list(accumulate(drop['rolls'] for drop in source_data))
+
+        # draw the rolls, reducing their number by dye and cell rolls present
+        picks = random.sample(range(bounds[-1] if len(bounds) > 0 else 0),
+                              sample_count - sum(drop['rolls'] for drop in submit_data))
+
+        # count the rolls drawn from every source drop
+        sample_rolls = Counter(bisect_right(bounds, pick) for pick in picks)
+
+        # keep the source drops which were drawn, in their original order
+        sample_data = [{**drop, 'rolls': sample_rolls[index]}
+                       for index, drop in enumerate(source_data) if sample_rolls[index] > 0]
 
         # return sampled data
         return [*submit_data, *sample_data]
@@ -543,37 +890,97 @@ class App(Configurable):
         return logger
 
     '''
-    Method for configuring PyTesseract from config file
-    Reads the path and sets it to a global value
+    Method for configuring the OCR engine from config file
+    Reads the path and the engine name, then sets up the engine shared by all readers
     Raises an exception if the path is missing or does not point to a file
     '''
-    def _setPyTesseract(self):
+    def _setOcrEngine(self):
 
         # retrieve tesseract path from config
         tess_path = self.readKey('tesseract')
 
+        # retrieve the preferred engine, configs from before it was introduced use PyTesseract
+        engine_name = self.conf_file.get('ocr_engine', PyTesseractEngine.NAME)
+
         # verify the path is a string
         if type(tess_path) == str:
 
             # verify path leads to a file
             if os.path.isfile(tess_path):
 
-                # use the path read from config to setup pytesseract
-                pytesseract.pytesseract.tesseract_cmd = tess_path
-            
-                # return the path
-                return tess_path
+                # use the path read from config to setup the OCR engine
+                engine = Reader.setOcrEngine(tess_path, engine_name)
+
+                # inform the user if the requested engine is not in use
+                if Reader.ocr_issue is not None:
+                    self.writeOutput(f'{Reader.ocr_issue}; using {engine.NAME} instead', 'warning')
+
+                # return the engine in use
+                return engine
+
+            # replays may be processed away from the game, with tesseract found on the system path
+            if not self.source.realtime:
+
+                # inform the user
+                self.writeOutput(f'file {tess_path} is not a file or could not be read; '
+                                 'using tesseract from the system path', 'warning')
+
+                # setup the OCR engine without a path
+                return Reader.setOcrEngine(None, engine_name)
 
             # otherwise raise an exception
             raise FileNotFoundError(f'file {tess_path} is not a file or could not be read')
 
+        # without a path, keep the default engine
+        return Reader.ocr_engine
+
     '''
-    Internal method to automatically accesses the manifest file created by Epic Games Store
+    Internal method for initialising the overlay, shown only over the live game
+    In: none
+    Out: overlay, or None for replays
+    '''
+    def _setOverlay(self):
+
+        # replays only write their output to logs
+        if not self.source.realtime:
+            return None
+
+        # import here, as the overlay needs Windows and is only shown over the live game
+        from overlay import Overlay
+
+        # return the overlay
+        return Overlay(f'{self.PRG_NAME.upper()} {self.PRG_VERS}')
+
+    '''
+    Internal method for reading the game patch; replays processed away from the game
+    leave it empty if it can't be read, unless it was given on startup
     In: none
     Out: string number of game version
     '''
     def _setGamePatch(self):
 
+        # read the patch from the manifest
+        try:
+            return self._readGamePatch()
+
+        # replays may be processed without the game installed
+        except OSError as e:
+
+            # the live game must have a patch
+            if self.source.realtime:
+                raise
+
+            # inform the user, leave the patch empty
+            self.writeOutput(f'{e}; game patch left empty', 'warning')
+            return ''
+
+    '''
+    Internal method to automatically accesses the manifest file created by Epic Games Store
+    In: none
+    Out: string number of game version
+    '''
+    def _readGamePatch(self):
+
         # check if the manifest folder exists
         if os.path.isdir(self.MNF_PATH):
 
@@ -642,62 +1049,197 @@ class App(Configurable):
         # return the user name
         return user
 
+    '''
+    Internal method for initialising the detectors of settled screens, one per kind of read
+    Only the watched slices are loaded, so that the readers can still be created later
+    In: none
+    Out: dictionary of settle detectors
+    '''
+    def _setSettleDetectors(self):
+
+        # prepare empty dictionary
+        detectors = {}
+
+        # iterate over the kinds of reads
+        for kind, (screen, slc_path, codes, frames, timeout) in self.SETL_SPEC.items():
+
+            # load the watched slices
+            slices = [Slice.fromFile(f'{slc_path}/{code}.json') for code in codes]
+
+            # create the detector
+            detectors[kind] = SettleDetector(slices, frames, timeout)
+
+        # return the detectors
+        return detectors
+
+    '''
+    Internal method for retrieving a component created on first use
+    Components are created by one thread at a time, others wait until it is ready
+    In: name of the component
+    Out: the component
+    '''
+    def _getPart(self, name):
+
+        with self.lazy_locks[name]:
+
+            # create the component if not done yet
+            if name not in self.lazy_parts:
+                self.lazy_parts[name] = getattr(self, self.LAZY_PART[name])()
+
+            # return the component
+            return self.lazy_parts[name]
+
+    '''
+    Internal method creating the components not needed for the first frame,
+    run on a background thread after startup
+    '''
+    def _warmUp(self):
+
+        # iterate over the components
+        for name in self.LAZY_PART:
+
+            # create the component; errors are raised again where it is used
+            try:
+                self._getPart(name)
+
+            # log the error now, so that it is seen before the component is needed
+            except Exception as e:
+                self.logger.error(f"Could not prepare the {name.replace('_', ' ')}: {e}", exc_info=e)
+
+    '''
+    Internal method creating the loot reader
+    In: none
+    Out: loot reader
+    '''
+    def _makeLootReader(self):
+
+        # import here, so that it is loaded after startup
+        from loot_reader import LootReader
+
+        # return the reader
+        return LootReader()
+
+    '''
+    Internal method creating the bounty reader
+    In: none
+    Out: bounty reader
+    '''
+    def _makeBountyReader(self):
+
+        # import here, so that it is loaded after startup
+        from bounty_reader import BountyReader
+
+        # return the reader
+        return BountyReader()
+
+    '''
+    Internal method creating the data sender, which loads requests
+    In: none
+    Out: data sender
+    '''
+    def _makeDataSender(self):
+
+        # import here, so that it is loaded after startup
+        from data_sender import DataSender
+
+        # return the sender
+        return DataSender()
+
+    '''
+    Internal method creating the drop-rate statistics, rebuilt from the local store
+    In: none
+    Out: drop-rate statistics
+    '''
+    def _makeDropStats(self):
+
+        # import here, so that it is loaded after startup
+        from drop_stats import DropStats
+
+        # read the store through a connection of this thread
+        store = DataStore(self.data_store.path)
+
+        # rebuild the statistics from every stored hunt
+        stats = DropStats()
+        stats.recompute(store)
+        store.close()
+
+        # return the statistics
+        return stats
+
+    '''
+    Internal method sending a single request from the outbox, run on the thread of the outbox
+    In: request, idempotency key of the request
+    Out: none
+    '''
+    def _sendRequest(self, request, key):
+
+        # send the request through the data sender
+        self.data_sender.send(request, key)
+
     '''
     Internal method for submitting data, based on what data is filled at the moment
+    Data is stored in the outbox and sent in the background
     In: none
     Out: none
     '''
     def _submitData(self):
 
+        # nothing to submit until the data is complete
+        if self.state_machine.state != 'submit':
+            return
+
         # if loot data is not empty, submit loot data
         if len(self.loot_data) > 0:
 
-            # iterate over drops
-            for drop in self.loot_data:
+            # game and patch data shared by the drops
+            details = {
+                'user': self.user,
+                'patch': self.patch,
+                'behemoth': self.lobby_data['behemoth'],
+                'threat': self.lobby_data['threat'],
+                'tier': self.lobby_data['tier']
+            }
 
-                # add game and patch data
-                drop['user'] = self.user
-                drop['patch'] = self.patch
-                drop['behemoth'] = self.lobby_data['behemoth']
-                drop['threat'] = self.lobby_data['threat']
-                drop['tier'] = self.lobby_data['tier']
+            # store the drops in the outbox, to be sent in one batch
+            self.outbox.put('loot', self.data_sender.buildBatch(details, self.loot_data, 'loot'))
 
-                # try submitting the drop
-                try:
-                    # send POST request
-                    self.data_sender.submitData(drop, 'loot')
-        
-                # raise exception if encountered
-                except HTTPError as e:
-                    self.writeOutput(str(e), 'error')
+            # retrieve the statistics before storing the hunt, so that a rebuild does not count it twice
+            drop_stats = self.drop_stats
+
+            # keep the hunt and its drops locally, and count them in the statistics
+            self.data_store.addHunt({**self.lobby_data, **details}, self.loot_data)
+            drop_stats.add({**self.lobby_data, **details}, self.loot_data)
 
             # inform about data submission
             self.writeOutput(f'Loot data submitted', 'success')
 
+            # report how much OCR the cache saved so far
+            stats = Reader.ocr_cache.stats()
+            self.logger.info(f'OCR cache: {stats["hits"]} hits, {stats["misses"]} misses, ' +
+                            f'{stats["saved"]:.1f}s saved')
+
             # clear the data
             self.clearData()
 
-        # if bounty data is not empty
+        # if bounty data is not empty, submit bounty data
         if len(self.bounty_data) > 0:
 
-            # check if draft screen was closed
-            if self.bounty_reader.detectDraftEnd(self.screen_capture):
+            # add game and patch data
+            self.bounty_data['user'] = self.user
+            self.bounty_data['patch'] = self.patch
 
-                # add game and patch data
-                self.bounty_data['user'] = self.user
-                self.bounty_data['patch'] = self.patch
+            # store the bounty in the outbox, to be sent
+            self.outbox.put('bounty', self.data_sender.buildData(self.bounty_data, 'bounty'))
 
-                # try submitting the bounty
-                try:
-                    # send a POST request
-                    self.data_sender.submitData(self.bounty_data, 'bounty')
+            # keep the bounty locally
+            self.data_store.addBounty(self.bounty_data)
 
-                    # inform about data submission
-                    self.writeOutput(f'Bounty data submitted', 'success')
+            # inform about data submission
+            self.writeOutput(f'Bounty data submitted', 'success')
 
-                # raise exception if encountered
-                except HTTPError as e:
-                    self.writeOutput(str(e), 'error')
+            # empty the data
+            self.clearData()
 
-                # empty the data
-                self.clearData()
\ No newline at end of file
+        # fall back to the initial state, even if there was nothing to submit
+        if self.state_machine.state == 'submit':
+            self.clearData()
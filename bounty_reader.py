@@ -1,4 +1,5 @@
 from reader import Reader
+from digit_reader import DigitReader
 
 '''
 Specialised class for reading specifically the bounty screen, and recognising 
@@ -12,12 +13,9 @@ class BountyReader(Reader):
     # path to folder with screen slices
     SLC_PATH = './data/json/screen/bounty'
     # expected slices to be found
-    SLC_CODE = ['draft', 'menu', 'value']
-
-    # path to folder with target images
-    TRGT_PATH = './data/targets/bounty'
-    # expected targets to be found
-    TRGT_CODE = ['draft', 'menu']
+    SLC_CODE = ['value']
+    # slices read with OCR, with profiles in the ocr subfolder
+    OCR_CODE = ['value']
 
     # path to bounty rarity dict
     RARE_PATH = './data/json/bounty/rarity.json'
@@ -27,45 +25,28 @@ class BountyReader(Reader):
         # load slices of the screen
         self.slices = self._setSlices(self.SLC_PATH, self.SLC_CODE)
 
-        # load target images of the screen
-        self.targets = self._setTargets(self.TRGT_PATH, self.TRGT_CODE)
+        # load OCR profiles of the fields read off the screen
+        self.profiles = self._setProfiles(self.SLC_PATH, self.OCR_CODE)
+
+        # initialise the recogniser of bounty value digits
+        self.value_digits = DigitReader('value')
 
         # load dictionary of rarity tiers
         self.rarities = self.readFile(self.RARE_PATH)
 
-    '''
-    Method for detecting the start of a bounty draft, wraps the detectFromSlice wrapper
-    Uses in-class slice and target, with an image input
-    Returns a boolean value
-    '''
-    def detectDraftStart(self, image):
-
-        # return the detection value
-        return self.detectFromSlice(image, 'draft')
-
-    '''
-    Method for detecting the end of a bounty draft, wraps the detectFromSlice wrapper
-    Uses in-class slice and target, with an image input
-    Returns a boolean value
-    '''
-    def detectDraftEnd(self, image):
-
-        # return the detection value
-        return self.detectFromSlice(image, 'menu')
-
     '''
     Method for reading all data off the Draft screen, and checks if it pertainsn to a valid
     bounty tier as defined in configuration files
-    In: screenshot of the game screen
+    In: captured frame of the game screen
     Out:
     '''
-    def readScreen(self, image):
+    def readScreen(self, frame):
 
         # prepare empty dictionary for data
         data = {}
 
         # read bounty screen data
-        data['value'] = self._readBountyValue(image)
+        data['value'] = self._readBountyValue(frame)
         data['rarity'] = self._readBountyRarity(data['value'])
 
         # return all read data
@@ -90,20 +71,25 @@ class BountyReader(Reader):
 
     '''
     Internal wrapper method for reading the experience value of a bounty
-    In: screenshot of the game lobby
+    In: captured frame of the game lobby
     Out: string bounty value
     '''
-    def _readBountyValue(self, image):
-
-        # slice the input image
-        image = self.slices['value'].sliceImage(image)
+    def _readBountyValue(self, frame):
 
         # launch the reader function
-        text = self.readText(image, ocr_config='--psm 13 -c tessedit_char_whitelist=x0123456789',
-                            thresh_val=175, scale_x=2, scale_y=2, border_size=5, invert=True, debug=True)
+        text = self.readDigits(frame, self.slices['value'], self.value_digits, r'x\d+',
+                            self.profiles['value'], self._isValue)
 
         # skip the first symbol
         text = text[1:]
 
         # return the read text
-        return text
\ No newline at end of file
+        return text
+
+    '''
+    Internal method checking if a read bounty value, with its leading symbol, is one of a known rarity
+    In: read text
+    Out: boolean value
+    '''
+    def _isValue(self, text):
+        return text[1:] in self.rarities
\ No newline at end of file
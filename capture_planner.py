@@ -0,0 +1,140 @@
+from frame import Frame
+
+'''
+A class for planning and performing partial screen captures
+Given the slices that are of interest in the current state of the application,
+it merges them into as few rectangular regions as reasonable and grabs only those;
+the regions are handed to the frame as they are, which crops slices out of them
+with full-screen coordinates, so that no screen-sized image is allocated per capture
+Sources which can't grab a region for less than the whole screen are grabbed once per
+capture, over the bounding box of the regions, instead of once per region
+'''
+class CapturePlanner:
+
+    #
+    # CLASS VARIABLES
+    #
+    # size of the captured screen
+    SCR_WIDTH = 1920
+    SCR_HEIGHT = 1080
+
+    # how much bigger than its parts a merged region can be
+    # before the parts are rather captured separately
+    MRG_RATIO = 1.5
+
+    def __init__(self, source):
+
+        # source the frames are grabbed from
+        self.source = source
+
+        # cache of planned regions, keyed by the slice coordinates they were planned for
+        self.plans = {}
+
+    '''
+    Method for capturing the full screen
+    In: identifier of the frame
+    Out: frame of the whole screen
+    '''
+    def captureFull(self, frame_id):
+
+        # grab the whole screen
+        return Frame(self.source.grab(region=(0, 0, self.SCR_WIDTH, self.SCR_HEIGHT)), frame_id)
+
+    '''
+    Method for capturing only the regions covering given slices
+    In: list of slices of interest, identifier of the frame
+    Out: frame of the captured regions, valid within the slices
+    '''
+    def captureSlices(self, slices, frame_id):
+
+        # regions planned for the slices
+        regions = self.planRegions(slices)
+
+        # grab every region separately if the source grabs regions cheaply
+        if self.source.region_grab:
+            grabbed = [(rect, self.source.grab(region=(rect[0], rect[1], rect[2] - rect[0], rect[3] - rect[1])))
+                       for rect in regions]
+
+        # otherwise grab the bounding box of the regions once, and take views of the regions out of it
+        elif len(regions) > 0:
+
+            # bounding box of the regions
+            bx0, by0 = min(r[0] for r in regions), min(r[1] for r in regions)
+            bx1, by1 = max(r[2] for r in regions), max(r[3] for r in regions)
+
+            # grab it
+            box = self.source.grab(region=(bx0, by0, bx1 - bx0, by1 - by0))
+
+            # take the regions
+            grabbed = [((x0, y0, x1, y1), box[(y0 - by0):(y1 - by0), (x0 - bx0):(x1 - bx0), :])
+                       for x0, y0, x1, y1 in regions]
+
+        # nothing to grab
+        else:
+            grabbed = []
+
+        # return the frame
+        return Frame(None, frame_id, grabbed, (self.SCR_HEIGHT, self.SCR_WIDTH, 3))
+
+    '''
+    Method for computing the regions to capture for given slices
+    Overlapping or nearby rectangles are merged into their bounding box, as long as
+    the box does not grow too much beyond the area of the rectangles it replaces
+    In: list of slices
+    Out: list of (x0, y0, x1, y1) regions
+    '''
+    def planRegions(self, slices):
+
+        # rectangles of the slices, clamped to the screen
+        rects = [(max(slc.x0, 0), max(slc.y0, 0), min(slc.x1, self.SCR_WIDTH), min(slc.y1, self.SCR_HEIGHT))
+                    for slc in slices]
+
+        # key for the cache of plans
+        key = tuple(sorted(rects))
+
+        # plan only if not planned before
+        if key not in self.plans:
+
+            # pair each rectangle with the area it actually needs captured
+            regions = [(rect, self._area(rect)) for rect in rects]
+
+            # keep merging until no pair is worth merging
+            merged = True
+            while merged:
+                merged = False
+
+                # check every pair of regions
+                for i in range(len(regions)):
+                    for j in range(i + 1, len(regions)):
+
+                        # compute the bounding box of the pair
+                        (rect_a, area_a), (rect_b, area_b) = regions[i], regions[j]
+                        union = (min(rect_a[0], rect_b[0]), min(rect_a[1], rect_b[1]),
+                                max(rect_a[2], rect_b[2]), max(rect_a[3], rect_b[3]))
+
+                        # merge if the box is not much bigger than the areas it covers
+                        if self._area(union) <= self.MRG_RATIO * (area_a + area_b):
+                            regions[i] = (union, area_a + area_b)
+                            regions.pop(j)
+                            merged = True
+                            break
+
+                    # restart the scan after a merge
+                    if merged:
+                        break
+
+            # store the plan
+            self.plans[key] = [rect for rect, area in regions if self._area(rect) > 0]
+
+        # return the plan
+        return self.plans[key]
+
+    '''
+    Internal helper computing the area of a rectangle
+    In: (x0, y0, x1, y1) rectangle
+    Out: area in pixels
+    '''
+    def _area(self, rect):
+
+        # empty rectangles have no area
+        return max(rect[2] - rect[0], 0) * max(rect[3] - rect[1], 0)
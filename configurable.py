@@ -39,12 +39,21 @@ class Configurable:
 
     '''
     A generic method for reading a file from path. 
+    Files bundled with the game data are taken from the bundle.
     Raises an exception when file can't be accessed.
     In: file path
     Out: read file
     '''
     def readFile(self, file_path):
 
+        # import here, so that importing this module does not pull in cv2 and numpy
+        from data_bundle import DataBundle
+
+        # look the file up in the game data bundle first
+        conf_file = DataBundle.shared().readJson(file_path)
+        if conf_file is not None:
+            return conf_file
+
         # check if the file exists
         if os.path.isfile(file_path):
 
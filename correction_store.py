@@ -0,0 +1,179 @@
+import os
+import json
+import threading
+
+'''
+A class remembering corrections of OCR reads between sessions
+The same misreads of behemoth, drop and cell names, and of drop counts, recur every session;
+once a raw read has been corrected, the correction is stored under the vocabulary it belongs
+to, so that later reads of the same string skip fuzzy matching entirely
+Corrections are persisted in a JSON file, and kept under a size limit by evicting the least
+used ones first
+'''
+class CorrectionStore:
+
+    #
+    # CLASS VARIABLES
+    #
+    # path to the file with stored corrections
+    CRR_PATH = './logging/data/corrections.json'
+
+    # maximum number of stored corrections
+    CRR_SIZE = 2048
+
+    # number of corrections evicted at once when full
+    EVC_SIZE = 256
+
+    def __init__(self, path=CRR_PATH):
+
+        # path to the file with stored corrections
+        self.path = path
+
+        # corrections, as raw read mapped to corrected value and number of uses, by vocabulary
+        self.entries = {}
+
+        # total number of stored corrections
+        self.size = 0
+
+        # flag of corrections not saved yet
+        self.dirty = False
+
+        # lock guarding the store, as it is used from multiple threads
+        self.lock = threading.Lock()
+
+        # load corrections stored in previous sessions
+        self._load()
+
+    '''
+    Method for retrieving the correction of a raw read, counting its use
+    In: name of the vocabulary, raw read
+    Out: corrected value, or None if not stored
+    '''
+    def get(self, vocab, raw):
+
+        with self.lock:
+
+            # retrieve the entry
+            entry = self.entries.get(vocab, {}).get(raw)
+
+            # nothing to return if not stored
+            if entry is None:
+                return None
+
+            # count the use
+            entry[1] += 1
+            self.dirty = True
+
+            # return the corrected value
+            return entry[0]
+
+    '''
+    Method for storing the correction of a raw read, evicting the least used ones first if full
+    In: name of the vocabulary, raw read, corrected value
+    Out: none
+    '''
+    def put(self, vocab, raw, value):
+
+        with self.lock:
+
+            # retrieve the corrections of the vocabulary
+            corrections = self.entries.get(vocab, {})
+
+            # skip corrections already stored
+            if raw in corrections and corrections[raw][0] == value:
+                return
+
+            # make room for a new correction, evicting a batch at a time so that it stays rare
+            if raw not in corrections:
+
+                if self.size >= self.CRR_SIZE:
+                    self._evict(self.size - self.CRR_SIZE + self.EVC_SIZE)
+
+                # count the new correction
+                self.size += 1
+
+            # store the correction as used once
+            self.entries.setdefault(vocab, {})[raw] = [value, 1]
+            self.dirty = True
+
+    '''
+    Method for saving the corrections to the file, if any changed since last saved
+    In: none
+    Out: none
+    '''
+    def save(self):
+
+        with self.lock:
+
+            # skip if nothing changed
+            if not self.dirty:
+                return
+
+            # create the folder if it does not exist
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+            # write to a temporary file and swap it in, so that the file is never left half-written
+            temp_path = f'{self.path}.tmp'
+            with open(temp_path, 'w') as save_file:
+                json.dump(self.entries, save_file)
+
+            os.replace(temp_path, self.path)
+
+            # mark as saved
+            self.dirty = False
+
+    '''
+    Internal method for evicting the least used corrections
+    In: number of corrections to evict
+    Out: none
+    '''
+    def _evict(self, count):
+
+        # list all corrections by number of uses
+        ranked = sorted(((entry[1], vocab, raw) for vocab, corrections in self.entries.items()
+                         for raw, entry in corrections.items()), key=lambda item: item[0])
+
+        # remove the least used ones
+        for uses, vocab, raw in ranked[:count]:
+            del self.entries[vocab][raw]
+
+        # drop vocabularies left without corrections
+        self.entries = {vocab: corrections for vocab, corrections in self.entries.items() if corrections}
+
+        # update the size
+        self.size -= min(count, len(ranked))
+
+    '''
+    Internal method for loading corrections stored in previous sessions
+    A missing or unreadable file leaves the store empty
+    In: none
+    Out: none
+    '''
+    def _load(self):
+
+        # nothing to load if the file does not exist yet
+        if not os.path.isfile(self.path):
+            return
+
+        # load the file, skipping it if corrupted
+        try:
+            with open(self.path, 'r') as load_file:
+                entries = json.load(load_file)
+
+        except (OSError, ValueError):
+            return
+
+        # skip the file if not shaped like a store
+        if not isinstance(entries, dict) or not all(isinstance(c, dict) for c in entries.values()):
+            return
+
+        # keep well-formed corrections only
+        for vocab, corrections in entries.items():
+            for raw, entry in corrections.items():
+                if isinstance(entry, list) and len(entry) == 2 and isinstance(entry[1], int):
+                    self.entries.setdefault(vocab, {})[raw] = entry
+                    self.size += 1
+
+        # apply the size limit, in case it changed
+        if self.size > self.CRR_SIZE:
+            self._evict(self.size - self.CRR_SIZE)
@@ -0,0 +1,270 @@
+import os
+import cv2
+import json
+import hashlib
+import threading
+
+import numpy as np
+
+'''
+A class bundling the game data read at startup into a single file
+JSON files under data/json and target images under data/targets are compiled into one
+uncompressed numpy archive, holding the images as arrays and a JSON index with the text of
+every JSON file, so that starting up reads one file instead of dozens
+The index is stamped with the version of the bundle format. A bundle shipped with a release
+is authoritative and is loaded without looking at its sources; a bundle built at runtime keeps
+a manifest of content hashes of the sources, and is rebuilt if they changed
+User configuration and templates learned at runtime are left out, as they change all the time
+'''
+class DataBundle:
+
+    #
+    # CLASS VARIABLES
+    #
+    # path to the bundle
+    BNDL_PATH = './data/bundle.npz'
+
+    # version of the bundle format; bundles of other versions are rebuilt
+    BNDL_VER = 2
+
+    # folders with bundled files, and the extensions of bundled files
+    SRC_PATH = {'./data/json': '.json', './data/targets': '.png'}
+
+    # folders left out of the bundle
+    SKIP_PATH = ['./data/json/config']
+
+    # bundle shared by the whole application, loaded on first use
+    shared_bundle = None
+    shared_lock = threading.Lock()
+
+    def __init__(self, path=BNDL_PATH):
+
+        # path to the bundle
+        self.path = path
+
+        # text of JSON files, keys of images, and the manifest of sources, by file path
+        self.texts = {}
+        self.images = {}
+        self.manifest = {}
+
+        # version of the bundle format, and whether the bundle was shipped with a release
+        self.version = None
+        self.shipped = False
+
+        # arrays of images, by key
+        self.arrays = {}
+
+    '''
+    Class method for retrieving the bundle shared by the whole application
+    The bundle is loaded on first use, and rebuilt if it does not match its sources
+    In: none
+    Out: data bundle
+    '''
+    @classmethod
+    def shared(cls):
+
+        with cls.shared_lock:
+
+            # load the bundle if not done yet
+            if cls.shared_bundle is None:
+                bundle = cls()
+                bundle.load()
+                cls.shared_bundle = bundle
+
+            # return the bundle
+            return cls.shared_bundle
+
+    '''
+    Method for loading the bundle, or rebuilding it if missing or out of date
+    Shipped bundles of the current version are used as they are, without reading their sources
+    In: none
+    Out: none
+    '''
+    def load(self):
+
+        # read the bundle if it exists, skipping it if corrupted
+        if os.path.isfile(self.path):
+
+            try:
+                self._read()
+
+            except (OSError, ValueError, KeyError):
+                self.version = None
+
+        # rebuild the bundle if of another version
+        if self.version != self.BNDL_VER:
+            self.build()
+
+        # or if built at runtime, and its sources changed since
+        elif not self.shipped and self.manifest != self._scanSources():
+            self.build()
+
+    '''
+    Method for compiling the sources into the bundle and saving it
+    The bundle is kept in memory even if it can't be saved, such as in a read-only install
+    In: boolean value, true if the bundle is shipped with a release
+    Out: none
+    '''
+    def build(self, shipped=False):
+
+        # start from an empty bundle
+        self.texts, self.images, self.arrays = {}, {}, {}
+
+        # stamp the bundle
+        self.version = self.BNDL_VER
+        self.shipped = shipped
+
+        # record the sources as they are now
+        self.manifest = self._scanSources()
+
+        # iterate over the sources
+        for file_path in self.manifest.keys():
+
+            # keep the text of JSON files
+            if file_path.endswith('.json'):
+                with open(file_path, 'r') as load_file:
+                    text = load_file.read()
+
+                # leave out files which do not parse, so that reading them fails as usual
+                try:
+                    json.loads(text)
+
+                except ValueError:
+                    continue
+
+                self.texts[file_path] = text
+
+            # keep the arrays of images
+            else:
+                image = cv2.imread(file_path, 0)
+
+                # leave out images which can't be decoded
+                if image is None:
+                    continue
+
+                key = f'image_{len(self.arrays)}'
+                self.images[file_path] = key
+                self.arrays[key] = image
+
+        # save the bundle, if possible
+        try:
+            self._write()
+
+        except OSError:
+            pass
+
+    '''
+    Method for retrieving the parsed contents of a bundled JSON file
+    In: file path
+    Out: parsed file, or None if the file is not bundled
+    '''
+    def readJson(self, file_path):
+
+        # normalise the path the same way as the bundled paths
+        file_path = self._normPath(file_path)
+
+        # skip files not bundled
+        if file_path not in self.texts:
+            return None
+
+        # return freshly parsed contents, so that callers can modify them
+        return json.loads(self.texts[file_path])
+
+    '''
+    Method for retrieving a bundled grayscale image
+    In: file path
+    Out: copy of the image, or None if the image is not bundled
+    '''
+    def readImage(self, file_path):
+
+        # normalise the path the same way as the bundled paths
+        file_path = self._normPath(file_path)
+
+        # skip images not bundled
+        if file_path not in self.images:
+            return None
+
+        # return a copy, so that callers can modify it
+        return self.arrays[self.images[file_path]].copy()
+
+    '''
+    Internal method for listing the sources of the bundle with hashes of their contents
+    Hashes survive copying and zipping the data folder, unlike modification times
+    In: none
+    Out: dictionary of normalised file paths and their content hashes
+    '''
+    def _scanSources(self):
+
+        # prepare empty dictionary
+        manifest = {}
+
+        # folders left out
+        skip = [self._normPath(path) for path in self.SKIP_PATH]
+
+        # iterate over source folders
+        for src_path, extension in self.SRC_PATH.items():
+            for dir_path, dir_names, file_names in os.walk(src_path):
+
+                # skip folders left out, along with their subfolders
+                dir_names[:] = sorted(name for name in dir_names
+                                      if self._normPath(os.path.join(dir_path, name)) not in skip)
+
+                # record files of the extension
+                for file_name in sorted(file_names):
+                    if file_name.endswith(extension):
+                        file_path = self._normPath(os.path.join(dir_path, file_name))
+                        with open(file_path, 'rb') as load_file:
+                            manifest[file_path] = hashlib.sha1(load_file.read()).hexdigest()
+
+        # return the manifest
+        return manifest
+
+    '''
+    Internal method for reading the bundle file
+    In: none
+    Out: none
+    '''
+    def _read(self):
+
+        # read all arrays at once
+        with np.load(self.path, allow_pickle=False) as bundle:
+            arrays = {key: bundle[key] for key in bundle.files}
+
+        # decode the index
+        index = json.loads(arrays.pop('index').tobytes().decode('utf-8'))
+
+        # set the contents
+        self.texts = index['texts']
+        self.images = index['images']
+        self.arrays = arrays
+        self.manifest = index['manifest']
+        self.version = index.get('version')
+        self.shipped = index.get('shipped', False)
+
+    '''
+    Internal method for writing the bundle file
+    The bundle is written to a temporary file and swapped in, so that it is never left half-written
+    In: none
+    Out: none
+    '''
+    def _write(self):
+
+        # encode the index as an array of bytes
+        index = json.dumps({'texts': self.texts, 'images': self.images, 'manifest': self.manifest,
+                            'version': self.version, 'shipped': self.shipped})
+        index = np.frombuffer(index.encode('utf-8'), dtype=np.uint8)
+
+        # write the bundle uncompressed, so that it loads fast
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'wb') as save_file:
+            np.savez(save_file, index=index, **self.arrays)
+
+        os.replace(temp_path, self.path)
+
+    '''
+    Internal helper normalising a file path, so that differently written paths match
+    In: file path
+    Out: normalised file path
+    '''
+    def _normPath(self, file_path):
+        return os.path.normpath(file_path).replace('\\', '/')
@@ -5,6 +5,12 @@ import requests
 A class for reading and managing form data, as well as submitting the data to appropriate
 google forms. Inherits after configurable, but doesn't run default constructor
 Details for all forms should be stored in appropriate .json files
+---
+A hunt is submitted as a batch of counted drops sharing the same details. Forms accepting
+batches get it in a single JSON request; forms taking one row per roll, like google forms,
+name the expand adapter in their file, which posts every roll separately
+Requests are built up front, so that they can be stored until sent, and are sent
+through a single session, so that the connection is reused
 '''
 class DataSender(Configurable):
 
@@ -15,18 +21,25 @@ class DataSender(Configurable):
     FORM_PATH = './data/json/forms'
     # names of expected forms
     FORM_CODE = ['bounty', 'loot']
+    # names of adapters submitting batches, with the default one first
+    ADPT_CODE = ['batch', 'expand']
+    # time to wait for a response, in seconds
+    SND_TIME = 30
 
     def __init__(self):
-        
+
         #  read the forms
         self.forms = self._readForms()
 
+        # session shared by all requests
+        self.session = requests.Session()
+
     '''
-    Method for submitting the data to a given form
+    Method for building the request submitting the data to a given form
     In: data dict, form identifier
-    Out: nothing
+    Out: list with the request, as a JSON-serialisable dict
     '''
-    def submitData(self, data, form_name):
+    def buildData(self, data, form_name):
 
         # retrieve form URL and fields
         form_url = self.forms[form_name]['url']
@@ -44,12 +57,57 @@ class DataSender(Configurable):
             # add an entry to payload
             form_pld[field_id] = data[field_name]
 
+        # return the request posting the payload as form data
+        return [{'url': form_url, 'data': form_pld}]
+
+    '''
+    Method for building the requests submitting a batch of counted drops to a given form,
+    using the adapter of the form
+    In: dict of details shared by the batch, list of counted drops with their rolls, form identifier
+    Out: list of requests, as JSON-serialisable dicts
+    '''
+    def buildBatch(self, details, drops, form_name):
+
+        # expand the batch into one submission per roll, if the form needs it
+        if self.forms[form_name].get('adapter', self.ADPT_CODE[0]) == 'expand':
+            return [request for drop in drops for roll in range(drop['rolls'])
+                            for request in self.buildData({**details, **drop}, form_name)]
+
+        # retrieve form URL and fields
+        form_url = self.forms[form_name]['url']
+        form_fld = self.forms[form_name]['fields']
+
+        # prepare payload for the form, with details and drops keyed by form ids where given
+        form_pld = {form_fld.get(key, key): value for key, value in details.items()}
+        form_pld['drops'] = [{form_fld.get(key, key): value for key, value in drop.items()} for drop in drops]
+
+        # return the request posting the payload as JSON
+        return [{'url': form_url, 'json': form_pld}]
+
+    '''
+    Method for sending a built request; raises an exception if it did not go through
+    In: request, idempotency key of the request
+    Out: nothing
+    '''
+    def send(self, request, key):
+
         # commit the payload and get response
-        response = requests.post(form_url, data=form_pld)
+        response = self.session.post(request['url'], data=request.get('data'), json=request.get('json'),
+                                     headers={'Idempotency-Key': key}, timeout=self.SND_TIME)
 
         # raise an exception is bad response code
+        self._checkResponse(response)
+
+    '''
+    Internal method for checking the response to a submission
+    In: response
+    Out: nothing
+    '''
+    def _checkResponse(self, response):
+
+        # raise an exception is bad response code, carrying the response so that its code can be checked
         if response.status_code != 200:
-            raise requests.HTTPError(f'Invalid response code {response.status_code} when submitting {form_name}')
+            raise requests.HTTPError(f'Invalid response code {response.status_code}', response=response)
 
     '''
     Internal wrapper method for loading form data into memory
@@ -67,5 +125,9 @@ class DataSender(Configurable):
             # read a given form and add it ton the dict
             form_dict[form] = self.readFile(f'{self.FORM_PATH}/{form}.json')
 
+            # check the adapter of the form, if given
+            if form_dict[form].get('adapter', self.ADPT_CODE[0]) not in self.ADPT_CODE:
+                raise ValueError(f'adapter has to be one of {self.ADPT_CODE}; in {self.FORM_PATH}/{form}.json')
+
         # return the filled dictionary
-        return form_dict
\ No newline at end of file
+        return form_dict
@@ -0,0 +1,246 @@
+import sqlite3
+import time
+
+'''
+A class keeping every submitted hunt, its drops and every bounty in a local SQLite database
+Data is written alongside its submission, so that it can be queried locally instead of
+exporting the spreadsheet the forms fill in. Hunts are indexed by behemoth, threat, tier,
+patch and user, and drops by the hunt they come from
+Totals of hunts and drops are kept up to date per combination of those columns as data is
+written, so that statistics over hundreds of thousands of hunts are summed up from a few
+thousand rows within milliseconds, instead of aggregating every drop
+'''
+class DataStore:
+
+    #
+    # CLASS VARIABLES
+    #
+    # path to the database
+    STR_PATH = './logging/data/scrapless.sqlite'
+
+    # columns hunts and bounties can be filtered by
+    HUNT_FLTR = ['behemoth', 'threat', 'tier', 'patch', 'user']
+    BNTY_FLTR = ['rarity', 'patch', 'user']
+
+    # schema of the database
+    STR_SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS hunts (
+            id INTEGER PRIMARY KEY,
+            created REAL NOT NULL,
+            user TEXT, patch TEXT, behemoth TEXT, threat INTEGER, tier TEXT,
+            type TEXT, deaths INTEGER, elite INTEGER, time TEXT
+        );
+        CREATE TABLE IF NOT EXISTS drops (
+            id INTEGER PRIMARY KEY,
+            hunt_id INTEGER NOT NULL REFERENCES hunts(id),
+            name TEXT NOT NULL, rarity TEXT, count INTEGER, rolls INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS bounties (
+            id INTEGER PRIMARY KEY,
+            created REAL NOT NULL,
+            user TEXT, patch TEXT, rarity TEXT, value INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS hunts_behemoth ON hunts(behemoth, threat);
+        CREATE INDEX IF NOT EXISTS hunts_threat ON hunts(threat);
+        CREATE INDEX IF NOT EXISTS hunts_tier ON hunts(tier);
+        CREATE INDEX IF NOT EXISTS hunts_patch ON hunts(patch);
+        CREATE INDEX IF NOT EXISTS hunts_user ON hunts(user);
+        CREATE TABLE IF NOT EXISTS hunt_totals (
+            behemoth TEXT NOT NULL, threat INTEGER NOT NULL, tier TEXT NOT NULL,
+            patch TEXT NOT NULL, user TEXT NOT NULL, hunts INTEGER NOT NULL,
+            PRIMARY KEY (behemoth, threat, tier, patch, user)
+        );
+        CREATE TABLE IF NOT EXISTS drop_totals (
+            behemoth TEXT NOT NULL, threat INTEGER NOT NULL, tier TEXT NOT NULL,
+            patch TEXT NOT NULL, user TEXT NOT NULL, name TEXT NOT NULL, rarity TEXT NOT NULL,
+            hunts_with INTEGER NOT NULL, rolls INTEGER NOT NULL, count INTEGER NOT NULL,
+            PRIMARY KEY (behemoth, threat, tier, patch, user, name, rarity)
+        );
+        CREATE INDEX IF NOT EXISTS drops_hunt ON drops(hunt_id);
+        CREATE INDEX IF NOT EXISTS bounties_rarity ON bounties(rarity);
+        CREATE INDEX IF NOT EXISTS bounties_patch ON bounties(patch);
+        CREATE INDEX IF NOT EXISTS bounties_user ON bounties(user);
+    '''
+
+    '''
+    Constructor opening the database, creating the tables if needed
+    In: path to the database
+    '''
+    def __init__(self, path=STR_PATH):
+
+        # path to the database
+        self.path = path
+
+        # open the database
+        self.conn = sqlite3.connect(self.path)
+
+        # create the tables and indexes if not done yet
+        with self.conn:
+            self.conn.executescript(self.STR_SCHEMA)
+
+    '''
+    Method for storing a hunt along with its drops, updating the totals
+    In: dictionary of hunt data, list of counted drops
+    Out: identifier of the stored hunt
+    '''
+    def addHunt(self, hunt, drops):
+
+        # columns the totals are kept by, with missing values stored as empty
+        key = (hunt.get('behemoth') or '', hunt.get('threat') or 0, hunt.get('tier') or '',
+               hunt.get('patch') or '', hunt.get('user') or '')
+
+        # merge drops appearing in more than one line, summing their rolls and counts
+        totals = {}
+        for drop in drops:
+            rolls, count = totals.get((drop['name'], drop['rarity'] or ''), (0, 0))
+            totals[(drop['name'], drop['rarity'] or '')] = (rolls + drop['rolls'], count + drop['rolls'] * drop['count'])
+
+        # store the hunt, its drops and the totals together
+        with self.conn:
+
+            cursor = self.conn.execute(
+                'INSERT INTO hunts (created, user, patch, behemoth, threat, tier, type, deaths, elite, time) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (time.time(), hunt.get('user'), hunt.get('patch'), hunt.get('behemoth'), hunt.get('threat'),
+                 hunt.get('tier'), hunt.get('type'), hunt.get('deaths'), hunt.get('elite'), hunt.get('time')))
+
+            self.conn.executemany('INSERT INTO drops (hunt_id, name, rarity, count, rolls) VALUES (?, ?, ?, ?, ?)',
+                                  [(cursor.lastrowid, drop['name'], drop['rarity'], drop['count'], drop['rolls'])
+                                   for drop in drops])
+
+            # count the hunt
+            self.conn.execute('INSERT INTO hunt_totals (behemoth, threat, tier, patch, user, hunts) '
+                              'VALUES (?, ?, ?, ?, ?, 1) ON CONFLICT (behemoth, threat, tier, patch, user) '
+                              'DO UPDATE SET hunts = hunts + 1', key)
+
+            # count its drops
+            self.conn.executemany(
+                'INSERT INTO drop_totals (behemoth, threat, tier, patch, user, name, rarity, hunts_with, rolls, count) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?) ON CONFLICT (behemoth, threat, tier, patch, user, name, rarity) '
+                'DO UPDATE SET hunts_with = hunts_with + 1, '
+                'rolls = rolls + excluded.rolls, count = count + excluded.count',
+                [(*key, name, rarity, rolls, count) for (name, rarity), (rolls, count) in totals.items()])
+
+        # return the identifier of the hunt
+        return cursor.lastrowid
+
+    '''
+    Method for storing a bounty
+    In: dictionary of bounty data
+    Out: identifier of the stored bounty
+    '''
+    def addBounty(self, bounty):
+
+        # store the bounty
+        with self.conn:
+            cursor = self.conn.execute('INSERT INTO bounties (created, user, patch, rarity, value) VALUES (?, ?, ?, ?, ?)',
+                                       (time.time(), bounty.get('user'), bounty.get('patch'), bounty.get('rarity'),
+                                        int(bounty['value']) if 'value' in bounty else None))
+
+        # return the identifier of the bounty
+        return cursor.lastrowid
+
+    '''
+    Method for counting stored hunts
+    In: optional filters by behemoth, threat, tier, patch and user
+    Out: number of hunts
+    '''
+    def countHunts(self, **filters):
+
+        # build the filter
+        where, params = self._where(filters, self.HUNT_FLTR)
+
+        # return the count
+        return self.conn.execute(f'SELECT COALESCE(SUM(hunts), 0) FROM hunt_totals {where}', params).fetchone()[0]
+
+    '''
+    Method for computing drop statistics of stored hunts
+    In: optional filters by behemoth, threat, tier, patch and user
+    Out: list of dictionaries with name and rarity of every drop, number of hunts it dropped in,
+         number of rolls it took, total count dropped, and number of hunts matching the filters
+    '''
+    def dropStats(self, **filters):
+
+        # build the filter
+        where, params = self._where(filters, self.HUNT_FLTR)
+
+        # count the hunts matching the filters
+        hunts = self.countHunts(**filters)
+
+        # sum up the totals of drops of those hunts
+        rows = self.conn.execute(f'SELECT name, rarity, SUM(hunts_with), SUM(rolls), SUM(count) FROM drop_totals {where} '
+                                 'GROUP BY name, rarity ORDER BY SUM(rolls) DESC, name', params).fetchall()
+
+        # return the statistics
+        return [{'name': name, 'rarity': rarity, 'hunts_with': hunts_with, 'rolls': rolls, 'count': count,
+                 'hunts': hunts} for name, rarity, hunts_with, rolls, count in rows]
+
+    '''
+    Method for computing bounty statistics
+    In: optional filters by rarity, patch and user
+    Out: list of dictionaries with rarity, number of bounties and their average value
+    '''
+    def bountyStats(self, **filters):
+
+        # build the filter
+        where, params = self._where(filters, self.BNTY_FLTR)
+
+        # aggregate the bounties
+        rows = self.conn.execute(f'SELECT rarity, COUNT(*), AVG(value) FROM bounties {where} '
+                                 'GROUP BY rarity ORDER BY COUNT(*) DESC', params).fetchall()
+
+        # return the statistics
+        return [{'rarity': rarity, 'bounties': bounties, 'value': value} for rarity, bounties, value in rows]
+
+    '''
+    Method for reading the columns of every stored hunt which statistics are kept by
+    In: none
+    Out: list of (id, behemoth, tier, patch) rows, ordered by id; missing values as empty
+    '''
+    def readHunts(self):
+        return self.conn.execute("SELECT id, COALESCE(behemoth, ''), COALESCE(tier, ''), COALESCE(patch, '') "
+                                 'FROM hunts ORDER BY id').fetchall()
+
+    '''
+    Method for reading the rarity and rolls of every stored drop
+    In: none
+    Out: list of (hunt id, rarity, rolls) rows; missing rarities as empty
+    '''
+    def readDrops(self):
+        return self.conn.execute("SELECT hunt_id, COALESCE(rarity, ''), rolls FROM drops").fetchall()
+
+    '''
+    Method for closing the database
+    In: none
+    Out: none
+    '''
+    def close(self):
+        self.conn.close()
+
+    '''
+    Internal method for building the filter of a query
+    Raises an exception for columns which can't be filtered by
+    In: dictionary of columns and values, None standing for no filter; list of allowed columns
+    Out: WHERE clause, list of its parameters
+    '''
+    def _where(self, filters, allowed):
+
+        # prepare empty lists for conditions and parameters
+        conds, params = [], []
+
+        # iterate over the filters given
+        for column, value in filters.items():
+
+            # skip filters not given
+            if value is None:
+                continue
+
+            # only allowed columns can be put in the query
+            if column not in allowed:
+                raise KeyError(f'can\'t filter by {column}; expected one of {allowed}')
+
+            conds.append(f'{column} = ?')
+            params.append(value)
+
+        # return the clause
+        return ('WHERE ' + ' AND '.join(conds)) if len(conds) > 0 else '', params
@@ -0,0 +1,370 @@
+import os
+import re
+import cv2
+import threading
+
+import numpy as np
+
+'''
+A class for reading short fixed-font numeric fields without tesseract
+Glyphs are segmented out of a thresholded slice with connected components, normalised
+to a common size, and classified against glyph templates stored under logging/data/digits,
+all at once with a single matrix product
+Templates are learned from tesseract reads which passed the validation of the field: a glyph
+becomes a template once tesseract has read it as the same character several times, so that
+a single misread is not learned
+Every so often a confident read is checked with tesseract as well; a template which tesseract
+reads as another character several times in a row was learned from a repeated misread, and is
+dropped to be learned again
+'''
+class DigitReader:
+
+    #
+    # CLASS VARIABLES
+    #
+    # path to the folder with glyph templates, learned at runtime and kept out of the installed data
+    LRN_PATH = './logging/data/digits'
+
+    # file names of characters which can't be used in file names
+    CHR_NAME = {':': 'colon', '.': 'dot'}
+
+    # size glyphs are normalised to, as width and height
+    GLY_SIZE = (12, 18)
+
+    # smallest area, in pixels, of a component kept as part of a glyph
+    MIN_AREA = 3
+
+    # tolerances of glyph shape when matched against a template
+    ASP_TOLR = 0.35
+    HGT_TOLR = 0.25
+
+    # agreeing tesseract reads needed to learn a template
+    LRN_HITS = 3
+
+    # similarity above which two glyphs are considered the same
+    LRN_SIMI = 0.9
+
+    # number of confident reads per read checked with tesseract
+    AUD_RATE = 10
+
+    def __init__(self, field):
+
+        # name of the field, which is also the name of its template folder
+        self.field = field
+        self.path = f'{self.LRN_PATH}/{field}'
+
+        # lock guarding templates, as fields are read from multiple threads
+        self.lock = threading.Lock()
+
+        # template characters, vectors and shapes
+        self.chars = []
+        self.vectors = np.zeros((0, self.GLY_SIZE[0] * self.GLY_SIZE[1]), dtype=np.float32)
+        self.shapes = np.zeros((0, 2), dtype=np.float32)
+
+        # glyphs awaiting enough agreeing reads to become templates, by character
+        self.candidates = {}
+
+        # disagreeing reads in a row of templates, by character, and confident reads since the last check
+        self.disputes = {}
+        self.reads = 0
+
+        # load templates learned so far
+        self._loadTemplates()
+
+    '''
+    Method for recognising the text of a thresholded slice
+    In: binary image with bright text on dark background
+    Out: recognised text, confidence between 0 and 1
+    '''
+    def recognise(self, binary):
+
+        # segment the glyphs
+        glyphs = self._segment(binary)
+
+        with self.lock:
+
+            # nothing can be recognised without glyphs or templates
+            if len(glyphs) == 0 or len(self.chars) == 0:
+                return '', 0.0
+
+            # describe all glyphs at once
+            vectors = np.stack([vector for vector, shape in glyphs])
+            shapes = np.array([shape for vector, shape in glyphs], dtype=np.float32)
+
+            # score every glyph against every template
+            scores = vectors @ self.vectors.T
+
+            # rule out templates of a different shape
+            aspect_diff = np.abs(shapes[:, None, 0] - self.shapes[None, :, 0])
+            height_diff = np.abs(shapes[:, None, 1] - self.shapes[None, :, 1])
+            scores[(aspect_diff > self.ASP_TOLR) | (height_diff > self.HGT_TOLR)] = -1.0
+
+            # pick the best template for every glyph
+            best = np.argmax(scores, axis=1)
+            best_scores = scores[np.arange(len(glyphs)), best]
+
+            # compose the text
+            text = ''.join(self.chars[i] for i in best)
+
+        # the text is only as certain as its least certain glyph
+        return text, float(max(best_scores.min(), 0.0))
+
+    '''
+    Method for counting a confident read, telling if it is due to be checked with tesseract
+    In: none
+    Out: boolean value
+    '''
+    def isAuditDue(self):
+
+        with self.lock:
+
+            # count the read
+            self.reads += 1
+
+            # check every so many reads
+            if self.reads >= self.AUD_RATE:
+                self.reads = 0
+                return True
+
+            return False
+
+    '''
+    Method for learning templates from a text read off the slice by other means
+    Only well-formed reads whose characters line up with the segmented glyphs are used;
+    reads must have passed the validation of the field before they are passed on
+    Templates matching a glyph read as another character are disputed, and dropped once
+    disputed by enough reads in a row
+    In: binary image with bright text on dark background, read text, regex of well-formed text
+    Out: none
+    '''
+    def learn(self, binary, text, pattern):
+
+        # skip malformed reads
+        if not re.fullmatch(pattern, text):
+            return
+
+        # segment the glyphs
+        glyphs = self._segment(binary)
+
+        # skip if glyphs do not line up with characters
+        if len(glyphs) != len(text):
+            return
+
+        with self.lock:
+
+            # iterate over characters and their glyphs
+            for index, (char, (vector, shape)) in enumerate(zip(text, glyphs)):
+
+                # check the templates the glyph matches
+                self._checkTemplates(char, vector)
+
+                # skip characters which already have a template
+                if char in self.chars:
+                    continue
+
+                # retrieve the candidate glyph of the character
+                candidate = self.candidates.get(char)
+
+                # start over if the glyph does not agree with the candidate
+                if candidate is None or float(candidate[0] @ vector) < self.LRN_SIMI:
+                    self.candidates[char] = (vector, 1)
+                    continue
+
+                # count the agreeing read
+                hits = candidate[1] + 1
+
+                # promote the candidate once enough reads agreed
+                if hits >= self.LRN_HITS:
+                    self._addTemplate(char, vector, shape)
+                    self._saveTemplate(char, index, binary)
+                    del self.candidates[char]
+
+                # otherwise keep counting
+                else:
+                    self.candidates[char] = (candidate[0], hits)
+
+    '''
+    Internal method for checking templates against a glyph read as a character
+    Templates of other characters matching the glyph are disputed, while the template of
+    the character itself is confirmed; the lock has to be held by the caller
+    In: character read, glyph vector
+    Out: none
+    '''
+    def _checkTemplates(self, char, vector):
+
+        # iterate over templates matching the glyph
+        for other in [self.chars[i] for i in np.flatnonzero(self.vectors @ vector >= self.LRN_SIMI)]:
+
+            # confirm the template of the character
+            if other == char:
+                self.disputes.pop(other, None)
+                continue
+
+            # dispute the template of another character
+            self.disputes[other] = self.disputes.get(other, 0) + 1
+
+            # drop it once disputed by enough reads in a row
+            if self.disputes[other] >= self.LRN_HITS:
+                self._dropTemplate(other)
+
+    '''
+    Internal method for segmenting glyphs out of a thresholded slice
+    Components stacked one above the other are merged into one glyph, so that characters
+    like the colon stay whole; tightly kerned glyphs side by side are kept apart even if
+    their boxes overlap horizontally
+    In: binary image with bright text on dark background
+    Out: list of glyphs as (vector, (aspect, relative height)), ordered left to right
+    '''
+    def _segment(self, binary):
+
+        # label connected components
+        count, labels, stats, centroids = cv2.connectedComponentsWithStats(binary, connectivity=8)
+
+        # keep components big enough, skipping the background
+        boxes = [stats[i, :4] for i in range(1, count) if stats[i, cv2.CC_STAT_AREA] >= self.MIN_AREA]
+
+        # no glyphs if no components
+        if len(boxes) == 0:
+            return []
+
+        # merge stacked components, left to right
+        merged = []
+        for x, y, w, h in sorted(boxes, key=lambda box: box[0]):
+
+            # extend the last glyph if stacked with the component
+            if len(merged) > 0 and self._isStacked(merged[-1], [x, y, x + w, y + h]):
+                x0, y0, x1, y1 = merged[-1]
+                merged[-1] = [x0, min(y0, y), max(x1, x + w), max(y1, y + h)]
+
+            # otherwise start a new glyph
+            else:
+                merged.append([x, y, x + w, y + h])
+
+        # vertical extent of the whole line of text
+        top = min(y0 for x0, y0, x1, y1 in merged)
+        bottom = max(y1 for x0, y0, x1, y1 in merged)
+
+        # describe every glyph within the line, so that its vertical position is kept
+        return [self._describe(binary[top:bottom, x0:x1], y1 - y0) for x0, y0, x1, y1 in merged]
+
+    '''
+    Internal helper checking if two boxes are stacked: overlapping horizontally,
+    while sharing less than half of the height of the shorter one
+    In: two (x0, y0, x1, y1) boxes
+    Out: boolean value
+    '''
+    def _isStacked(self, box_a, box_b):
+
+        # horizontal overlap
+        if min(box_a[2], box_b[2]) <= max(box_a[0], box_b[0]):
+            return False
+
+        # shared height, against the height of the shorter box
+        shared = min(box_a[3], box_b[3]) - max(box_a[1], box_b[1])
+        return shared < 0.5 * min(box_a[3] - box_a[1], box_b[3] - box_b[1])
+
+    '''
+    Internal method for describing a glyph as a normalised vector and its shape
+    In: binary image of the glyph column across the line of text, height of the glyph itself
+    Out: unit vector of the zero-mean glyph, (aspect, relative height)
+    '''
+    def _describe(self, glyph, glyph_height):
+
+        # pad the sides, so that solid glyphs still have some contrast
+        padded = cv2.copyMakeBorder(glyph, 0, 0, 1, 1, cv2.BORDER_CONSTANT, value=0)
+
+        # resize to the common size
+        vector = cv2.resize(padded, self.GLY_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32).ravel()
+
+        # centre and normalise the vector, so that dot products are correlations
+        vector -= vector.mean()
+        norm = np.linalg.norm(vector)
+        vector = vector / norm if norm > 0 else vector
+
+        # describe the shape of the glyph, relative to the line
+        shape = (glyph.shape[1] / glyph.shape[0], glyph_height / glyph.shape[0])
+
+        # return the description
+        return vector, shape
+
+    '''
+    Internal method for adding a template to those in memory
+    In: character, glyph vector, glyph shape
+    Out: none
+    '''
+    def _addTemplate(self, char, vector, shape):
+
+        # append to characters, vectors and shapes
+        self.chars.append(char)
+        self.vectors = np.vstack([self.vectors, vector[None, :]])
+        self.shapes = np.vstack([self.shapes, np.array(shape, dtype=np.float32)[None, :]])
+
+    '''
+    Internal method for dropping the template of a character, from memory and the template folder
+    In: character
+    Out: none
+    '''
+    def _dropTemplate(self, char):
+
+        # remove from characters, vectors and shapes
+        keep = [i for i, other in enumerate(self.chars) if other != char]
+        self.chars = [self.chars[i] for i in keep]
+        self.vectors = self.vectors[keep]
+        self.shapes = self.shapes[keep]
+
+        # forget the disputes
+        self.disputes.pop(char, None)
+
+        # remove the saved template
+        prefix = f'{self.CHR_NAME.get(char, char)}_'
+        if os.path.isdir(self.path):
+            for file_name in os.listdir(self.path):
+                if file_name.startswith(prefix):
+                    os.remove(f'{self.path}/{file_name}')
+
+    '''
+    Internal method for loading templates saved in the template folder
+    Every template is stored as an image of the whole line it was learned from,
+    with the file name listing the characters of the line and the learned one
+    In: none
+    Out: none
+    '''
+    def _loadTemplates(self):
+
+        # nothing to load if the folder does not exist yet
+        if not os.path.isdir(self.path):
+            return
+
+        # reverse mapping of character file names
+        names = {name: char for char, name in self.CHR_NAME.items()}
+
+        # iterate over template files
+        for file_name in sorted(os.listdir(self.path)):
+
+            # skip files which are not templates
+            if not file_name.endswith('.png'):
+                continue
+
+            # file name holds the learned character and index of its glyph
+            char_name, index = file_name[:-4].split('_')[:2]
+            char = names.get(char_name, char_name)
+
+            # read the line image and segment it
+            glyphs = self._segment(cv2.imread(f'{self.path}/{file_name}', 0))
+
+            # add the template if the file is consistent
+            if int(index) < len(glyphs) and char not in self.chars:
+                self._addTemplate(char, *glyphs[int(index)])
+
+    '''
+    Internal method for saving a learned template
+    In: character, index of its glyph, binary image of the line
+    Out: none
+    '''
+    def _saveTemplate(self, char, index, binary):
+
+        # create the folder if it does not exist
+        os.makedirs(self.path, exist_ok=True)
+
+        # save the line under the character name and glyph index
+        cv2.imwrite(f'{self.path}/{self.CHR_NAME.get(char, char)}_{index}.png', binary)
@@ -0,0 +1,298 @@
+import threading
+
+import numpy as np
+
+'''
+A class keeping running drop-rate statistics of hunts
+Counters are kept per behemoth, tier, rarity and patch in numpy arrays: the number of hunts,
+the number of hunts which dropped the rarity, and the number of rolls it took. They are
+updated with every sampled hunt, rebuilt from the local data store in one vectorised pass,
+and turned into drop rates with Wilson confidence intervals on demand
+'''
+class DropStats:
+
+    #
+    # CLASS VARIABLES
+    #
+    # dimensions statistics are kept by
+    DIM_CODE = ['behemoth', 'tier', 'rarity', 'patch']
+
+    # initial capacity of the counters
+    INIT_SIZE = 64
+
+    # z-score of the default confidence level, 95%
+    CONF_Z = 1.96
+
+    def __init__(self):
+
+        # names of values of every dimension, and their codes
+        self.names = {dim: [] for dim in self.DIM_CODE}
+        self.vocabs = {dim: {} for dim in self.DIM_CODE}
+
+        # groups of hunts, by codes of behemoth, tier and patch, their codes and the number of hunts in each
+        self.groups = {}
+        self.group_dims = []
+        self.group_hunts = np.zeros(self.INIT_SIZE, dtype=np.int64)
+
+        # counters, by codes of behemoth, tier, rarity and patch
+        self.keys = {}
+        self.codes = np.zeros((self.INIT_SIZE, len(self.DIM_CODE)), dtype=np.int32)
+        self.key_group = np.zeros(self.INIT_SIZE, dtype=np.int32)
+        self.hunts_with = np.zeros(self.INIT_SIZE, dtype=np.int64)
+        self.rolls = np.zeros(self.INIT_SIZE, dtype=np.int64)
+
+        # counters are updated and read by one thread at a time
+        self.lock = threading.Lock()
+
+    '''
+    Method for counting a sampled hunt in
+    In: dictionary of hunt data, list of counted drops of the hunt
+    Out: none
+    '''
+    def add(self, hunt, drops):
+
+        # sum the rolls of every rarity
+        rarity_rolls = {}
+        for drop in drops:
+            rarity_rolls[drop['rarity'] or ''] = rarity_rolls.get(drop['rarity'] or '', 0) + drop['rolls']
+
+        with self.lock:
+
+            # count the hunt in its group
+            group = self._groupIndex(hunt.get('behemoth') or '', hunt.get('tier') or '', hunt.get('patch') or '')
+            self.group_hunts[group] += 1
+
+            # indices of the counters of the dropped rarities
+            indices = np.array([self._keyIndex(group, rarity) for rarity in rarity_rolls], dtype=np.int64)
+
+            # count the rarities in
+            np.add.at(self.hunts_with, indices, 1)
+            np.add.at(self.rolls, indices, np.array(list(rarity_rolls.values()), dtype=np.int64))
+
+    '''
+    Method for rebuilding the statistics from every hunt in the data store, in one vectorised pass
+    In: data store
+    Out: none
+    '''
+    def recompute(self, store):
+
+        # read the hunts and their drops
+        hunts = store.readHunts()
+        drops = store.readDrops()
+
+        # without hunts, drops stored in the meantime can't be counted
+        if len(hunts) == 0:
+            drops = []
+
+        # split the hunts into columns
+        hunt_ids = np.array([row[0] for row in hunts], dtype=np.int64)
+        values = {dim: np.array([row[i + 1] for row in hunts], dtype=str)
+                  for i, dim in enumerate(['behemoth', 'tier', 'patch'])}
+
+        # find the hunt of every drop, leaving out drops stored after the hunts were read
+        drop_ids = np.array([row[0] for row in drops], dtype=np.int64)
+        drop_hunts = np.minimum(np.searchsorted(hunt_ids, drop_ids), len(hunt_ids) - 1)
+        valid = hunt_ids[drop_hunts] == drop_ids
+
+        # split the drops into columns
+        drop_hunts = drop_hunts[valid]
+        values['rarity'] = np.array([row[1] for row in drops], dtype=str)[valid]
+        drop_rolls = np.array([row[2] for row in drops], dtype=np.int64)[valid]
+
+        # encode the values of every dimension
+        names, codes = {}, {}
+        for dim in self.DIM_CODE:
+            names[dim], codes[dim] = np.unique(values[dim], return_inverse=True)
+
+        # sizes of the tier, patch and rarity vocabularies, for packing codes into single numbers
+        tiers, patches, rarities = (max(len(names[dim]), 1) for dim in ['tier', 'patch', 'rarity'])
+
+        # number the groups of hunts, and count the hunts in each
+        hunt_groups = (codes['behemoth'] * tiers + codes['tier']) * patches + codes['patch']
+        group_codes, hunt_groups, group_hunts = np.unique(hunt_groups, return_inverse=True, return_counts=True)
+
+        # number the counters of rarities within groups
+        key_codes, drop_keys = np.unique(hunt_groups[drop_hunts] * rarities + codes['rarity'], return_inverse=True)
+
+        # sum the rolls, and count the hunts dropping every rarity, counting each hunt once
+        rolls = np.bincount(drop_keys, weights=drop_rolls, minlength=len(key_codes)).astype(np.int64)
+        hunt_keys = np.unique(drop_hunts * len(key_codes) + drop_keys)
+        hunts_with = np.bincount(hunt_keys % max(len(key_codes), 1), minlength=len(key_codes)).astype(np.int64)
+
+        # unpack the codes of groups and counters into dimensions
+        group_dims = np.stack([group_codes // (tiers * patches), group_codes // patches % tiers,
+                               group_codes % patches], axis=1)
+        key_group = key_codes // rarities
+        key_dims = np.stack([group_dims[key_group, 0], group_dims[key_group, 1], key_codes % rarities,
+                             group_dims[key_group, 2]], axis=1)
+
+        with self.lock:
+
+            # replace the vocabularies
+            self.names = {dim: [str(name) for name in names[dim]] for dim in self.DIM_CODE}
+            self.vocabs = {dim: {name: code for code, name in enumerate(self.names[dim])} for dim in self.DIM_CODE}
+
+            # replace the groups
+            self.group_dims = [tuple(int(code) for code in dims) for dims in group_dims]
+            self.groups = {dims: index for index, dims in enumerate(self.group_dims)}
+            self.group_hunts = self._reserve(group_hunts.astype(np.int64), len(group_codes))
+
+            # replace the counters
+            self.keys = {(int(group), int(rarity)): index for index, (group, rarity)
+                         in enumerate(zip(key_group, key_dims[:, 2]))}
+            self.codes = self._reserve(key_dims.astype(np.int32), len(key_codes))
+            self.key_group = self._reserve(key_group.astype(np.int32), len(key_codes))
+            self.hunts_with = self._reserve(hunts_with, len(key_codes))
+            self.rolls = self._reserve(rolls, len(key_codes))
+
+    '''
+    Method for computing drop rates of rarities, with their confidence intervals
+    A rate is the share of hunts in which the rarity dropped; rolls are averaged per hunt
+    In: optional filters by behemoth, tier, rarity and patch, z-score of the confidence level
+    Out: list of dictionaries with behemoth, tier, rarity, patch, number of hunts and of those
+         dropping the rarity, drop rate with the lower and upper end of its interval, rolls per hunt
+    '''
+    def rates(self, behemoth=None, tier=None, rarity=None, patch=None, z=CONF_Z):
+
+        # filters by dimension
+        filters = {'behemoth': behemoth, 'tier': tier, 'rarity': rarity, 'patch': patch}
+
+        with self.lock:
+
+            # number of counters in use
+            size = len(self.keys)
+
+            # select the counters matching the filters
+            mask = np.ones(size, dtype=bool)
+            for column, dim in enumerate(self.DIM_CODE):
+
+                # skip filters not given
+                if filters[dim] is None:
+                    continue
+
+                # nothing matches values never seen
+                if filters[dim] not in self.vocabs[dim]:
+                    return []
+
+                mask &= self.codes[:size, column] == self.vocabs[dim][filters[dim]]
+
+            # gather the counts
+            indices = np.flatnonzero(mask)
+            codes = self.codes[indices]
+            hunts = self.group_hunts[self.key_group[indices]]
+            hunts_with = self.hunts_with[indices]
+            rolls = self.rolls[indices]
+
+            # names of the dimensions
+            names = [[self.names[dim][code] for code in codes[:, column]] for column, dim in enumerate(self.DIM_CODE)]
+
+        # compute the rates and their Wilson score intervals
+        rate, low, high = self._wilson(hunts_with, hunts, z)
+
+        # return the statistics
+        return [{'behemoth': names[0][i], 'tier': names[1][i], 'rarity': names[2][i], 'patch': names[3][i],
+                 'hunts': int(hunts[i]), 'hunts_with': int(hunts_with[i]), 'rate': float(rate[i]),
+                 'low': float(low[i]), 'high': float(high[i]), 'rolls': float(rolls[i] / hunts[i])}
+                for i in range(len(indices))]
+
+    '''
+    Internal method computing rates with their Wilson score intervals
+    In: arrays of successes and of trials, z-score of the confidence level
+    Out: arrays of rates, lower and upper ends of their intervals
+    '''
+    def _wilson(self, successes, trials, z):
+
+        # proportions of successes
+        trials = trials.astype(np.float64)
+        rate = successes / trials
+
+        # centre and half-width of the intervals
+        denom = 1 + z ** 2 / trials
+        centre = (rate + z ** 2 / (2 * trials)) / denom
+        half = z * np.sqrt(rate * (1 - rate) / trials + z ** 2 / (4 * trials ** 2)) / denom
+
+        # return the rates and the intervals, clamped to proportions
+        return rate, np.maximum(centre - half, 0), np.minimum(centre + half, 1)
+
+    '''
+    Internal method for retrieving the code of a value of a dimension, adding it if new
+    In: dimension, value
+    Out: code of the value
+    '''
+    def _code(self, dim, value):
+
+        # add the value if new
+        if value not in self.vocabs[dim]:
+            self.vocabs[dim][value] = len(self.names[dim])
+            self.names[dim].append(value)
+
+        # return the code
+        return self.vocabs[dim][value]
+
+    '''
+    Internal method for retrieving the index of a group of hunts, adding it if new
+    In: behemoth, tier and patch
+    Out: index of the group
+    '''
+    def _groupIndex(self, behemoth, tier, patch):
+
+        # codes of the group
+        key = (self._code('behemoth', behemoth), self._code('tier', tier), self._code('patch', patch))
+
+        # add the group if new, growing the counter if full
+        if key not in self.groups:
+            self.groups[key] = len(self.groups)
+            self.group_dims.append(key)
+            self.group_hunts = self._reserve(self.group_hunts, len(self.groups))
+
+        # return the index
+        return self.groups[key]
+
+    '''
+    Internal method for retrieving the index of the counters of a rarity within a group, adding it if new
+    In: index of the group, rarity
+    Out: index of the counters
+    '''
+    def _keyIndex(self, group, rarity):
+
+        # codes of the counters
+        key = (group, self._code('rarity', rarity))
+
+        # add the counters if new
+        if key not in self.keys:
+
+            index = len(self.keys)
+            self.keys[key] = index
+
+            # grow the counters if full
+            self.codes = self._reserve(self.codes, index + 1)
+            self.key_group = self._reserve(self.key_group, index + 1)
+            self.hunts_with = self._reserve(self.hunts_with, index + 1)
+            self.rolls = self._reserve(self.rolls, index + 1)
+
+            # record the dimensions of the counters
+            behemoth, tier, patch = self.group_dims[group]
+            self.codes[index] = (behemoth, tier, key[1], patch)
+            self.key_group[index] = group
+
+        # return the index
+        return self.keys[key]
+
+    '''
+    Internal helper returning an array with room for at least the given number of rows,
+    doubling its capacity as needed; new rows are zeroed
+    In: array, number of rows needed
+    Out: array of enough capacity
+    '''
+    def _reserve(self, array, size):
+
+        # return the array if big enough
+        if size <= len(array):
+            return array
+
+        # otherwise copy it into a bigger one
+        grown = np.zeros((max(size, 2 * len(array), self.INIT_SIZE), *array.shape[1:]), dtype=array.dtype)
+        grown[:len(array)] = array
+
+        # return the grown array
+        return grown
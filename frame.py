@@ -0,0 +1,146 @@
+import cv2
+
+import numpy as np
+
+'''
+A class wrapping a single captured frame, shared by all readers processing it
+Lazily computes and memoizes slice crops, their grayscale conversions and
+thresholded variants, so each of them is computed at most once per frame
+A frame holds either the whole screen, or only the regions captured for the slices of interest;
+slices are cropped out of the region covering them, and the screen-sized image is composed
+only if asked for, with areas outside of the regions left black
+Cached images are shared and must not be modified in place
+'''
+class Frame:
+
+    '''
+    Constructor of a frame of the whole screen, or of captured regions
+    In: RGB image of the whole screen, or None; identifier of the frame; list of captured
+        (x0, y0, x1, y1) regions with their RGB images, and the shape of the screen, if partial
+    '''
+    def __init__(self, image, frame_id, regions=None, shape=None):
+
+        # the captured RGB image, composed on demand for partial frames
+        self.full = image
+
+        # captured regions and the shape of the screen, for partial frames
+        self.regions = [] if regions is None else regions
+        self.shape = image.shape if image is not None else shape
+
+        # identifier of the frame, increasing with every capture
+        self.frame_id = frame_id
+
+        # memoized images, keyed by kind and slice coordinates
+        self.cache = {}
+
+    '''
+    Screen-sized RGB image of the frame, composed out of the regions for partial frames
+    '''
+    @property
+    def image(self):
+
+        # compose the image if not done yet
+        if self.full is None:
+            self.full = np.zeros(self.shape, dtype=np.uint8)
+            for (x0, y0, x1, y1), region in self.regions:
+                self.full[y0:y1, x0:x1, :] = region
+
+        # return the image
+        return self.full
+
+    '''
+    Method for checking if the slice was captured in the frame
+    In: slice
+    Out: boolean value
+    '''
+    def covers(self, slc):
+        return self.full is not None or self._regionOf(slc) is not None
+
+    '''
+    Method for retrieving the RGB crop of a slice
+    In: slice
+    Out: RGB image of the slice
+    '''
+    def crop(self, slc):
+
+        # key of the cached image
+        key = ('crop', self._sliceKey(slc))
+
+        # slice the image if not done yet
+        if key not in self.cache:
+
+            # region covering the slice, if the frame is partial
+            region = None if self.full is not None else self._regionOf(slc)
+
+            # crop the slice out of the region, in its own coordinates
+            if region is not None:
+                (rx0, ry0, rx1, ry1), image = region
+                self.cache[key] = image[(slc.y0 - ry0):(slc.y1 - ry0), (slc.x0 - rx0):(slc.x1 - rx0)]
+
+            # otherwise out of the whole image
+            else:
+                self.cache[key] = slc.sliceImage(self.image)
+
+        # return the crop
+        return self.cache[key]
+
+    '''
+    Method for retrieving the grayscale version of a slice, or the whole frame
+    In: optional slice
+    Out: grayscale image
+    '''
+    def gray(self, slc=None):
+
+        # key of the cached image
+        key = ('gray', None if slc is None else self._sliceKey(slc))
+
+        # convert the image if not done yet
+        if key not in self.cache:
+            image = self.image if slc is None else self.crop(slc)
+            self.cache[key] = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+
+        # return the grayscale image
+        return self.cache[key]
+
+    '''
+    Method for retrieving the binary thresholded version of a slice
+    In: slice, threshold value
+    Out: binary image
+    '''
+    def threshold(self, slc, thresh_val):
+
+        # key of the cached image
+        key = ('threshold', self._sliceKey(slc), thresh_val)
+
+        # threshold the image if not done yet
+        if key not in self.cache:
+            ret, self.cache[key] = cv2.threshold(self.gray(slc), thresh_val, 255, cv2.THRESH_BINARY)
+
+        # return the thresholded image
+        return self.cache[key]
+
+    '''
+    Internal method finding the captured region covering a slice
+    In: slice
+    Out: region with its image, or None if no region covers the slice
+    '''
+    def _regionOf(self, slc):
+
+        # iterate over the regions
+        for region in self.regions:
+
+            # return the first region containing the slice
+            x0, y0, x1, y1 = region[0]
+            if x0 <= slc.x0 and y0 <= slc.y0 and slc.x1 <= x1 and slc.y1 <= y1:
+                return region
+
+        # none found
+        return None
+
+    '''
+    Internal helper producing a cache key out of slice coordinates
+    In: slice
+    Out: tuple of coordinates
+    '''
+    def _sliceKey(self, slc):
+        return slc.rect
@@ -0,0 +1,243 @@
+import os
+import cv2
+
+import numpy as np
+
+from abc import ABC, abstractmethod
+
+'''
+Base class for sources of frames processed by the application
+A source holds a current frame, which is moved forward with advance()
+and from which any region can be grabbed as an RGB numpy array
+Sources which are not realtime are meant to be processed as fast as possible,
+so the application skips its waits when working with them
+'''
+class FrameSource(ABC):
+
+    # whether the source follows wall-clock time
+    realtime = True
+
+    # whether grabbing a region costs less than grabbing the whole frame
+    region_grab = False
+
+    '''
+    Method for moving the source to its next frame
+    In: none
+    Out: boolean value, false if the source is exhausted
+    '''
+    @abstractmethod
+    def advance(self):
+        pass
+
+    '''
+    Method for grabbing a region of the current frame
+    In: optional (x, y, width, height) region, whole frame if not given
+    Out: RGB numpy array of the region
+    '''
+    @abstractmethod
+    def grab(self, region=None):
+        pass
+
+    '''
+    Method for releasing any resources held by the source
+    '''
+    def close(self):
+        pass
+
+'''
+Source of frames captured live off the main monitor
+Every grab takes a new screenshot, so advancing is not needed
+Screenshots are taken with the optional mss package if installed, which captures only
+the requested region; PyAutoGUI grabs the whole screen and crops it for every region
+'''
+class LiveSource(FrameSource):
+
+    realtime = True
+
+    def __init__(self):
+
+        # prefer mss, falling back to PyAutoGUI if it is not installed
+        # import here, as it is only needed for live capture
+        try:
+            import mss
+            self.mss = mss.mss()
+            self.region_grab = True
+
+        except ImportError:
+            import pyautogui
+            self.mss = None
+            self.pyautogui = pyautogui
+
+    '''
+    Method for moving to the next frame; live screen is always there
+    In: none
+    Out: true
+    '''
+    def advance(self):
+        return True
+
+    '''
+    Method for taking a screenshot of a region of the main monitor
+    In: optional (x, y, width, height) region, whole screen if not given
+    Out: RGB numpy array of the region
+    '''
+    def grab(self, region=None):
+
+        # take the screencap with PyAutoGUI if mss is not available
+        if self.mss is None:
+
+            # take the screencap
+            screencap = self.pyautogui.screenshot(region=region)
+
+            # return the screencap converted to a numpy array
+            return np.asarray(screencap)[:, :, :3]
+
+        # otherwise grab the region, or the whole main monitor, with mss
+        if region is None:
+            screencap = self.mss.grab(self.mss.monitors[1])
+        else:
+            x, y, width, height = region
+            screencap = self.mss.grab({'left': x, 'top': y, 'width': width, 'height': height})
+
+        # return the screencap converted from BGRA to an RGB numpy array
+        return np.ascontiguousarray(np.asarray(screencap)[:, :, 2::-1])
+
+    '''
+    Method for releasing the mss screen grabber
+    '''
+    def close(self):
+        if self.mss is not None:
+            self.mss.close()
+
+'''
+Base class for sources replaying previously recorded frames
+Keeps the current frame in memory and crops the grabbed regions out of it
+'''
+class ReplaySource(FrameSource):
+
+    realtime = False
+    region_grab = True
+
+    def __init__(self):
+
+        # no frame before the first advance
+        self.frame = None
+
+    '''
+    Method for grabbing a region of the current frame
+    In: optional (x, y, width, height) region, whole frame if not given
+    Out: RGB numpy array of the region
+    '''
+    def grab(self, region=None):
+
+        # raise an exception if the source was never advanced
+        if self.frame is None:
+            raise ValueError(f'no frame was read from the source yet')
+
+        # return the whole frame if no region given
+        if region is None:
+            return self.frame
+
+        # otherwise crop the region out
+        x, y, width, height = region
+        return self.frame[y:(y + height), x:(x + width), :]
+
+'''
+Source replaying a folder of screenshots, in the order of their file names
+'''
+class DirectorySource(ReplaySource):
+
+    # extensions of image files read from the folder
+    IMG_EXTS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+    def __init__(self, path):
+
+        # call parent class constructor
+        ReplaySource.__init__(self)
+
+        # raise an exception if the folder is missing
+        if not os.path.isdir(path):
+            raise NotADirectoryError(f'{path} is not a directory')
+
+        # list image files in the folder
+        self.files = sorted(os.path.join(path, name) for name in os.listdir(path)
+                            if name.lower().endswith(self.IMG_EXTS))
+
+        # index of the next file to read
+        self.index = 0
+
+    '''
+    Method for reading the next screenshot from the folder
+    Unreadable files are skipped
+    In: none
+    Out: boolean value, false if no files are left
+    '''
+    def advance(self):
+
+        # keep going until a file is read or none are left
+        while self.index < len(self.files):
+
+            # read the next file
+            image = cv2.imread(self.files[self.index], cv2.IMREAD_COLOR)
+            self.index += 1
+
+            # store it as an RGB frame if read
+            if image is not None:
+                self.frame = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+                return True
+
+        # the folder is exhausted
+        return False
+
+'''
+Source replaying a recorded video file, optionally skipping frames
+to mimic the capture rate of the live application
+'''
+class VideoSource(ReplaySource):
+
+    def __init__(self, path, frame_step=1):
+
+        # call parent class constructor
+        ReplaySource.__init__(self)
+
+        # raise an exception if the file is missing
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f'file {path} is not a file or could not be read')
+
+        # open the video
+        self.video = cv2.VideoCapture(path)
+
+        # raise an exception if it could not be opened
+        if not self.video.isOpened():
+            raise ValueError(f'file {path} could not be opened as a video')
+
+        # how many frames to move forward on every advance
+        self.frame_step = max(int(frame_step), 1)
+
+    '''
+    Method for reading the next frame of the video
+    In: none
+    Out: boolean value, false if the video has ended
+    '''
+    def advance(self):
+
+        # skip the frames in between without decoding them
+        for _ in range(self.frame_step - 1):
+            if not self.video.grab():
+                return False
+
+        # read the frame
+        success, image = self.video.read()
+
+        # store it as an RGB frame if read
+        if success:
+            self.frame = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+        # return the result
+        return success
+
+    '''
+    Method for closing the video file
+    '''
+    def close(self):
+        self.video.release()
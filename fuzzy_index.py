@@ -0,0 +1,143 @@
+from collections import Counter, defaultdict
+
+from fuzzywuzzy import fuzz, utils
+
+'''
+A class for fuzzy matching strings against a closed vocabulary
+Choices are indexed once by their character bigrams and lengths, so that a lookup only
+scores the few choices which could possibly reach the score threshold, instead of all of them
+Returns the same best match as fuzzywuzzy's extractOne with the ratio scorer
+'''
+class FuzzyIndex:
+
+    #
+    # CLASS VARIABLES
+    #
+    # length of indexed character grams
+    GRM_SIZE = 2
+
+    '''
+    Constructor building the index
+    In: iterable of allowed strings, name of the vocabulary
+    '''
+    def __init__(self, choices, name=''):
+
+        # name of the vocabulary
+        self.name = name
+
+        # allowed strings, in their original order, and for exact lookups
+        self.choices = list(choices)
+        self.exact = frozenset(self.choices)
+
+        # strings as compared by the scorer
+        self.processed = [utils.full_process(choice) for choice in self.choices]
+
+        # indices of choices by their length
+        self.lengths = defaultdict(list)
+
+        # indices of choices and number of occurences, by gram
+        self.postings = defaultdict(list)
+
+        # iterate over processed choices
+        for index, processed in enumerate(self.processed):
+
+            # index the length
+            self.lengths[len(processed)].append(index)
+
+            # index the grams
+            for gram, count in self._grams(processed).items():
+                self.postings[gram].append((index, count))
+
+    '''
+    Method for checking if a string is exactly one of the allowed strings
+    In: string
+    Out: boolean value
+    '''
+    def __contains__(self, string):
+        return string in self.exact
+
+    '''
+    Method for finding the best match of a string among the allowed strings
+    In: string, score threshold for similarity
+    Out: the best match found, or empty string if not met the threshold
+    '''
+    def match(self, string, score_threshold):
+
+        # process the string the same way as the choices
+        processed = utils.full_process(string)
+
+        # best score and match found so far
+        best_score, best_match = -1, ''
+
+        # score the candidates in their original order, keeping the first best one
+        for index in self._candidates(processed, score_threshold):
+
+            score = fuzz.ratio(processed, self.processed[index])
+
+            if score >= score_threshold and score > best_score:
+                best_score, best_match = score, self.choices[index]
+
+        # return the match
+        return best_match
+
+    '''
+    Internal method for selecting the choices which could reach the score threshold
+    In: processed string, score threshold
+    Out: sorted list of indices of choices
+    '''
+    def _candidates(self, processed, score_threshold):
+
+        # length of the string
+        length = len(processed)
+
+        # lowest unrounded score rounding up to the threshold
+        lowest = score_threshold - 0.5 - 1e-9
+
+        # count grams shared with every choice
+        common = defaultdict(int)
+        for gram, count in self._grams(processed).items():
+            for index, choice_count in self.postings.get(gram, ()):
+                common[index] += min(count, choice_count)
+
+        # keep choices sharing grams, if they share enough of them
+        candidates = {index for index, shared in common.items()
+                      if self._maxScore(length, len(self.processed[index]), shared) >= lowest}
+
+        # keep all choices of lengths which could reach the threshold without sharing grams
+        for choice_length, indices in self.lengths.items():
+            if self._maxScore(length, choice_length, 0) >= lowest:
+                candidates.update(indices)
+
+        # return the candidates in original order
+        return sorted(candidates)
+
+    '''
+    Internal method for computing the highest ratio score two strings could have
+    Every edit destroys at most as many shared grams as the length of a gram, bounding
+    from below the number of edits, and so from above the longest common subsequence
+    In: length of either string, number of grams they share
+    Out: upper bound of the score, before rounding
+    '''
+    def _maxScore(self, length, choice_length, shared):
+
+        # equal empty strings score full marks
+        total = length + choice_length
+        if total == 0:
+            return 100
+
+        # least number of edits between the strings
+        edits = max(0, -(-(max(length, choice_length) - self.GRM_SIZE + 1 - shared) // self.GRM_SIZE))
+
+        # longest common subsequence possible, as every edit costs at most one insertion and deletion
+        common = min(length, choice_length, (total - edits) / 2)
+
+        # return the score
+        return 200 * common / total
+
+    '''
+    Internal method for counting the grams of a string
+    In: string
+    Out: counter of grams
+    '''
+    def _grams(self, string):
+        return Counter(string[i:i + self.GRM_SIZE] for i in range(len(string) - self.GRM_SIZE + 1))
@@ -0,0 +1,177 @@
+import sys
+import threading
+
+from bisect import bisect_right
+from types import MappingProxyType
+
+from configurable import Configurable
+from fuzzy_index import FuzzyIndex
+
+'''
+A class holding the game data shared by all readers
+Hunts, tiers, escalations and drops are read once per process and kept in read-only
+structures with their names interned, along with the lookup indexes built out of them:
+threats of every hunt as sets, tiers as a sorted list of threat intervals, the list
+of escalation names, and fuzzy indexes of the names read off the screen
+---
+Inherits after Configurable to grant access to readFile
+'''
+class GameCatalog(Configurable):
+
+    #
+    # CLASS VARIABLES
+    #
+    # path to valid hunt file
+    HUNT_PATH = './data/json/huntdata/hunts.json'
+
+    # path to hunt tiers
+    TIER_PATH = './data/json/huntdata/tiers.json'
+
+    # path to escalation tiers
+    ESC_PATH = './data/json/huntdata/escalation_tiers.json'
+
+    # path to elements
+    ELEM_PATH = './data/json/huntdata/elements.json'
+
+    # paths related to item drops
+    CELL_PATH = './data/json/drops/cells.json'
+    ORBS_PATH = './data/json/drops/orbs.json'
+    DROP_PTH = './data/json/drops/behemoth.json'
+
+    # catalog shared by the whole application, built on first use
+    shared_catalog = None
+    shared_lock = threading.Lock()
+
+    def __init__(self):
+
+        # load valid hunts, with the set of threats of every hunt
+        self.hunts = self._freeze({behemoth: frozenset(threats)
+                                   for behemoth, threats in self.readFile(self.HUNT_PATH).items()})
+
+        # load hunt tiers as threat intervals sorted by their lower end
+        self.tier_lowers, self.tier_uppers, self.tier_names = self._readTiers()
+
+        # load elements and escalation tiers
+        self.elements = tuple(self._intern(self.readKey('Elements', self.readFile(self.ELEM_PATH), self.ELEM_PATH)))
+        self.esca_tiers = tuple(self._intern(self.readKey('Tiers', self.readFile(self.ESC_PATH), self.ESC_PATH)))
+
+        # combine tiers of escalations with elements
+        self.escal_names = tuple(sys.intern(f'{elem} {tier}') for elem in self.elements for tier in self.esca_tiers)
+
+        # load behemoth drops, orbs and cells
+        self.drops = self._freeze(self.readFile(self.DROP_PTH))
+        self.orbs = self._freeze(self.readFile(self.ORBS_PATH))
+        self.cells = self._freeze(self.readFile(self.CELL_PATH))
+
+        # index the names for fuzzy matching
+        self.hunt_index = FuzzyIndex(self.hunts.keys(), 'lobby/hunts')
+        self.loot_hunt_index = FuzzyIndex(self.drops.keys(), 'loot/hunts')
+        self.escal_index = FuzzyIndex(self.escal_names, 'escalations')
+        self.orb_index = FuzzyIndex(self.orbs.keys(), 'loot/orbs')
+        self.cell_index = FuzzyIndex(self.cells.keys(), 'loot/cells')
+
+        # fuzzy indexes of words among behemoth names, by the extra words allowed
+        self.word_indexes = {}
+        self.word_lock = threading.Lock()
+
+    '''
+    Class method for retrieving the catalog shared by the whole application
+    In: none
+    Out: game catalog
+    '''
+    @classmethod
+    def shared(cls):
+
+        with cls.shared_lock:
+
+            # build the catalog if not done yet
+            if cls.shared_catalog is None:
+                cls.shared_catalog = cls()
+
+            # return the catalog
+            return cls.shared_catalog
+
+    '''
+    Method for retrieving the hunt tier of a threat level; raises an exception if not found
+    In: threat level
+    Out: hunt tier
+    '''
+    def tierOf(self, threat):
+
+        # find the last interval starting at or below the threat
+        index = bisect_right(self.tier_lowers, threat) - 1
+
+        # return the tier if the threat lies within the interval
+        if index >= 0 and threat <= self.tier_uppers[index]:
+            return self.tier_names[index]
+
+        # if no tier was viable, raise an exception
+        raise ValueError(f'Invalid threat value of {threat}')
+
+    '''
+    Method for retrieving the fuzzy index of words which may appear among behemoth names
+    Indexes are built on first use and kept for later; each is named after the screen it is used on,
+    so that corrections learned for one vocabulary are not applied to another
+    In: tuple of words allowed besides the names of hunts, name of the index
+    Out: fuzzy index
+    '''
+    def wordIndex(self, extra_words, name):
+
+        with self.word_lock:
+
+            # build the index if not done yet
+            if (name, extra_words) not in self.word_indexes:
+                self.word_indexes[(name, extra_words)] = FuzzyIndex([*self.hunts.keys(), *extra_words], name)
+
+            # return the index
+            return self.word_indexes[(name, extra_words)]
+
+    '''
+    Internal method for reading hunt tiers as sorted threat intervals
+    Raises an exception if the intervals overlap, as threats have to map to a single tier
+    In: none
+    Out: tuples of lower ends, upper ends and names of the tiers
+    '''
+    def _readTiers(self):
+
+        # read the tiers, sorted by the lower end of their intervals
+        tiers = sorted(((tier['lower'], tier['upper'], sys.intern(name))
+                        for name, tier in self.readFile(self.TIER_PATH).items()), key=lambda tier: tier[0])
+
+        # check that the intervals do not overlap
+        for (lower, upper, name), (next_lower, next_upper, next_name) in zip(tiers, tiers[1:]):
+            if next_lower <= upper:
+                raise ValueError(f'tiers {name} and {next_name} overlap; in {self.TIER_PATH}')
+
+        # return the intervals
+        return tuple(zip(*tiers)) if len(tiers) > 0 else ((), (), ())
+
+    '''
+    Internal helper interning a list of names
+    In: list of strings
+    Out: list of interned strings
+    '''
+    def _intern(self, names):
+        return [sys.intern(name) for name in names]
+
+    '''
+    Internal helper turning parsed JSON into read-only structures with interned keys
+    In: parsed JSON value
+    Out: read-only value
+    '''
+    def _freeze(self, value):
+
+        # freeze dictionaries, interning their keys
+        if isinstance(value, dict):
+            return MappingProxyType({sys.intern(key): self._freeze(item) for key, item in value.items()})
+
+        # freeze lists
+        if isinstance(value, list):
+            return tuple(self._freeze(item) for item in value)
+
+        # intern strings
+        if isinstance(value, str):
+            return sys.intern(value)
+
+        # leave anything else as is
+        return value
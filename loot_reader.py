@@ -1,9 +1,13 @@
 import re
+import threading
 
 from itertools import chain
 
 from reader import Reader
 from slice import Slice
+from digit_reader import DigitReader
+from game_catalog import GameCatalog
+from loot_resolver import LootResolver
 
 '''
 Specialised class for reading specifically the loot screen, and recognising
@@ -17,20 +21,16 @@ class LootReader(Reader):
     # path to the folder with screen slices
     SLC_PATH = './data/json/screen/loot'
     # expected slices to be found
-    SLC_CODE = ['base_drops', 'behemoth', 'bonus_drops', 'deaths', 'detect', 'elite', 'time', 'trial']
+    SLC_CODE = ['base_drops', 'behemoth', 'bonus_drops', 'deaths', 'elite', 'time']
+    # slices read with OCR, with profiles in the ocr subfolder
+    OCR_CODE = ['base_drops', 'behemoth', 'bonus_drops', 'deaths', 'time']
 
     # path to the folder with screen slices
     TRGT_PATH = './data/targets/loot'
     # expected targets to be found
-    TRGT_CODE = ['breaks', 'chest', 'detect', 'elite', 'trial', 'token']
-
-    # path to valid hunt file
-    HUNT_PATH = './data/json/huntdata/hunts.json'
-
-    # paths related to item drops
-    CELL_PATH = './data/json/drops/cells.json'
-    ORBS_PATH = './data/json/drops/orbs.json'
-    DROP_PTH = './data/json/drops/behemoth.json'
+    TRGT_CODE = ['breaks', 'chest', 'elite', 'token']
+    # pyramid levels used when searching for targets in big slices
+    TRGT_LVLS = {'breaks': 2, 'chest': 2}
 
     # path to OCR confusion dictionary
     CNFS_PATH = './data/json/ocr/confusion.json'
@@ -43,98 +43,88 @@ class LootReader(Reader):
         # load target images
         self.targets = self._setTargets(self.TRGT_PATH, self.TRGT_CODE)
 
-        # load behemoth drops
-        self.drops = self.readFile(self.DROP_PTH)
+        # load OCR profiles of the fields read off the screen
+        self.profiles = self._setProfiles(self.SLC_PATH, self.OCR_CODE)
+
+        # initialise the recogniser of hunt time digits
+        self.time_digits = DigitReader('time')
 
-        # load orbs
-        self.orbs = self.readFile(self.ORBS_PATH)
+        # retrieve the game data shared by all readers
+        self.catalog = GameCatalog.shared()
 
-        # load cell names
-        self.cells = self.readFile(self.CELL_PATH)
+        # behemoth drops, orbs and cell names
+        self.drops = self.catalog.drops
+        self.orbs = self.catalog.orbs
+        self.cells = self.catalog.cells
 
         # load OCR confusion
         self.ocr_confuse = self.readFile(self.CNFS_PATH)
 
-        # load vocabulary of valid words to appear among behemoth names
-        self.behe_vocab = list(self.readFile(self.HUNT_PATH).keys())
-        self.behe_vocab.extend(['Defeated', 'Patrol'])
-
-    '''
-    Method for detecting the relevant screen, wraps the detectFromSlice wrapper
-    Uses in-class slice and target, with an image output
-    Returns a boolean value
-    '''
-    def detectLootScreen(self, image):
-
-        # return the detection value
-        return self.detectFromSlice(image, 'detect')
-
-    '''
-    Wrapper method for detecting the trial end screen using detectFromSlice
-    Uses in-class slice and targeg
-    In: image of the loot screen
-    Out: boolean value
-    '''
-    def detectTrialEnd(self, image):
+        # indexes of valid words to appear among behemoth names, and of behemoths with drops
+        self.behe_index = self.catalog.wordIndex(('Defeated', 'Patrol'), 'loot/words')
+        self.hunt_index = self.catalog.loot_hunt_index
 
-        # return the detection value
-        return self.detectFromSlice(image, 'trial')
+        # resolvers of drops, by behemoth, built on first use
+        self.resolvers = {}
+        self.resolver_lock = threading.Lock()
 
     '''
     Method for reading basic data off the loot screen; these are not the actual drops
-    In: screenshot of the game screen
+    In: captured frame of the game screen
     Out: dictionary of values describing the loot screen
     '''
-    def readScreen(self, image):
+    def readScreen(self, frame):
 
         # prepare empty dictionary for data
         data = {}
 
-        # read lobby screen data
-        data['defeat'], data['behemoth'] = self._readBehemoth(image)
-        data['elite'] = self._detectElite(image)
-        data['deaths'] = self._readDeaths(image)
-        data['time'] = self._readTime(image)
+        # read text fields of the screen in parallel
+        data.update(self.readFields({
+            'behemoth': lambda: self._readBehemoth(frame),
+            'deaths': lambda: self._readDeaths(frame),
+            'time': lambda: self._readTime(frame)
+        }))
+
+        # split defeat out of the behemoth name
+        data['defeat'], data['behemoth'] = data['behemoth']
+
+        # detect the Elite Hunt Pass
+        data['elite'] = self._detectElite(frame)
 
         # return all read data
         return data
 
     '''
     Method for reading full loot data off the screen, ie. all items dropped from the behemoth
-    In: image of the loot screen
+    In: captured frame of the loot screen
     Out: array of dictionary objects describing loot
     '''
-    def readLoot(self, image, behemoth):
+    def readLoot(self, frame, behemoth):
 
         # find location of part break section
-        breaks_img = self.slices['base_drops'].sliceImage(image)
-        if_breaks, breaks_xy = self.detectElement(breaks_img, self.targets['breaks'])
+        breaks_img = frame.gray(self.slices['base_drops'])
+        if_breaks, breaks_xy = self.detectElement(breaks_img, self.targets['breaks'], levels=self.TRGT_LVLS['breaks'])
 
         # find location of patrol bonus section
-        chest_img = self.slices['bonus_drops'].sliceImage(image)
-        if_chest, chest_xy = self.detectElement(chest_img, self.targets['chest'])
+        chest_img = frame.gray(self.slices['bonus_drops'])
+        if_chest, chest_xy = self.detectElement(chest_img, self.targets['chest'], levels=self.TRGT_LVLS['chest'])
 
-        # modify base drops slice accordingly
+        # narrow the base drops down to above the part break section, leaving the shared slice as is
+        base_slice = self.slices['base_drops']
         if if_breaks:
-            base_slice = self.slices['base_drops']
-            base_slice.y1 = base_slice.y0 + breaks_xy[1]
-        else:
-            base_slice = self.slices['base_drops']
+            base_slice = base_slice.sub(y1=breaks_xy[1])
 
-        # modify bonus drops slice accordingly
+        # narrow the bonus drops down to above the patrol bonus section
+        bonus_slice = self.slices['bonus_drops']
         if if_chest:
-            bonus_slice = self.slices['bonus_drops']
-            bonus_slice.y1 = bonus_slice.y0 + chest_xy[1]
-        else:
-            bonus_slice = self.slices['bonus_drops']
+            bonus_slice = bonus_slice.sub(y1=chest_xy[1])
 
-        # get base drops
-        base_img = base_slice.sliceImage(image)
-        base_data = self._readLootSlice(base_img)
-
-        # get bonus drops
-        bonus_img = self.slices['bonus_drops'].sliceImage(image)
-        bonus_data = self._readLootSlice(bonus_img)
+        # get base and bonus drops in parallel
+        drops = self.readFields({
+            'base': lambda: self._readLootSlice(frame, base_slice, self.profiles['base_drops']),
+            'bonus': lambda: self._readLootSlice(frame, bonus_slice, self.profiles['bonus_drops'])
+        })
+        base_data, bonus_data = drops['base'], drops['bonus']
 
         # test drop processing
         base_data = [self._processLootLine(line, behemoth) for line in base_data if line != '']
@@ -149,13 +139,13 @@ class LootReader(Reader):
 
     '''
     Method for detecting if the user owns an Elite Hunt Pass
-    In: screenshot of the loot screen
+    In: captured frame of the loot screen
     Out: boolean value
     '''
-    def _detectElite(self, image):
+    def _detectElite(self, frame):
 
         # return the detection value
-        return self.detectFromSlice(image, 'elite', prec=0.95)
+        return self.detectFromSlice(frame, 'elite', prec=0.95)
 
     '''
     Internal method for processing the drop count
@@ -165,82 +155,84 @@ class LootReader(Reader):
     def _processDropCount(self, line):
 
         # skip the first character in the string
-        drop_count = line[1:]
+        drop_count = raw_count = line[1:]
+
+        # check if the count was corrected before
+        corrected = self.corrections.get('counts', raw_count)
+        if corrected is not None:
+            return int(corrected)
 
         # apply replacement of symbols that OCR tends to get wrong
         for mistake in self.ocr_confuse.keys():
             drop_count = drop_count.replace(mistake, self.ocr_confuse[mistake])
 
+        # convert the count
+        count = int(drop_count)
+
+        # remember the correction, if there was any
+        if drop_count != raw_count:
+            self.corrections.put('counts', raw_count, drop_count)
+
         # return the count
-        return int(drop_count)
+        return count
 
     '''
-    Internal method for processing non-cell drop line
-    In: loot text line, behemoth name
+    Internal method for resolving the name of a drop against everything that may drop
+    from the behemoth: cells for cell lines, the drops of the behemoth and then the orbs otherwise
+    In: drop name read off the line, grade of the cell if the line is one, behemoth name
     Out: drop data
     '''
-    def _processDropLine(self, line, behemoth):
-
-        # empty dict for things
-        line_data = {}
+    def _resolveDrop(self, drop_name, cell_grade, behemoth):
 
-        # match to a behemoth drop first
-        line_data['name'] = self._fuzzyMatch(line, self.drops[behemoth].keys(), score_threshold=80)
+        # retrieve the resolver of the behemoth
+        resolver = self._getResolver(behemoth)
 
-        # if we have a match
-        if line_data['name'] != '':
+        # match the name against candidates of the kinds the line may be, in order of precedence
+        for kind, index in resolver.indexesFor(cell_grade != ''):
 
-            # add rarity
-            line_data['rarity'] = self.drops[behemoth][line_data['name']]
+            # look for a match of the kind
+            match = self._fuzzyMatch(drop_name, index, score_threshold=80)
 
-        # otheriwse check in orbs
-        else:
-
-            # attempt to match with an orb
-            line_data['name'] = self._fuzzyMatch(line, self.orbs.keys(), score_threshold=80)
+            # stop at the first kind matched
+            if match != '':
+                break
 
-            # if we have a match
-            if line_data['name'] != '':
+        # return empty if no match
+        if match == '':
+            return {}
 
-                # add rarity
-                line_data['rarity'] = self.orbs[line_data['name']]
+        # compose the cell name, its rarity depending on the grade
+        if kind == 'cell':
+            return {'name': f'{cell_grade} {match} Cell',
+                    'rarity': 'Rare (Cell)' if cell_grade == '+2' else 'Uncommon (Cell)'
+                    }
 
-        # return drop name as found (or not)
-        return line_data if line_data['name'] != '' else {}
+        # return the drop
+        return {'name': match, 'rarity': resolver.rarityOf(kind, match)}
 
     '''
-    Internal method for processing the cell name
-    In: loot text line
-    Out: cell drop name
+    Internal method for retrieving the resolver of drops of a behemoth
+    Resolvers are built on first use and kept for later hunts
+    In: behemoth name
+    Out: loot resolver
     '''
-    def _processCellLine(self, line):
+    def _getResolver(self, behemoth):
 
-        # cut the line further
-        cell_grade = line.split(' ', 1)[0]
+        # both loot slices are read in parallel
+        with self.resolver_lock:
 
-        # cut out the grade from the name
-        cell_name = line.split(' ', 1)[-1]
-        
-        # cut out the 'Cell' from the name
-        cell_name = cell_name.split(' ')[:-1]
+            # build the resolver if not done yet
+            if behemoth not in self.resolvers:
+                self.resolvers[behemoth] = LootResolver(behemoth, self.drops[behemoth], self.orbs,
+                                                        self.catalog.orb_index, self.catalog.cell_index)
 
-        # turn cell name back into a string
-        cell_name = ' '.join(cell_name)
-
-        # fuzzy match cell name
-        cell_name = self._fuzzyMatch(cell_name, self.cells.keys(), score_threshold=80)
-
-        if cell_name == '':
-            return {}
-        else:
-            return {'name': f'{cell_grade} {cell_name} Cell',
-                    'rarity': 'Rare (Cell)' if cell_grade == '+2' else 'Uncommon (Cell)'
-                    }
+            # return the resolver
+            return self.resolvers[behemoth]
 
     '''
-    Internal method for processing each line of text. Returns a proper drop or empty string
+    Internal method for processing each line of text. Returns a counted drop or nothing
     In: line of loot text
-    Out: empty string or a drop string
+    Out: empty array or array with the counted drop
     '''
     def _processLootLine(self, line, behemoth):
 
@@ -250,13 +242,16 @@ class LootReader(Reader):
             # acquire drop's name
             drop_name = line.split(' ', 1)[-1]
 
-            # fuzzy match differently depending if this is a cell
+            # cut the grade and the 'Cell' off cells
             # check for any of the listed strings, for fine-grained control against
             # OCR mistakes
+            cell_grade = ''
             if any(x in drop_name for x in ['Call', 'Cell']):
-                drop_data = self._processCellLine(drop_name)
-            else:
-                drop_data = self._processDropLine(drop_name, behemoth)
+                cell_grade, drop_name = drop_name.split(' ', 1)[0], drop_name.split(' ', 1)[-1]
+                drop_name = ' '.join(drop_name.split(' ')[:-1])
+
+            # resolve the drop
+            drop_data = self._resolveDrop(drop_name, cell_grade, behemoth)
 
             # if a name found
             if len(drop_data) > 0:
@@ -271,7 +266,7 @@ class LootReader(Reader):
                 drop_data['count'] = drop_count
 
                 # return the data
-                return self._splitDrop(drop_data)
+                return self._countDrop(drop_data)
 
             # otherwise return empty
             else:
@@ -283,23 +278,19 @@ class LootReader(Reader):
 
     '''
     Method for reading the behemoth name and fuzzy-matching it to possible names
-    In: screenshot of the loot screen
+    In: captured frame of the loot screen
     Out: behemoth name
     '''
-    def _readBehemoth(self, image):
-
-        # slice the input image
-        image = self.slices['behemoth'].sliceImage(image)
+    def _readBehemoth(self, frame):
 
         # launch the reader function
-        text = self.readText(image, ocr_config='./data/tesseract/dauntless', thresh_val=100, 
-                            scale_x=6, scale_y=7, border_size=20, invert=True)
+        text = self.readText(frame, self.slices['behemoth'], self.profiles['behemoth'])
 
         # preprocess the behemoth name
         if_defeat, text = self._processBehemothName(text)
 
         # fuzzy match the name
-        text = self._fuzzyMatch(text, self.drops.keys(), 80)
+        text = self._fuzzyMatch(text, self.hunt_index, 80)
 
         # return the read text
         return if_defeat, text
@@ -307,17 +298,13 @@ class LootReader(Reader):
     '''
     Method for reading the text informing about bonus drops; determines death count 
     based on that message
-    In: screenshot of the loot screen
+    In: captured frame of the loot screen
     Out: integer number of deaths
     '''
-    def _readDeaths(self, image):
-
-        # slice the input image
-        image = self.slices['deaths'].sliceImage(image)
+    def _readDeaths(self, frame):
 
         # launch the reader function
-        text = self.readText(image, ocr_config='--psm 13', thresh_val=150, speck_size=1,
-                            scale_x=1, scale_y=1, border_size=10, invert=True)
+        text = self.readText(frame, self.slices['deaths'], self.profiles['deaths'])
 
         # lowercase the text
         text = text.lower()
@@ -330,42 +317,47 @@ class LootReader(Reader):
 
     '''
     Internal method for reading all loot drops from a given slice of the screen
-    In: screen slice
+    In: captured frame of the loot screen, slice to read, OCR profile of the slice
     Out: an array of dictionary loot entries
     '''
-    def _readLootSlice(self, image, debug=False):
+    def _readLootSlice(self, frame, slc, profile):
 
         # read all text from the slice
-        lines = self.readText(image, ocr_config='--psm 11', thresh_val=120, speck_size=1,
-                            scale_x=4, scale_y=5, border_size=10, invert=True, debug=debug)
+        lines = self.readText(frame, slc, profile)
 
         # return the lines
         return lines.splitlines()
 
     '''
     Method for reading the hunt time
-    In: screenshot of the loot screen
+    In: captured frame of the loot screen
     Out: integer number of deaths
     '''
-    def _readTime(self, image):
-
-        # slice the input image
-        image = self.slices['time'].sliceImage(image)
+    def _readTime(self, frame):
 
         # launch the reader function
-        text = self.readText(image, ocr_config='--psm 13 -c tessedit_char_whitelist=0123456789:.',
-                            thresh_val=150, speck_size=1, scale_x=4, scale_y=5, border_size=20, invert=True)
+        text = self.readDigits(frame, self.slices['time'], self.time_digits, r'\d{1,2}:\d{2}([.:]\d{1,3})?',
+                            self.profiles['time'], self._isTime)
 
         # return the value
         return text
 
     '''
-    Internal method for splitting the drops appearing in a single line, according to
-    their rarity
+    Internal method checking if a read hunt time is a valid time, with seconds below a minute
+    In: read text
+    Out: boolean value
+    '''
+    def _isTime(self, text):
+        return int(text.split(':')[1][:2]) < 60
+
+    '''
+    Internal method for counting the rolls behind the drops appearing in a single line,
+    according to their rarity; the stack is kept as a single drop with the count of
+    a single roll and the number of rolls it took
     In: drop data dict
-    Out: array of drop datas
+    Out: array with the counted drop, empty if the stack is smaller than a single roll
     '''
-    def _splitDrop(self, drop_data):
+    def _countDrop(self, drop_data):
 
         # retrieve drop count from line
         line_count = drop_data['count']
@@ -389,5 +381,8 @@ class LootReader(Reader):
             else:
                 raise ValueError(f'Suspiciously big stack of loot. Screenshot saved. Data will not be read')
 
-        # return drop data multiplied by how many rows we really need here
-        return [ drop_data ] * int(line_count / drop_count)
\ No newline at end of file
+        # count the rolls the stack took
+        drop_data['rolls'] = int(line_count / drop_count)
+
+        # return the drop, unless it took no rolls
+        return [ drop_data ] if drop_data['rolls'] > 0 else []
\ No newline at end of file
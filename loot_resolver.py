@@ -0,0 +1,54 @@
+from fuzzy_index import FuzzyIndex
+
+'''
+A class holding everything that may drop from hunting a single behemoth
+Drops of the behemoth, orbs and cells are kept in separate fuzzy indexes, one per kind, so that
+a loot line is only scored against candidates of the kinds it may be: cell lines against cells,
+other lines against the drops of the behemoth first, and the orbs only if no drop matched
+Cells are indexed by their bare names, without the grade and suffix displayed on the loot screen,
+so that the suffix does not inflate their scores; their rarity depends on the grade read off
+the line, so it is not kept with the candidate
+'''
+class LootResolver:
+
+    #
+    # CLASS VARIABLES
+    #
+    # kinds of candidates a line may be, in order of precedence, by whether the line is a cell
+    KIND_ORDER = {True: ['cell'], False: ['drop', 'orb']}
+
+    '''
+    Constructor indexing the drops of the behemoth
+    In: behemoth name, dictionary of behemoth drops and their rarities, dictionary of orbs
+        and their rarities, fuzzy index of orbs, fuzzy index of cells
+    '''
+    def __init__(self, behemoth, drops, orbs, orb_index, cell_index):
+
+        # name of the behemoth
+        self.behemoth = behemoth
+
+        # fuzzy indexes of candidates by kind; orbs and cells are the same for every behemoth
+        self.indexes = {
+            'drop': FuzzyIndex(drops.keys(), f'loot/{behemoth}'),
+            'orb': orb_index,
+            'cell': cell_index
+        }
+
+        # rarities of candidates by kind
+        self.rarities = {'drop': drops, 'orb': orbs, 'cell': {}}
+
+    '''
+    Method for listing the fuzzy indexes a line is matched against, in order of precedence
+    In: boolean value, true if the line is a cell
+    Out: list of (kind, fuzzy index) pairs
+    '''
+    def indexesFor(self, is_cell):
+        return [(kind, self.indexes[kind]) for kind in self.KIND_ORDER[is_cell]]
+
+    '''
+    Method for retrieving the rarity of a matched candidate
+    In: kind of the candidate, matched name
+    Out: rarity, or None for cells
+    '''
+    def rarityOf(self, kind, match):
+        return self.rarities[kind].get(match)
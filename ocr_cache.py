@@ -0,0 +1,113 @@
+import hashlib
+import threading
+
+from collections import OrderedDict
+
+'''
+A class caching OCR results by the content of the pre-processed image
+Screens are re-read several times a second until a valid read is obtained, so the
+same pixels are often OCR'd again; a bounded least-recently-used cache keyed by a hash
+of the final image and OCR config returns those reads instantly
+Keeps hit and miss counters, along with the time spent on misses, to estimate
+how much OCR time is saved
+'''
+class OcrCache:
+
+    #
+    # CLASS VARIABLES
+    #
+    # maximum number of cached reads
+    CCH_SIZE = 256
+
+    def __init__(self):
+
+        # cached reads, ordered from the least recently used
+        self.entries = OrderedDict()
+
+        # lock guarding the cache, as it is used from multiple threads
+        self.lock = threading.Lock()
+
+        # counters
+        self.hits = 0
+        self.misses = 0
+        self.miss_time = 0.0
+
+    '''
+    Method for computing the key of an image and config
+    In: contiguous numpy image, OCR config string, name of the OCR engine
+    Out: key string
+    '''
+    def makeKey(self, image, ocr_config, engine_name=''):
+
+        # hash the shape and the pixels along with the config, reading the pixels in place
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f'{image.shape}|{image.dtype}|{ocr_config}|{engine_name}'.encode())
+        digest.update(memoryview(image))
+
+        # return the key
+        return digest.hexdigest()
+
+    '''
+    Method for retrieving a cached read, counting the hit or miss
+    In: key
+    Out: cached text, or None if not cached
+    '''
+    def get(self, key):
+
+        with self.lock:
+
+            # count a miss if not cached
+            if key not in self.entries:
+                self.misses += 1
+                return None
+
+            # otherwise count a hit and mark the entry as recently used
+            self.hits += 1
+            self.entries.move_to_end(key)
+
+            # return the cached text
+            return self.entries[key]
+
+    '''
+    Method for caching a read, evicting the least recently used reads if full
+    In: key, read text, seconds spent reading it
+    Out: none
+    '''
+    def put(self, key, text, seconds=0.0):
+
+        with self.lock:
+
+            # store the read as the most recently used
+            self.entries[key] = text
+            self.entries.move_to_end(key)
+
+            # account for the time spent on the miss
+            self.miss_time += seconds
+
+            # evict if over the limit
+            while len(self.entries) > self.CCH_SIZE:
+                self.entries.popitem(last=False)
+
+    '''
+    Method for retrieving the counters of the cache
+    In: none
+    Out: dictionary of hits, misses, hit rate, size and estimated seconds saved
+    '''
+    def stats(self):
+
+        with self.lock:
+
+            # total number of lookups
+            lookups = self.hits + self.misses
+
+            # average time of a read, used to estimate the time saved by hits
+            avg_time = self.miss_time / self.misses if self.misses > 0 else 0.0
+
+            # return the counters
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups > 0 else 0.0,
+                'size': len(self.entries),
+                'saved': self.hits * avg_time
+            }
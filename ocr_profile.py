@@ -0,0 +1,120 @@
+import cv2
+import threading
+
+import numpy as np
+
+from configurable import Configurable
+
+'''
+A class describing how a single field is pre-processed and read by OCR
+Settings are read from a JSON file next to the slice files of the screen, and compiled
+into a pipeline working on buffers allocated once, sized after the slice of the field,
+so that reading a field does not allocate intermediate images
+Images produced by the pipeline live in its buffers, so the profile has to stay locked
+for as long as they are used
+---
+Inherits after Configurable for ease of initialisation
+'''
+class OcrProfile(Configurable):
+
+    '''
+    Constructor reading the settings and allocating the buffers
+    In: path to the profile file, slice of the field
+    '''
+    def __init__(self, conf_path, slc):
+
+        # invoke the parent constructor
+        Configurable.__init__(self, conf_path)
+
+        # OCR settings
+        self.ocr_config = self.readKey('ocr_config')
+        self.thresh_val = self.readKey('thresh_val')
+
+        # pre-processing settings
+        self.speck_size = self.readKey('speck_size')
+        self.scale_x = self._readScale('scale_x')
+        self.scale_y = self._readScale('scale_y')
+        self.border_size = self.readKey('border_size')
+        self.shrink_border = self.readKey('shrink_border')
+        self.invert = self.readKey('invert')
+        self.name = self.readKey('name')
+        self.debug = self.readKey('debug')
+
+        # dimensions of the field
+        height = slc.y1 - slc.y0
+        width = slc.x1 - slc.x0
+
+        # buffers of the thresholded and the scaled image, and of the scaled image inverted for trimming
+        self.binary = np.empty((height, width), dtype=np.uint8)
+        self.scaled = np.empty((height * self.scale_y, width * self.scale_x), dtype=np.uint8)
+        self.inverse = np.empty_like(self.scaled)
+
+        # flat buffer the trimmed image is packed into, so that it is contiguous for hashing and reading
+        self.packed = np.empty(self.scaled.size, dtype=np.uint8)
+
+        # lock guarding the buffers
+        self.lock = threading.Lock()
+
+    '''
+    Method for running the pre-processing pipeline over a grayscale image of the field
+    The image may be smaller than the slice, in which case part of the buffers is used
+    The profile has to be locked by the caller until the result is no longer needed
+    In: grayscale image of the field
+    Out: pre-processed image, without the white border, as a view of the buffers
+    '''
+    def prepare(self, gray):
+
+        # check if the image fits the buffers
+        height, width = gray.shape[:2]
+        if height > self.binary.shape[0] or width > self.binary.shape[1]:
+            raise ValueError(f'image of size {width}x{height} does not fit the slice; in {self.conf_path}')
+
+        # threshold the image into the buffer
+        ret, binary = cv2.threshold(gray, self.thresh_val, 255, cv2.THRESH_BINARY,
+                                    dst=self.binary[:height, :width])
+
+        # filter out unexpected pixel speckles
+        cv2.filterSpeckles(binary, 0, self.speck_size, self.speck_size)
+
+        # invert image colours if necessary
+        if self.invert:
+            binary = cv2.bitwise_not(binary, dst=binary)
+
+        # re-scale the image to counteract small natural dimensions
+        scaled = cv2.resize(binary, (width * self.scale_x, height * self.scale_y),
+                            dst=self.scaled[:height * self.scale_y, :width * self.scale_x],
+                            interpolation=cv2.INTER_AREA)
+
+        # return the scaled image, to be trimmed by the reader
+        return scaled
+
+    '''
+    Method for packing a view of the buffers, such as the trimmed image, into a contiguous buffer
+    The profile has to be locked by the caller until the result is no longer needed
+    In: image no larger than the scaled image
+    Out: contiguous copy of the image, as a view of the packed buffer
+    '''
+    def pack(self, image):
+
+        # shape the start of the flat buffer after the image, then copy the image into it
+        packed = self.packed[:image.size].reshape(image.shape)
+        np.copyto(packed, image)
+
+        # return the packed image
+        return packed
+
+    '''
+    A wrapper around the readKey function which additionally checks
+    if the read value is a proper scaling factor
+    '''
+    def _readScale(self, key):
+
+        # retrieve the factor
+        scale = self.readKey(key)
+
+        # check if the factor is a positive integer
+        if type(scale) != int or scale < 1:
+            raise ValueError(f'scaling factor has to be a positive integer; in {self.conf_path}')
+
+        # return the factor
+        return scale
@@ -0,0 +1,102 @@
+import argparse
+
+from data_store import DataStore
+from drop_stats import DropStats
+
+'''
+Script querying the local store of hunts, drops and bounties recorded by Scrapless
+'''
+
+'''
+Function for parsing command line arguments
+'''
+def parse_args():
+
+    parser = argparse.ArgumentParser(description='Query the data recorded by Scrapless')
+
+    # path to the store
+    parser.add_argument('--store', default=DataStore.STR_PATH,
+                        help='path to the database of recorded data')
+
+    # what to report
+    parser.add_argument('report', choices=['drops', 'rates', 'hunts', 'bounties'],
+                        help='drop statistics, drop rates of rarities, number of hunts, or bounty statistics')
+
+    # filters
+    parser.add_argument('--behemoth', default=None, help='only hunts of the behemoth')
+    parser.add_argument('--threat', type=int, default=None, help='only hunts of the threat level')
+    parser.add_argument('--tier', default=None, help='only hunts of the tier')
+    parser.add_argument('--rarity', default=None, help='only drop rates or bounties of the rarity')
+    parser.add_argument('--patch', default=None, help='only data of the game patch')
+    parser.add_argument('--user', default=None, help='only data of the user')
+
+    args = parser.parse_args()
+
+    # drop rates are kept per behemoth, tier, rarity and patch only
+    if args.report == 'rates' and (args.threat is not None or args.user is not None):
+        parser.error('--threat and --user can not be used with the rates report')
+
+    return args
+
+'''
+Main function of the script
+'''
+def main():
+
+    # parse arguments
+    args = parse_args()
+
+    # open the store
+    store = DataStore(args.store)
+
+    # filters of hunts
+    hunt_filters = {'behemoth': args.behemoth, 'threat': args.threat, 'tier': args.tier,
+                    'patch': args.patch, 'user': args.user}
+
+    # report the number of hunts
+    if args.report == 'hunts':
+        print(f'{store.countHunts(**hunt_filters)} hunts')
+
+    # report drop statistics
+    elif args.report == 'drops':
+
+        stats = store.dropStats(**hunt_filters)
+        hunts = store.countHunts(**hunt_filters)
+
+        print(f'{hunts} hunts')
+        print(f'{"drop":40} {"rarity":20} {"hunts":>7} {"rolls":>7} {"count":>7} {"per hunt":>9}')
+
+        for drop in stats:
+            print(f'{drop["name"]:40} {str(drop["rarity"]):20} {drop["hunts_with"]:7} {drop["rolls"]:7} ' +
+                  f'{drop["count"]:7} {drop["rolls"] / hunts:9.3f}')
+
+    # report drop rates of rarities, with their 95% confidence intervals
+    elif args.report == 'rates':
+
+        stats = DropStats()
+        stats.recompute(store)
+
+        print(f'{"behemoth":20} {"tier":12} {"patch":8} {"rarity":20} {"hunts":>7} {"rate":>7} {"95% interval":>16}')
+
+        for rate in stats.rates(behemoth=args.behemoth, tier=args.tier, rarity=args.rarity, patch=args.patch):
+            print(f'{rate["behemoth"]:20} {rate["tier"]:12} {rate["patch"]:8} {rate["rarity"]:20} {rate["hunts"]:7} ' +
+                  f'{rate["rate"]:7.1%} {rate["low"]:7.1%} - {rate["high"]:6.1%}')
+
+    # report bounty statistics
+    else:
+
+        stats = store.bountyStats(rarity=args.rarity, patch=args.patch, user=args.user)
+
+        print(f'{"rarity":20} {"bounties":>9} {"avg value":>10}')
+
+        for bounty in stats:
+            print(f'{str(bounty["rarity"]):20} {bounty["bounties"]:9} {bounty["value"] or 0:10.1f}')
+
+    # close the store
+    store.close()
+
+'''
+Standard stuff, run main function if running the file
+'''
+if __name__ == '__main__':
+    main()
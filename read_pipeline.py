@@ -0,0 +1,151 @@
+import queue
+import threading
+
+'''
+A class describing a single reading job processed in the background
+Carries the captured frame, the context it was captured in, and once processed,
+either the result of the reading or the exception it raised
+'''
+class ReadJob:
+
+    def __init__(self, kind, read, frame, context=None):
+
+        # kind of the job, at most one job of a kind is processed at a time
+        self.kind = kind
+
+        # function reading the frame, called with the frame and the context
+        self.read = read
+
+        # captured frame and the context it was captured in
+        self.frame = frame
+        self.context = context
+
+        # outcome of the job
+        self.result = None
+        self.error = None
+
+'''
+A class processing reading jobs in the background
+Jobs are put on a bounded queue consumed by worker threads, and finished jobs
+are posted back to be collected by the main loop, so that heavy OCR does not
+stall capturing frames and refreshing the overlay
+'''
+class ReadPipeline:
+
+    #
+    # CLASS VARIABLES
+    #
+    # number of worker threads
+    JOB_WORK = 2
+
+    # maximum number of jobs waiting to be processed
+    JOB_SIZE = 4
+
+    def __init__(self):
+
+        # queue of jobs waiting to be processed
+        self.jobs = queue.Queue(maxsize=self.JOB_SIZE)
+
+        # queue of processed jobs waiting to be collected
+        self.done = queue.Queue()
+
+        # kinds of jobs submitted and not collected yet
+        self.pending = set()
+
+        # start the workers
+        self.workers = [threading.Thread(target=self._work, name=f'reader-{i}', daemon=True)
+                        for i in range(self.JOB_WORK)]
+
+        for worker in self.workers:
+            worker.start()
+
+    '''
+    Method for submitting a job, unless a job of the same kind is still pending
+    or the queue is full
+    In: kind of the job, reading function, captured frame, context of the capture
+    Out: boolean value, true if the job was submitted
+    '''
+    def submit(self, kind, read, frame, context=None):
+
+        # skip if a job of this kind is pending
+        if self.isPending(kind):
+            return False
+
+        # attempt to queue the job
+        try:
+            self.jobs.put_nowait(ReadJob(kind, read, frame, context))
+
+        # skip if the queue is full
+        except queue.Full:
+            return False
+
+        # mark the kind as pending
+        self.pending.add(kind)
+
+        return True
+
+    '''
+    Method for checking if a job of a given kind is still pending
+    In: kind of the job
+    Out: boolean value
+    '''
+    def isPending(self, kind):
+        return kind in self.pending
+
+    '''
+    Method for collecting all jobs processed so far, without waiting
+    In: none
+    Out: list of processed jobs
+    '''
+    def collect(self):
+
+        # prepare empty list for jobs
+        jobs = []
+
+        # take every job processed so far
+        while True:
+
+            try:
+                job = self.done.get_nowait()
+
+            except queue.Empty:
+                break
+
+            # the kind is no longer pending
+            self.pending.discard(job.kind)
+            jobs.append(job)
+
+        # return the jobs
+        return jobs
+
+    '''
+    Method for waiting until every submitted job is processed; the jobs are left to be collected
+    In: none
+    Out: none
+    '''
+    def wait(self):
+        self.jobs.join()
+
+    '''
+    Internal method run by the worker threads, processing jobs one by one
+    '''
+    def _work(self):
+
+        # process jobs forever
+        while True:
+
+            # wait for a job
+            job = self.jobs.get()
+
+            # read the frame, keeping the exception if one happens
+            try:
+                job.result = job.read(job.frame, job.context)
+
+            except Exception as e:
+                job.error = e
+
+            # post the job back
+            self.done.put(job)
+
+            # mark the job as processed
+            self.jobs.task_done()
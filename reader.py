@@ -1,12 +1,239 @@
 import os
+import re
 import cv2
-import pytesseract
+import time
+import shlex
+import threading
 import numpy as np
 
-from fuzzywuzzy import fuzz, process
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from slice import Slice
+from ocr_cache import OcrCache
+from ocr_profile import OcrProfile
+from fuzzy_index import FuzzyIndex
+from correction_store import CorrectionStore
+from data_bundle import DataBundle
 from configurable import Configurable
 
+# tesserocr is optional; without it OCR falls back to PyTesseract
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+'''
+Base class for OCR engines used by the readers
+An engine receives a pre-processed numpy image and an OCR config string
+in the same format as the tesseract command line, and returns the read text
+'''
+class OcrEngine(ABC):
+
+    # name of the engine, for logging purposes
+    NAME = 'generic'
+
+    '''
+    Method for reading text off a pre-processed image
+    In: numpy image, tesseract config string
+    Out: read text
+    '''
+    @abstractmethod
+    def readImage(self, image, ocr_config):
+        pass
+
+    '''
+    Method for releasing any resources held by the engine
+    '''
+    def close(self):
+        pass
+
+'''
+Fallback OCR engine which runs the tesseract executable through PyTesseract
+Every call writes a temporary image and spawns a new tesseract process
+PyTesseract is imported on first read, as it is not needed when tesserocr is in use
+'''
+class PyTesseractEngine(OcrEngine):
+
+    NAME = 'pytesseract'
+
+    def __init__(self, tess_path=None):
+
+        # path to tesseract executable, or None to look it up on the system path
+        self.tess_path = tess_path
+
+    '''
+    Method for reading text off a pre-processed image with a fresh tesseract process
+    In: numpy image, tesseract config string
+    Out: read text
+    '''
+    def readImage(self, image, ocr_config):
+
+        # import here, as it is only needed when falling back
+        import pytesseract
+
+        # point pytesseract at tesseract installation
+        if self.tess_path is not None:
+            pytesseract.pytesseract.tesseract_cmd = self.tess_path
+
+        # call PyTesseract reader function and return the found text
+        return pytesseract.image_to_string(image, lang='eng', config=ocr_config)
+
+'''
+Persistent OCR engine bound to the tesseract API through tesserocr
+Keeps one initialised API per distinct OCR config and thread, so the language model
+and config files are loaded only once, and passes numpy buffers to tesseract
+without going through temporary files
+'''
+class TesserocrEngine(OcrEngine):
+
+    NAME = 'tesserocr'
+
+    def __init__(self, tessdata_path, lang='eng'):
+
+        # check if tesserocr is available at all
+        if tesserocr is None:
+            raise ImportError('tesserocr is not installed')
+
+        # without a folder given, use the one tesserocr was built to look in
+        if tessdata_path is None:
+            tessdata_path = tesserocr.get_languages()[0]
+
+        # check if the tessdata folder exists
+        if not os.path.isdir(tessdata_path):
+            raise NotADirectoryError(f'{tessdata_path} is not a directory')
+
+        # store the initialisation parametres
+        self.tessdata_path = tessdata_path
+        self.lang = lang
+
+        # initialised APIs of each thread, keyed by OCR config string
+        # a single API can only process one image at a time
+        self.local = threading.local()
+
+        # every API initialised so far, for closing them
+        self.apis = []
+        self.lock = threading.Lock()
+
+    '''
+    Method for reading text off a pre-processed image with a persistent tesseract API
+    In: numpy image, tesseract config string
+    Out: read text
+    '''
+    def readImage(self, image, ocr_config):
+
+        # determine the buffer layout
+        height, width = image.shape[:2]
+        channels = 1 if image.ndim == 2 else image.shape[2]
+
+        # retrieve the API of this thread for this config
+        api = self._getApi(ocr_config)
+
+        # hand the raw buffer over to tesseract, copied into the buffer of this thread
+        api.SetImageBytes(self._getBuffer(image), width, height, channels, width * channels)
+
+        # read the text, trimmed the same way PyTesseract trims it
+        return api.GetUTF8Text().strip()
+
+    '''
+    Method for ending all the APIs held by the engine
+    '''
+    def close(self):
+
+        with self.lock:
+
+            # end every API and forget it
+            for api in self.apis:
+                api.End()
+
+            self.apis = []
+            self.local = threading.local()
+
+    '''
+    Internal method for copying an image into the byte buffer of the current thread,
+    growing the buffer only when the image does not fit
+    tesseract reads from a bytes-like object, and a buffer reused across reads spares
+    converting every image into a new one
+    In: numpy image
+    Out: bytearray holding the image contiguously at its start
+    '''
+    def _getBuffer(self, image):
+
+        # grow the buffer of the current thread if the image does not fit
+        buffer = self.local.__dict__.get('buffer')
+        if buffer is None or len(buffer) < image.nbytes:
+            buffer = self.local.buffer = bytearray(image.nbytes)
+
+        # copy the image into the start of the buffer
+        np.copyto(np.frombuffer(buffer, dtype=image.dtype, count=image.size).reshape(image.shape), image)
+
+        # return the buffer
+        return buffer
+
+    '''
+    Internal method for retrieving the API of the current thread for a given config,
+    initialising it on first use
+    In: tesseract config string
+    Out: tesserocr API object
+    '''
+    def _getApi(self, ocr_config):
+
+        # APIs of the current thread
+        apis = self.local.__dict__.setdefault('apis', {})
+
+        # initialise the API if this config was not seen yet
+        if ocr_config not in apis:
+
+            # translate the command line config into API parametres
+            psm, variables, configs = self._parseConfig(ocr_config)
+
+            # create the API, loading the language model and config files once
+            apis[ocr_config] = tesserocr.PyTessBaseAPI(path=self.tessdata_path, lang=self.lang, psm=psm,
+                                                        variables=variables, configs=configs)
+
+            # remember the API for closing
+            with self.lock:
+                self.apis.append(apis[ocr_config])
+
+        # return the API
+        return apis[ocr_config]
+
+    '''
+    Internal method for translating a tesseract command line config string
+    into page segmentation mode, variables and config files
+    In: tesseract config string
+    Out: page segmentation mode, variables dict, list of config file paths
+    '''
+    def _parseConfig(self, ocr_config):
+
+        # default values, matching tesseract executable defaults
+        psm = tesserocr.PSM.AUTO
+        variables = {}
+        configs = []
+
+        # split the config into tokens
+        tokens = shlex.split(ocr_config)
+
+        # iterate over the tokens, consuming arguments as needed
+        while len(tokens) > 0:
+
+            token = tokens.pop(0)
+
+            # page segmentation mode
+            if token == '--psm':
+                psm = int(tokens.pop(0))
+
+            # config variable
+            elif token == '-c':
+                key, value = tokens.pop(0).split('=', 1)
+                variables[key] = value
+
+            # anything else is a config file
+            else:
+                configs.append(token)
+
+        # return the parametres
+        return psm, variables, configs
+
 '''
 Generic class capable of reading the screen
 Provides a method for detecting an element in a given image slice
@@ -19,108 +246,326 @@ Inherits after Configurable to grant access to readFile
 '''
 class Reader(Configurable):
 
+    # OCR engine shared by all readers
+    ocr_engine = PyTesseractEngine()
+
+    # reason why the requested OCR engine is not in use, if it is not
+    ocr_issue = None
+
+    # cache of OCR reads shared by all readers
+    ocr_cache = OcrCache()
+
+    # corrections of OCR reads learned by all readers
+    corrections = CorrectionStore()
+
+    # smallest side, in pixels, a target may have at the coarsest pyramid level
+    PYR_SIZE = 8
+
+    # margin, in coarse pixels, of the window searched when refining a pyramid match
+    PYR_MRGN = 2
+
+    # pyramid levels used when matching targets, full resolution if not listed
+    TRGT_LVLS = {}
+
+    # confidence needed to accept a numeric field read without tesseract
+    DIG_CONF = 0.9
+
+    # maximum number of fields read in parallel
+    OCR_WORK = 4
+
+    # pool of threads reading fields, shared by all readers and created on first use
+    ocr_pool = None
+    ocr_pool_lock = threading.Lock()
+
     # constructor existing for the sake of placeholding
     def __init__(self):
         
         self.slices = {}
         self.targets = {}
-        self.behe_vocab = []
+        self.profiles = {}
+        self.behe_index = FuzzyIndex([], 'behemoth_words')
 
     '''
     Generic method for detecting an element on the screen slice
-    Expects an image, target image and expected precision
+    Expects a grayscale image, target image and expected precision
     Returns boolean value indicating if element was detected, and the location
     of maximum detection value
     '''
-    def detectElement(self, image, target, prec=0.8):
+    def detectElement(self, image, target, prec=0.8, levels=0):
 
-        # convert the input image to grayscale for better detection
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
-        
-        # match target template to the image
-        result = cv2.matchTemplate(image, target, cv2.TM_CCOEFF_NORMED)
+        # match coarse-to-fine if pyramid levels were requested
+        if levels > 0:
+            max_val, max_loc = self._matchPyramid(image, target, levels)
 
-        # retrieve the minimum and maximum detection value, and their locations
-        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+        # otherwise match at full resolution
+        else:
+            max_val, max_loc = self._matchTemplate(image, target)
 
         # if the matching reached desired precision at any location, return true
         if max_val < prec:
             return False, max_loc
         return True, max_loc
 
+    '''
+    Internal method matching the target template over the whole image
+    In: grayscale image, target image
+    Out: maximum detection value and its location
+    '''
+    def _matchTemplate(self, image, target):
+
+        # match target template to the image
+        result = cv2.matchTemplate(image, target, cv2.TM_CCOEFF_NORMED)
+
+        # retrieve the minimum and maximum detection value, and their locations
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+
+        # return the maximum
+        return max_val, max_loc
+
+    '''
+    Internal method matching the target template coarse-to-fine
+    Image and target are downsampled by the given number of pyramid levels and matched,
+    then the best candidate is refined at full resolution within a small window around it
+    Falls back to full resolution matching when the downsampled target would be too small
+    In: grayscale image, target image, number of pyramid levels
+    Out: maximum detection value and its location
+    '''
+    def _matchPyramid(self, image, target, levels):
+
+        # reduce levels until the downsampled target keeps enough detail
+        while levels > 0 and min(target.shape[:2]) >> levels < self.PYR_SIZE:
+            levels -= 1
+
+        # fall back to full resolution if no level is left
+        if levels == 0:
+            return self._matchTemplate(image, target)
+
+        # downsample both the image and the target
+        small_image, small_target = image, target
+        for _ in range(levels):
+            small_image = cv2.pyrDown(small_image)
+            small_target = cv2.pyrDown(small_target)
+
+        # fall back to full resolution if the target no longer fits the image
+        if any(t > i for t, i in zip(small_target.shape[:2], small_image.shape[:2])):
+            return self._matchTemplate(image, target)
+
+        # find the best candidate at the coarse level
+        coarse_val, coarse_loc = self._matchTemplate(small_image, small_target)
+
+        # scale the candidate back to full resolution
+        scale = 2 ** levels
+        margin = scale * self.PYR_MRGN
+        x, y = coarse_loc[0] * scale, coarse_loc[1] * scale
+
+        # compute the refinement window, big enough to fit the target around the candidate
+        x0, y0 = max(x - margin, 0), max(y - margin, 0)
+        x1 = min(x + margin + target.shape[1], image.shape[1])
+        y1 = min(y + margin + target.shape[0], image.shape[0])
+
+        # refine the match within the window
+        max_val, max_loc = self._matchTemplate(image[y0:y1, x0:x1], target)
+
+        # return the refined maximum, in coordinates of the whole image
+        return max_val, (x0 + max_loc[0], y0 + max_loc[1])
+
     '''
     Method for wrapping operations necessary to detect an element in a slice
-    In: screenshot of the game lobby
+    In: captured frame of the game screen
     Out: boolean detection value
     '''
-    def detectFromSlice(self, image, slice_name, prec=0.8):
+    def detectFromSlice(self, frame, slice_name, prec=0.8):
 
-        # slice the input image
-        image = self.slices[slice_name].sliceImage(image)
+        # retrieve the grayscale slice of the frame
+        image = frame.gray(self.slices[slice_name])
 
         # call the parent method for detecting element
-        detected, loc = self.detectElement(image, self.targets[slice_name], prec=prec)
+        detected, loc = self.detectElement(image, self.targets[slice_name], prec=prec,
+                                            levels=self.TRGT_LVLS.get(slice_name, 0))
 
         # return the detection value
         return detected
 
     '''
     Generic method for reading text on the screen slice
-    Contains multiple arguments to proper put the image trough extensive pre-processing
-    which includes possible thresholding, inverting the colours, scaling the image, trimming
-    white border around the image and removing pixel-specks that occur on the images
+    The image is put through the pre-processing pipeline of the OCR profile of the field,
+    which may include thresholding, removing pixel-specks, inverting the colours and scaling
+    the image, then the white border around it is trimmed before it is read
+    In: captured frame, slice of the field, OCR profile of the field
+    Out: read text
     '''
-    def readText(self, image, ocr_config, thresh_val, 
-                speck_size = 1, scale_x = 1, scale_y = 1, 
-                border_size = 100, shrink_border = 5, 
-                invert = False, name=False, debug=False):
+    def readText(self, frame, slc, profile):
 
-        # convert the input image to grayscale for better reading
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        # the pre-processed image lives in the buffers of the profile until read
+        with profile.lock:
 
-        # threshold the image to prepare it for OCR reading
-        ret, image = cv2.threshold(image, thresh_val, 255, cv2.THRESH_BINARY)
+            # put the grayscale slice through the pre-processing pipeline
+            image = profile.prepare(frame.gray(slc))
 
-        # filter out unexpected pixel speckles
-        cv2.filterSpeckles(image, 0, speck_size, speck_size)
+            # trim the white border from around the image, to increase OCR quality
+            image = self._trimBorder(image, profile.border_size, profile.shrink_border, profile.name, profile.inverse)
 
-        # invert image colours if necessary
-        if invert:
-            image = cv2.bitwise_not(image)
+            # pack the trimmed view into a contiguous buffer, to be hashed and read without copies
+            image = profile.pack(image)
 
-        # compute the new dimensions for the image to counteract small natural dimensions
-        width = image.shape[1] * scale_x
-        height = image.shape[0] * scale_y
+            if profile.debug:
+                cv2.imwrite('./debug_data/debug_text.png', image)
 
-        # re-scale the image
-        image = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+            # look the image up among recent reads
+            key = self.ocr_cache.makeKey(image, profile.ocr_config, self.ocr_engine.NAME)
+            text = self.ocr_cache.get(key)
 
-        # trim the white border from around the image, to increase OCR quality
-        image = self._trimBorder(image, border_size, shrink_border, name)
+            # call the OCR engine if not read before, and cache the found text
+            if text is None:
+                start = time.perf_counter()
+                text = self.ocr_engine.readImage(image, profile.ocr_config)
+                self.ocr_cache.put(key, text, time.perf_counter() - start)
 
-        if debug:
-            cv2.imwrite('./debug_data/debug_text.png', image)
+        # return the found text
+        return text
 
-        # call PyTesseract reader function and return the found text
-        return pytesseract.image_to_string(image, lang='eng', config=ocr_config)
+    '''
+    Method for reading a short numeric field in a fixed font
+    Glyphs are first recognised against learned templates; tesseract is called only when that
+    is not confident or does not look right, and its read is learned from if the field accepts it
+    Some of the confident reads are checked with tesseract all the same, so that templates
+    learned from repeated misreads are found out and dropped
+    In: captured frame, slice of the field, digit reader of the field, regex of a valid read,
+        OCR profile of the field, function telling if a read value is valid for the field
+    Out: read text
+    '''
+    def readDigits(self, frame, slc, digits, pattern, profile, valid):
+
+        # retrieve the thresholded slice
+        binary = frame.threshold(slc, profile.thresh_val)
+
+        # recognise the glyphs
+        text, confidence = digits.recognise(binary)
+        confident = confidence >= self.DIG_CONF and re.fullmatch(pattern, text) is not None
+
+        # return the text if certain enough, unless due for a check
+        if confident and not digits.isAuditDue():
+            return text
+
+        # otherwise read the field with tesseract
+        read = self.readText(frame, slc, profile)
+
+        # keep the recognised text if the check failed to read the field
+        if not (re.fullmatch(pattern, read) and valid(read)):
+            return text if confident else read
+
+        # learn from the read, dropping templates it disagrees with
+        digits.learn(binary, read, pattern)
+
+        # return the read text
+        return read
+
+    '''
+    Method for reading independent fields of a screen in parallel
+    Every field is read by its own function on the shared pool of threads; as OCR
+    spends most of its time outside of Python, reading takes about as long as the
+    slowest field. Exceptions raised by any of the functions are passed on
+    In: dictionary of field names and argument-less functions reading them
+    Out: dictionary of field names and read values
+    '''
+    def readFields(self, readers):
+
+        # retrieve the pool
+        pool = self._getOcrPool()
+
+        # start reading all the fields
+        futures = {name: pool.submit(read) for name, read in readers.items()}
+
+        # wait for the results and return them
+        return {name: future.result() for name, future in futures.items()}
+
+    '''
+    Class method for selecting the OCR engine shared by all readers
+    The persistent tesserocr engine is used when requested and available,
+    otherwise readers fall back to PyTesseract, with the reason kept in ocr_issue
+    In: path to tesseract executable, None to look it up on the system path; name of the requested engine
+    Out: the engine in use
+    '''
+    @classmethod
+    def setOcrEngine(cls, tess_path, engine_name=TesserocrEngine.NAME):
+
+        # release the engine currently in use
+        cls.ocr_engine.close()
+
+        # no issue with the requested engine so far
+        cls.ocr_issue = None
+
+        # attempt to start the persistent engine if requested
+        if engine_name == TesserocrEngine.NAME:
+
+            try:
+                # language data lives next to the tesseract executable, if its path is given
+                tessdata_path = None if tess_path is None else os.path.join(os.path.dirname(tess_path), 'tessdata')
+
+                # start the engine
+                cls.ocr_engine = TesserocrEngine(tessdata_path)
+
+                # return the engine
+                return cls.ocr_engine
+
+            # fall back if tesserocr can't be used, noting why
+            except (ImportError, OSError, RuntimeError) as e:
+                cls.ocr_issue = f'{engine_name} engine could not be started: {e}'
+
+        # an unknown engine is not used either
+        elif engine_name != PyTesseractEngine.NAME:
+            cls.ocr_issue = f'unknown OCR engine {engine_name}; expected one of {[TesserocrEngine.NAME, PyTesseractEngine.NAME]}'
+
+        # otherwise use PyTesseract, pointed at tesseract installation
+        cls.ocr_engine = PyTesseractEngine(tess_path)
+
+        # return the engine
+        return cls.ocr_engine
+
+    '''
+    Internal class method for retrieving the pool of threads reading fields,
+    creating it on first use
+    In: none
+    Out: thread pool executor
+    '''
+    @classmethod
+    def _getOcrPool(cls):
+
+        with cls.ocr_pool_lock:
+
+            # create the pool if it does not exist yet
+            if cls.ocr_pool is None:
+                cls.ocr_pool = ThreadPoolExecutor(max_workers=cls.OCR_WORK, thread_name_prefix='ocr')
+
+        # return the pool
+        return cls.ocr_pool
 
     '''
     Method for fuzzy matching a string against possible strings
-    In: string, list of allowed strings, score threshold for similarity
+    Matches are remembered as corrections of the string, and reused the next time it is read
+    In: string, fuzzy index of allowed strings, score threshold for similarity
     Out: the best match found, or empty string if not met the threshold
     '''
-    def _fuzzyMatch(self, string, allowed_strings, score_threshold):
+    def _fuzzyMatch(self, string, index, score_threshold):
 
         # check if the string is an exact match; if so, return
-        if string in allowed_strings:
+        if string in index:
             return string
 
+        # check if the string was corrected before
+        corrected = self.corrections.get(index.name, string)
+        if corrected is not None and corrected in index:
+            return corrected
+
         # otherwise perform a fuzzy match
-        else:
-            match = process.extractOne(string, allowed_strings, scorer=fuzz.ratio, score_cutoff=score_threshold)
+        match = index.match(string, score_threshold)
 
-            # return empty string if no matches, or a match if one exists
-            return '' if match is None else match[0]
+        # remember the match as a correction
+        if match != '':
+            self.corrections.put(index.name, string, match)
+
+        # return the match
+        return match
 
     '''
     A method for trimming down behemoth text line down to basic form.
@@ -136,7 +581,7 @@ class Reader(Configurable):
         text_arr = text.split(' ')
 
         # overwrite the array with best matches for every element
-        text_arr = [self._fuzzyMatch(x, self.behe_vocab, 80) for x in text_arr]
+        text_arr = [self._fuzzyMatch(x, self.behe_index, 80) for x in text_arr]
 
         # clean the array of undesired elements and filtered out artifacts of OCR
         text_arr = [x for x in text_arr if not any([x == cond for cond in ['', '(Heroic)', 'Patrol']])]
@@ -172,11 +617,34 @@ class Reader(Configurable):
             slice_path = f'{path}/{slice_name}.json'
 
             # add slice to the dictionary under the appropriate key
-            slice_dict[slice_name] = Slice(slice_path)
+            slice_dict[slice_name] = Slice.fromFile(slice_path)
 
         # return the dictionary of slices
         return slice_dict
 
+    '''
+    Method for loading the OCR profiles of fields, stored in the ocr folder
+    next to the slice files; expects the slices of the fields to be loaded already
+    In: path to the folder with slice files, list of field names
+    Out: dictionary of OCR profiles
+    '''
+    def _setProfiles(self, path, codes):
+
+        # prepare empty dictionary
+        profile_dict = {}
+
+        # iterate over the expected profile files
+        for profile_name in codes:
+
+            # construct a path to profile file
+            profile_path = f'{path}/ocr/{profile_name}.json'
+
+            # add profile, sized after the slice of the field, to the dictionary
+            profile_dict[profile_name] = OcrProfile(profile_path, self.slices[profile_name])
+
+        # return the dictionary of profiles
+        return profile_dict
+
     '''
     Method for reading in screen target images
     Uses the internally stored path to the folder containing JSON files
@@ -193,8 +661,15 @@ class Reader(Configurable):
             # construct a path to target file
             target_path = f'{path}/{target_name}.png'
 
-            # check if file exists
-            if os.path.isfile(target_path):
+            # look the image up in the game data bundle first
+            image = DataBundle.shared().readImage(target_path)
+
+            # add the bundled image to the dictionary
+            if image is not None:
+                target_dict[target_name] = image
+
+            # otherwise check if file exists
+            elif os.path.isfile(target_path):
 
                 # read the image file and add it to the dictionary
                 target_dict[target_name] = cv2.imread(target_path, 0)
@@ -209,51 +684,39 @@ class Reader(Configurable):
     '''
     A function that, given an image and border thickness parametre,
     will remove the pure white space around the processed image, 
-    then return the result.
-    Should the resulting image be trimmed to the point of becoming invalid, 
-    eg. just a singular point, the method will slightly reduce desired border 
-    size and attempt again, until a valid image is created 
+    then return the result as a view of the input image.
+    The bounding box of the content is found once, and the border is clamped to the edges
+    of the image; should a negative border cut the content down to nothing, names are
+    cropped from two sides only with the border reduced by the shrink value, and other
+    images are kept whole
+    In: image, border size, shrink step, whether the image is a name, optional scratch buffer
+        of at least the image size for the inverted image
+    Out: trimmed image
     '''
-    def _trimBorder(self, image, border, shrink = 5, name=False):
-
-        # perform initial trimming
-        trim_image = self._trimWhite(image, border)
+    def _trimBorder(self, image, border, shrink = 5, name=False, scratch=None):
 
-        # progressibely reduce size of white border if it causes invalid image to be created
-        while (trim_image.shape[0] == 0 or trim_image.shape[1] == 0):
-            border -= shrink
-            trim_image = self._trimWhite(image, border, name)
+        # invert the image, into the scratch buffer if given, so that the content is non-zero
+        inverse = cv2.bitwise_not(image, dst=None if scratch is None else scratch[:image.shape[0], :image.shape[1]])
 
-        # if the image is valid, return it
-        return trim_image
+        # get the bounding box of everything that is not pure white
+        minx, miny, width, height = cv2.boundingRect(inverse)
 
-    '''
-    Helper function performing a single step of trimming the white border
-    of an image. Intended not to be used outside of its iterative parent method
-    _trimBorder
-    '''
-    def _trimWhite(self, image, border, name = False):
-
-        # negate the image bit-wise
-        bit = cv2.bitwise_not(image)
+        # return the input image if there is nothing but white
+        if width == 0 or height == 0:
+            return image
 
-        # get the non-zero coordinates
-        nonzero = np.nonzero(bit)
+        # get the far corner of the bounding box
+        maxx = minx + width - 1
+        maxy = miny + height - 1
 
-        # if there are such coordinates, get the min and max points
-        if bit.any():
-            minx = min(nonzero[1])
-            maxx = max(nonzero[1])
+        # trim evenly from all sides, unless the border cuts into the box by half of its shorter side
+        if border > (1 - min(width, height)) // 2:
+            return image[max(miny-border, 0):(maxy+border), max(minx-border, 0):(maxx+border)]
 
-            miny = min(nonzero[0])
-            maxy = max(nonzero[0])
-
-            # crop the image while keeping a slight border around it
-            # crop the names only from two sides
-            if name:
-                image = image[(miny-border):maxy,minx:(maxx+border)].copy()
-            else:
-                image = image[(miny-border):(maxy+border),(minx-border):(maxx+border)].copy()
+        # crop the names only from two sides, with the border reduced once more
+        border -= shrink
+        if name and border >= 2 - min(width, height):
+            return image[(miny-border):maxy, minx:(maxx+border)]
 
-        # return the input image
+        # keep the input image if no crop is valid
         return image
\ No newline at end of file
@@ -1,8 +1,10 @@
-import time
+import os
 import atexit
 import logging
+import argparse
 
 from app import App
+from frame_source import DirectorySource, VideoSource
 
 '''
 Exit handler to clean things up
@@ -12,6 +14,27 @@ def exit_handler():
     # cease all logging to prevent empty files
     logging.shutdown()
 
+'''
+Function for parsing command line arguments
+'''
+def parse_args():
+
+    parser = argparse.ArgumentParser(description='Automated data collection for Dauntless')
+
+    # recorded session to replay instead of capturing the live screen
+    parser.add_argument('--replay', default=None,
+                        help='folder of screenshots or video file to process instead of the live screen')
+
+    # frame skipping for video replays
+    parser.add_argument('--frame-step', type=int, default=1,
+                        help='process every n-th frame of a replayed video')
+
+    # game patch of a replayed session, when processed without the game installed
+    parser.add_argument('--patch', default=None,
+                        help='game patch of the replayed session, instead of reading it from the installed game')
+
+    return parser.parse_args()
+
 '''
 Main function
 '''
@@ -20,28 +43,48 @@ def main():
     # register exit handler
     atexit.register(exit_handler)
 
+    # read command line arguments
+    args = parse_args()
+
+    # pick the source of frames; live screen unless a replay was requested
+    if args.replay is None:
+        source = None
+    elif os.path.isdir(args.replay):
+        source = DirectorySource(args.replay)
+    else:
+        source = VideoSource(args.replay, args.frame_step)
+
     # new instance of the main class
-    scrapless = App()
+    scrapless = App(source, args.patch)
 
-    # run in try just to log 
+    # run in try just to log
     # unexpected exceptions
     try:
 
         # operate in an infinite loop
         while True:
 
-            # capture the screen
-            scrapless.screenCap()
+            # poll the screen as often as the current state needs
+            if scrapless.isDue():
 
-            # run processing functions
-            scrapless.processScreen()
+                # capture the screen
+                scrapless.screenCap()
+
+                # run processing functions
+                scrapless.processScreen()
 
             # refresh the overlay to keep it responsive, if present
-            if scrapless.overlay.enabled:
+            if scrapless.overlay is not None and scrapless.overlay.enabled:
                 scrapless.overlay.refresh()
 
             # throttle the loop for performance
-            time.sleep(scrapless.LOOP_INTER)
+            scrapless.wait(scrapless.LOOP_INTER)
+
+    # end of a replayed session
+    except EOFError:
+
+        # inform the user
+        scrapless.logger.info('Replay finished')
 
     # intercept the exception
     except Exception as e:
@@ -56,4 +99,4 @@ def main():
 Standard stuff, run main function if running the file
 '''
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
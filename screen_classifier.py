@@ -0,0 +1,77 @@
+from reader import Reader
+from slice import Slice
+
+'''
+Specialised class for recognising which screen of the game is displayed
+Owns the slices and target images of every screen the application reacts to,
+and scores them in a single pass, in the order of how likely they are given
+the current state of the application, stopping at the first match
+'''
+class ScreenClassifier(Reader):
+
+    #
+    # CLASS VARIABLES
+    #
+    # recognised screens, with the slice folder, target folder and code of their detection target
+    SCRN_SPEC = {
+        'lobby': ('./data/json/screen/lobby', './data/targets/lobby', 'detect'),
+        'loot': ('./data/json/screen/loot', './data/targets/loot', 'detect'),
+        'trial': ('./data/json/screen/loot', './data/targets/loot', 'trial'),
+        'draft': ('./data/json/screen/bounty', './data/targets/bounty', 'draft'),
+        'menu': ('./data/json/screen/bounty', './data/targets/bounty', 'menu')
+    }
+
+    # precision required to recognise a screen
+    PREC = 0.8
+
+    def __init__(self):
+
+        # call parent class constructor
+        Reader.__init__(self)
+
+        # iterate over recognised screens
+        for screen, (slc_path, trgt_path, code) in self.SCRN_SPEC.items():
+
+            # load the slice of the screen
+            self.slices[screen] = Slice.fromFile(f'{slc_path}/{code}.json')
+
+            # load the target image of the screen
+            self.targets[screen] = self._setTargets(trgt_path, [code])[code]
+
+    '''
+    Method for recognising the screen displayed in a frame
+    Candidates are checked in the given order, so the most likely ones should come first
+    In: captured frame, list of candidate screen names
+    Out: name of the recognised screen, or None if none was recognised
+    '''
+    def classify(self, frame, screens):
+
+        # iterate over candidate screens
+        for screen in screens:
+
+            # return the first screen detected
+            if self.detect(frame, screen):
+                return screen
+
+        # no screen recognised
+        return None
+
+    '''
+    Method for checking if a frame displays a given screen
+    In: captured frame, screen name
+    Out: boolean detection value
+    '''
+    def detect(self, frame, screen):
+
+        # return the detection value
+        return self.detectFromSlice(frame, screen, prec=self.PREC)
+
+    '''
+    Method for listing the slices needed to recognise given screens
+    In: list of screen names
+    Out: list of slices
+    '''
+    def slicesFor(self, screens):
+
+        # return the slices of the screens
+        return [self.slices[screen] for screen in screens]
@@ -0,0 +1,108 @@
+import cv2
+
+import numpy as np
+
+'''
+A class telling when the animation of a screen has played out
+Regions of the screen which are about to be read are compared between consecutive frames
+on downscaled grayscale copies; the screen is settled once they stayed stable for a number
+of frames, or once the timeout passed, so that reads start neither too early nor too late
+Once fired, the detector stays settled until reset on the next first sight of the screen
+'''
+class SettleDetector:
+
+    #
+    # CLASS VARIABLES
+    #
+    # scale of the compared copies of regions
+    CMP_SCALE = 0.25
+
+    # mean absolute difference of grayscale levels below which a region is stable
+    DIFF_THRESH = 2.0
+
+    '''
+    Constructor of the detector
+    In: list of slices of the regions compared, number of stable frames needed,
+        timeout in seconds
+    '''
+    def __init__(self, slices, frames, timeout):
+
+        # compared regions, number of stable frames needed, and the timeout
+        self.slices = slices
+        self.frames = frames
+        self.timeout = timeout
+
+        # copies of the regions in the previous frame
+        self.previous = None
+
+        # number of consecutive stable frames, and the time of the first sight
+        self.stable = 0
+        self.started = None
+
+        # whether the screen settled
+        self.settled = False
+
+    '''
+    Method for starting over, on the first sight of the screen
+    In: current time
+    Out: none
+    '''
+    def reset(self, now):
+
+        # forget the previous frame and the settling so far
+        self.previous = None
+        self.stable = 0
+        self.settled = False
+
+        # start the timeout
+        self.started = now
+
+    '''
+    Method for comparing a frame with the previous one
+    In: captured frame, current time
+    Out: boolean value, true if the screen settled
+    '''
+    def update(self, frame, now):
+
+        # nothing more to compare once settled
+        if self.settled:
+            return True
+
+        # start the timeout if not started yet
+        if self.started is None:
+            self.started = now
+
+        # regions not captured yet, such as on the first sight of the screen, are compared from the next frame
+        if not all(frame.covers(slc) for slc in self.slices):
+            self.settled = now - self.started >= self.timeout
+            return self.settled
+
+        # downscaled copies of the regions
+        current = [cv2.resize(frame.gray(slc), None, fx=self.CMP_SCALE, fy=self.CMP_SCALE, interpolation=cv2.INTER_AREA)
+                   for slc in self.slices]
+
+        # count the frame as stable if no region changed since the previous one
+        if self.previous is not None and all(self._difference(prev, curr) < self.DIFF_THRESH
+                                             for prev, curr in zip(self.previous, current)):
+            self.stable += 1
+
+        # otherwise start counting again
+        else:
+            self.stable = 0
+
+        # remember the regions for the next frame
+        self.previous = current
+
+        # the screen settled once stable for long enough, or once the timeout passed
+        self.settled = self.stable >= self.frames or now - self.started >= self.timeout
+
+        # return the outcome
+        return self.settled
+
+    '''
+    Internal helper computing the mean absolute difference of two images
+    In: two images of the same size
+    Out: mean difference of grayscale levels
+    '''
+    def _difference(self, previous, current):
+        return float(np.mean(cv2.absdiff(previous, current)))
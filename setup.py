@@ -3,6 +3,8 @@ from pathlib import Path
 import shutil
 import json
 
+from data_bundle import DataBundle
+
 
 #
 # set scrapless version
@@ -26,8 +28,13 @@ PyInstaller.__main__.run([
 
 
 #
-# copy data folder
-shutil.copytree(src='./data/', dst='./dist/scrapless/data')
+# copy data folder, leaving out the bundle built for development
+shutil.copytree(src='./data/', dst='./dist/scrapless/data', ignore=shutil.ignore_patterns('bundle.npz*'))
+
+#
+# compile game data into a bundle in the copy only, so that it ships up to date
+# the shipped bundle is used as it is, without checking the data files it was built from
+DataBundle('./dist/scrapless/data/bundle.npz').build(shipped=True)
 
 #
 # blank the user in config file
@@ -1,36 +1,63 @@
 from configurable import Configurable
 
 '''
-A class for defining image slices, which store coordinates 
+A class for defining image slices, which store coordinates
 of opposite corners of a rectangle
-Inherits after Configurable for ease of initialisation
+Slices are immutable, so that they can be shared between readers and worker threads;
+narrower regions are derived from them with sub, which returns a new slice
+Each slice keeps a precomputed numpy index, so that cropping an image returns a view
 '''
-class Slice(Configurable):
+class Slice:
+
+    # slices hold nothing but their coordinates and index
+    __slots__ = ('x0', 'y0', 'x1', 'y1', 'rect', 'index')
 
     '''
     Constructor initalizes the slice with given coordinates
     of the corners that define the span of a rectangular slice
+    In: left, top, right and bottom coordinates
     '''
-    def __init__(self, conf_path):
+    def __init__(self, x0, y0, x1, y1):
+
+        # set variable values, bypassing the immutability guard
+        object.__setattr__(self, 'x0', x0)
+        object.__setattr__(self, 'y0', y0)
 
-        # invoke the parent constructor
-        Configurable.__init__(self, conf_path)
+        object.__setattr__(self, 'x1', x1)
+        object.__setattr__(self, 'y1', y1)
 
-        # set variable values
-        self.x0 = self.readCoord('width_start')
-        self.y0 = self.readCoord('height_start')
+        # coordinates as a tuple, for hashing and comparisons
+        object.__setattr__(self, 'rect', (x0, y0, x1, y1))
 
-        self.x1 = self.readCoord('width_end')
-        self.y1 = self.readCoord('height_end')
+        # numpy index of the slice, rows first
+        object.__setattr__(self, 'index', (slice(y0, y1), slice(x0, x1)))
+
+    '''
+    Class method for reading a slice from its JSON file
+    In: path to the slice file
+    Out: slice
+    '''
+    @classmethod
+    def fromFile(cls, conf_path):
+
+        # read the slice file
+        conf = Configurable(conf_path)
+
+        # return the slice of the read coordinates
+        return cls(cls.readCoord(conf, 'width_start'), cls.readCoord(conf, 'height_start'),
+                   cls.readCoord(conf, 'width_end'), cls.readCoord(conf, 'height_end'))
 
     '''
     A wrapper around the readKey function which additionally checks
     if the read value is a proper coordinate
+    In: read slice file, key of the coordinate
+    Out: coordinate
     '''
-    def readCoord(self, key):
+    @staticmethod
+    def readCoord(conf, key):
 
         # retrieve coordinate
-        coord = self.readKey(key)
+        coord = conf.readKey(key)
 
         # check if the coordinate is an integer
         if type(coord) == int:
@@ -42,16 +69,39 @@ class Slice(Configurable):
                 return coord
 
             # otherwise raise an exception
-            raise ValueError(f'screen corrdinates cannot be negative; in {self.conf_path}')
+            raise ValueError(f'screen corrdinates cannot be negative; in {conf.conf_path}')
 
         # otherwise raise an exception
-        raise TypeError(f'screen coordinate has to be an integer; in {self.conf_path}')
+        raise TypeError(f'screen coordinate has to be an integer; in {conf.conf_path}')
+
+    '''
+    Method for deriving a region within the slice
+    Coordinates are relative to the slice, with None standing for its edge,
+    and are clamped to the slice
+    In: optional left, top, right and bottom coordinates
+    Out: slice of the region
+    '''
+    def sub(self, x0=None, y0=None, x1=None, y1=None):
+
+        # width and height of the slice
+        width = self.x1 - self.x0
+        height = self.y1 - self.y0
+
+        # fill in the edges of the slice, and clamp the coordinates to it
+        x0 = min(max(0 if x0 is None else x0, 0), width)
+        y0 = min(max(0 if y0 is None else y0, 0), height)
+
+        x1 = min(max(width if x1 is None else x1, x0), width)
+        y1 = min(max(height if y1 is None else y1, y0), height)
+
+        # return the region in screen coordinates
+        return Slice(self.x0 + x0, self.y0 + y0, self.x0 + x1, self.y0 + y1)
 
     '''
     A function which, once an image is provided, isolates the slice out of it
     then returns that section of the image
     In: image in an array form
-    Out: a section of input image
+    Out: a view of the section of input image
     '''
     def sliceImage(self, image):
 
@@ -63,7 +113,22 @@ class Slice(Configurable):
                 raise ValueError(f'one of image dimensions is lower than 1')
 
         # slice out the region of the image
-        image_slice = image[self.y0:self.y1, self.x0:self.x1, :]
+        return image[self.index]
+
+    '''
+    Guard against modifying the slice, which is shared
+    '''
+    def __setattr__(self, name, value):
+        raise AttributeError('slices are immutable; use sub to derive a new one')
+
+    '''
+    Slices are equal if they span the same rectangle
+    '''
+    def __eq__(self, other):
+        return isinstance(other, Slice) and self.rect == other.rect
+
+    def __hash__(self):
+        return hash(self.rect)
 
-        # return the slice
-        return image_slice
\ No newline at end of file
+    def __repr__(self):
+        return f'Slice{self.rect}'
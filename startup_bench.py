@@ -0,0 +1,142 @@
+import sys
+import json
+import argparse
+import subprocess
+
+'''
+Script measuring how long Scrapless takes to start
+Imports the application in a fresh interpreter with -X importtime, to report the slowest
+imports, and optionally starts it on a replayed session to time the first processed frame
+'''
+
+# code timing the startup of the application on a replayed session, run in a fresh interpreter
+STARTUP_CODE = '''
+import sys
+import json
+import time
+
+start = time.perf_counter()
+
+from app import App
+from frame_source import DirectorySource, VideoSource
+
+imported = time.perf_counter()
+
+source = DirectorySource(sys.argv[1]) if not sys.argv[1].endswith(('.mp4', '.avi', '.mkv')) else VideoSource(sys.argv[1])
+app = App(source)
+
+started = time.perf_counter()
+
+app.screenCap()
+app.processScreen()
+
+processed = time.perf_counter()
+
+print(json.dumps({'import': imported - start, 'init': started - imported, 'first frame': processed - started,
+                  'total': processed - start}))
+'''
+
+'''
+Function for parsing command line arguments
+'''
+def parse_args():
+
+    parser = argparse.ArgumentParser(description='Startup benchmark of Scrapless')
+
+    # module to import
+    parser.add_argument('--module', default='app',
+                        help='module whose import is measured')
+
+    # number of imports to report
+    parser.add_argument('--top', type=int, default=15,
+                        help='number of slowest imports to report')
+
+    # recorded session to start on
+    parser.add_argument('--replay', default=None,
+                        help='folder of screenshots or video file to time the first processed frame on')
+
+    return parser.parse_args()
+
+'''
+Function importing a module in a fresh interpreter, with import times reported
+In: name of the module
+Out: list of imports as (own time, cumulative time, nesting level, module name), in microseconds
+'''
+def import_times(module):
+
+    # import the module with import times written to stderr
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True)
+
+    # fail if the module could not be imported
+    if result.returncode != 0:
+        raise RuntimeError(f'importing {module} failed:\n{result.stderr[-2000:]}')
+
+    # prepare empty list for imports
+    imports = []
+
+    # parse the report lines, formatted as 'import time: self | cumulative | name'
+    for line in result.stderr.splitlines():
+
+        # skip anything else, including the header
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+
+        own, cumulative, name = line[len('import time:'):].split('|')
+
+        # nesting is marked by indentation of two spaces per level
+        level = (len(name) - len(name.lstrip())) // 2
+
+        imports.append((int(own), int(cumulative), level, name.strip()))
+
+    # return the imports
+    return imports
+
+'''
+Function starting the application on a replayed session in a fresh interpreter
+In: path to the replayed session
+Out: dictionary of stage names and their durations in seconds
+'''
+def startup_times(replay):
+
+    # run the startup code
+    result = subprocess.run([sys.executable, '-c', STARTUP_CODE, replay], capture_output=True, text=True)
+
+    # fail if the application could not start
+    if result.returncode != 0:
+        raise RuntimeError(f'starting the application failed:\n{result.stderr[-2000:]}')
+
+    # the timings are printed last
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+'''
+Main function of the script
+'''
+def main():
+
+    # parse arguments
+    args = parse_args()
+
+    # measure the imports
+    imports = import_times(args.module)
+
+    # the module itself is reported last, with the total time
+    total = imports[-1][1]
+    print(f'import {args.module}: {total / 1000:.1f} ms')
+
+    # report the slowest imports, by cumulative time
+    print('\nslowest imports by cumulative time:')
+    for own, cumulative, level, name in sorted(imports, key=lambda item: -item[1])[1:args.top + 1]:
+        print(f'{cumulative / 1000:9.1f} ms {own / 1000:9.1f} ms self   {"  " * level}{name}')
+
+    # report the time to the first frame if a session was given
+    if args.replay is not None:
+        print(f'\nstartup on {args.replay}:')
+        for stage, seconds in startup_times(args.replay).items():
+            print(f'{seconds * 1000:9.1f} ms   {stage}')
+
+'''
+Standard stuff, run main function if running the file
+'''
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+'''
+A class tracking the state of the application flow
+Every state declares the screens that matter in it, ordered from the most likely one, and
+how often the screen is polled; transitions between states are listed explicitly, so that
+the flow of a hunt and of a bounty draft can be followed in one place:
+idle -> lobby -> hunt -> loot -> submit -> idle, and idle -> draft -> bounty -> submit -> idle
+Any state may fall back to idle, as all data is cleared on errors, or when a draft is left unread
+The machine doubles as the scheduler of polls, telling when the next one is due
+'''
+class StateMachine:
+
+    #
+    # CLASS VARIABLES
+    #
+    # states, with the screens looked for and the poll interval in seconds
+    # 'loot' stands for the end screen of the hunt, which is the trial end screen for trials
+    STATE_SPEC = {
+        'idle': (['lobby', 'draft'], 0.2),
+        'lobby': (['lobby'], 0.2),
+        'hunt': (['loot', 'draft'], 2.0),
+        'loot': (['loot', 'draft'], 0.2),
+        'submit': ([], 0.0),
+        'draft': (['draft', 'menu'], 0.2),
+        'bounty': (['menu'], 0.2)
+    }
+
+    # allowed transitions, besides falling back to idle
+    STATE_NEXT = {
+        'idle': ['lobby', 'draft'],
+        'lobby': ['hunt'],
+        'hunt': ['loot', 'draft'],
+        'loot': ['submit', 'draft'],
+        'submit': [],
+        'draft': ['bounty'],
+        'bounty': ['submit']
+    }
+
+    # initial state
+    INIT_STATE = 'idle'
+
+    def __init__(self):
+
+        # current state
+        self.state = self.INIT_STATE
+
+        # time when the next poll is due
+        self.next_poll = 0
+
+    '''
+    Method for moving to another state; raises an exception if the transition is not allowed
+    The first poll in the new state is due right away
+    In: name of the next state
+    Out: none
+    '''
+    def go(self, state):
+
+        # check if the transition is allowed
+        if state != self.INIT_STATE and state not in self.STATE_NEXT[self.state]:
+            raise ValueError(f'transition from {self.state} to {state} is not allowed')
+
+        # move to the state
+        self.state = state
+
+        # poll right away
+        self.next_poll = 0
+
+    '''
+    Method for falling back to the initial state
+    In: none
+    Out: none
+    '''
+    def reset(self):
+        self.go(self.INIT_STATE)
+
+    '''
+    Method for listing the screens looked for in the current state
+    In: none
+    Out: list of screen names
+    '''
+    def screens(self):
+        return list(self.STATE_SPEC[self.state][0])
+
+    '''
+    Method for retrieving the poll interval of the current state
+    In: none
+    Out: interval in seconds
+    '''
+    def interval(self):
+        return self.STATE_SPEC[self.state][1]
+
+    '''
+    Method for checking if a poll is due
+    In: current time
+    Out: boolean value
+    '''
+    def isDue(self, now):
+        return now >= self.next_poll
+
+    '''
+    Method for scheduling the next poll after one was made
+    In: time of the poll
+    Out: none
+    '''
+    def polled(self, now):
+        self.next_poll = now + self.interval()
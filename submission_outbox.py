@@ -0,0 +1,225 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+
+from uuid import uuid4
+
+'''
+A class keeping submissions in a local outbox until they are sent
+Requests are stored in an SQLite database before anything is sent, and drained by a
+background worker, so that the main loop never waits on the network and nothing is lost
+while offline or when the application is closed; whatever is left is sent on the next start
+Failed requests are retried with exponential backoff, and every request carries its own
+idempotency key, kept across retries, so that servers can tell a retry from a new submission
+Requests rejected by the server are moved to a dead letter table, where they are kept for
+inspection instead of being retried forever; any other failure, such as being offline, is retried
+for as long as it takes
+'''
+class SubmissionOutbox:
+
+    #
+    # CLASS VARIABLES
+    #
+    # path to the outbox database
+    OBX_PATH = './logging/data/outbox.sqlite'
+
+    # delay before the first retry, and the longest delay between retries, in seconds
+    BKOF_BASE = 5
+    BKOF_MAX = 900
+
+    # response codes which are not worth retrying, as the request itself is rejected
+    # timeouts and rate limits are left out, as they go away by themselves
+    FTL_CODE = frozenset(range(400, 500)) - {408, 429}
+
+    '''
+    Constructor opening the outbox and starting the worker draining it
+    In: function sending a single request, called with the request and its idempotency key,
+        path to the outbox database
+    '''
+    def __init__(self, send, path=OBX_PATH):
+
+        # function sending the requests
+        self.send = send
+
+        # path to the database
+        self.path = path
+
+        # connection shared by the main loop and the worker, used by one thread at a time
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.lock = threading.Lock()
+
+        # create the table if not done yet
+        with self.lock, self.conn:
+            self.conn.execute('CREATE TABLE IF NOT EXISTS outbox ('
+                              'key TEXT PRIMARY KEY, form TEXT NOT NULL, request TEXT NOT NULL, '
+                              'attempts INTEGER NOT NULL DEFAULT 0, due REAL NOT NULL, created REAL NOT NULL)')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS dead_letter ('
+                              'key TEXT PRIMARY KEY, form TEXT NOT NULL, request TEXT NOT NULL, '
+                              'attempts INTEGER NOT NULL, created REAL NOT NULL, failed REAL NOT NULL, error TEXT NOT NULL)')
+
+        # condition waking the worker up when requests are added
+        self.wake = threading.Condition()
+
+        # messages about failed requests, waiting to be collected by the main loop
+        self.errors = queue.Queue()
+
+        # start the worker
+        self.worker = threading.Thread(target=self._work, name='outbox', daemon=True)
+        self.worker.start()
+
+    '''
+    Method for adding requests to the outbox; they are stored together, or not at all
+    In: form identifier, list of requests
+    Out: none
+    '''
+    def put(self, form_name, requests):
+
+        # current time
+        now = time.time()
+
+        # store the requests, each with its own idempotency key
+        with self.lock, self.conn:
+            self.conn.executemany('INSERT INTO outbox (key, form, request, due, created) VALUES (?, ?, ?, ?, ?)',
+                                  [(uuid4().hex, form_name, json.dumps(request), now, now) for request in requests])
+
+        # wake the worker up
+        with self.wake:
+            self.wake.notify()
+
+    '''
+    Method for counting the requests not sent yet
+    In: none
+    Out: number of requests
+    '''
+    def pending(self):
+
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM outbox').fetchone()[0]
+
+    '''
+    Method for counting the requests given up on
+    In: none
+    Out: number of requests
+    '''
+    def dead(self):
+
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM dead_letter').fetchone()[0]
+
+    '''
+    Method for collecting messages about failed requests, without waiting
+    In: none
+    Out: list of messages
+    '''
+    def collectErrors(self):
+
+        # prepare empty list for messages
+        errors = []
+
+        # take every message posted so far
+        while True:
+
+            try:
+                errors.append(self.errors.get_nowait())
+
+            except queue.Empty:
+                break
+
+        # return the messages, each once, as many requests tend to fail the same way
+        return list(dict.fromkeys(errors))
+
+    '''
+    Internal method run by the worker thread, sending the requests in order as they become due
+    Unexpected errors, such as of the database, are reported and the worker carries on after a delay
+    '''
+    def _work(self):
+
+        # process requests forever
+        while True:
+
+            try:
+                self._workStep()
+
+            # report the error, and wait before trying again so as not to spin on it
+            except Exception as e:
+                self.errors.put(f'Outbox failed, will retry: {e}')
+                time.sleep(self.BKOF_BASE)
+
+    '''
+    Internal method sending the request due first, or waiting for one to become due
+    In: none
+    Out: none
+    '''
+    def _workStep(self):
+
+        # find the request due first, holding the condition so that no wake up is missed
+        with self.wake:
+
+            with self.lock:
+                row = self.conn.execute('SELECT key, form, request, attempts, due FROM outbox '
+                                        'ORDER BY due, created, rowid LIMIT 1').fetchone()
+
+            # wait for a request to be added, or to become due
+            if row is None or row[4] > time.time():
+                self.wake.wait(None if row is None else row[4] - time.time())
+                return
+
+        key, form_name, request, attempts, due = row
+
+        # send the request, keeping it until it goes through
+        try:
+            self.send(json.loads(request), key)
+
+        except Exception as e:
+
+            # give up on requests rejected by the server
+            attempts += 1
+            if self._isFatal(e):
+                self._bury(key, attempts, e)
+                self.errors.put(f'Submitting {form_name} failed after {attempts} attempts, giving up: {e}')
+                return
+
+            # delay the next attempt, twice as long after every failure
+            delay = min(self.BKOF_BASE * 2 ** (attempts - 1), self.BKOF_MAX)
+
+            with self.lock, self.conn:
+                self.conn.execute('UPDATE outbox SET attempts = ?, due = ? WHERE key = ?',
+                                  (attempts, time.time() + delay, key))
+
+            # report the first failure of the request
+            if attempts == 1:
+                self.errors.put(f'Submitting {form_name} failed, will retry: {e}')
+
+            return
+
+        # drop the request once sent
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM outbox WHERE key = ?', (key,))
+
+    '''
+    Internal method checking if a failed request is not worth retrying
+    In: exception raised by sending the request
+    Out: boolean value, true if the server rejected the request itself
+    '''
+    def _isFatal(self, error):
+
+        # retrieve the response code, if the exception carries the response
+        code = getattr(getattr(error, 'response', None), 'status_code', None)
+
+        # return whether the code rejects the request
+        return code in self.FTL_CODE
+
+    '''
+    Internal method moving a request from the outbox to the dead letter table
+    In: idempotency key of the request, number of attempts, exception raised by the last attempt
+    Out: none
+    '''
+    def _bury(self, key, attempts, error):
+
+        with self.lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO dead_letter (key, form, request, attempts, created, failed, error) '
+                              'SELECT key, form, request, ?, created, ?, ? FROM outbox WHERE key = ?',
+                              (attempts, time.time(), str(error), key))
+            self.conn.execute('DELETE FROM outbox WHERE key = ?', (key,))
@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from unittest import mock
+
+from data_bundle import DataBundle
+
+# root of the repository, holding the data folder
+REPO_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+'''
+Freshness of the game data bundle
+'''
+class DataBundleTest(unittest.TestCase):
+
+    def setUp(self):
+
+        # run in a temporary folder, with a copy of the game data of the repository
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        shutil.copytree(os.path.join(REPO_PATH, 'data', 'json'), os.path.join(self.tmp, 'data', 'json'))
+        shutil.copytree(os.path.join(REPO_PATH, 'data', 'targets'), os.path.join(self.tmp, 'data', 'targets'))
+        os.chdir(self.tmp)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp)
+
+    '''
+    A shipped bundle is used as it is, without reading its sources, even after they were copied
+    '''
+    def test_shipped_bundle_is_authoritative(self):
+
+        # ship the bundle, then touch every source as copying and unzipping does
+        DataBundle().build(shipped=True)
+        self._touchSources()
+
+        # the bundle is loaded without scanning or rebuilding
+        with mock.patch.object(DataBundle, '_scanSources') as scan, mock.patch.object(DataBundle, 'build') as build:
+            DataBundle().load()
+        scan.assert_not_called()
+        build.assert_not_called()
+
+    '''
+    A bundle built at runtime survives new modification times, and is rebuilt on new contents
+    '''
+    def test_runtime_bundle_follows_contents(self):
+
+        # build the bundle, then touch every source
+        DataBundle().build()
+        self._touchSources()
+
+        # the bundle is not rebuilt for modification times alone
+        with mock.patch.object(DataBundle, 'build') as build:
+            DataBundle().load()
+        build.assert_not_called()
+
+        # but is for changed contents
+        with open('./data/json/drops/cells.json', 'w') as save_file:
+            save_file.write('{"Changed": "Uncommon"}')
+
+        bundle = DataBundle()
+        bundle.load()
+        self.assertEqual(bundle.readJson('./data/json/drops/cells.json'), {'Changed': 'Uncommon'})
+
+    '''
+    A bundle of another version is rebuilt, even if shipped
+    '''
+    def test_other_version_is_rebuilt(self):
+
+        # ship a bundle of an older version
+        with mock.patch.object(DataBundle, 'BNDL_VER', DataBundle.BNDL_VER - 1):
+            DataBundle().build(shipped=True)
+
+        # the bundle is rebuilt at runtime
+        bundle = DataBundle()
+        bundle.load()
+        self.assertEqual(bundle.version, DataBundle.BNDL_VER)
+        self.assertFalse(bundle.shipped)
+
+    '''
+    Helper moving the modification times of all sources forward
+    In: none
+    Out: none
+    '''
+    def _touchSources(self):
+        for dir_path, dir_names, file_names in os.walk('./data'):
+            for file_name in file_names:
+                stat = os.stat(os.path.join(dir_path, file_name))
+                os.utime(os.path.join(dir_path, file_name), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from digit_reader import DigitReader
+
+'''
+Helper drawing a line of digits in a slanted font, as a binary image
+Only the glyphs of 1 and 4 are drawn; the 4 is moved left by the kerning, so that its
+crossbar tucks under the slanted 1
+In: text, kerning in pixels
+Out: binary image with bright text on dark background
+'''
+def draw(text, kerning=0):
+
+    # strokes of every glyph, as lines within a 14 by 21 pixel box
+    strokes = {
+        '1': [((7, 1), (3, 20)), ((7, 1), (4, 4))],
+        '4': [((11, 1), (1, 14)), ((1, 14), (13, 14)), ((11, 1), (11, 20))]
+    }
+
+    # blank line
+    image = np.zeros((30, 20 + 18 * len(text)), dtype=np.uint8)
+
+    # draw the glyphs left to right
+    x = 4
+    for char in text:
+        for (x0, y0), (x1, y1) in strokes[char]:
+            cv2.line(image, (x + x0, 4 + y0), (x + x1, 4 + y1), 255, 2)
+        x += 16 - kerning
+
+    # return the line
+    return image
+
+'''
+Recognition of digits, and learning of their templates
+'''
+class DigitReaderTest(unittest.TestCase):
+
+    def setUp(self):
+
+        # run in a temporary folder, where templates are learned into
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp)
+
+    '''
+    Glyphs side by side stay apart, even when their boxes overlap
+    '''
+    def test_tight_kerning(self):
+
+        # the glyphs of the kerned line are separate, with overlapping boxes
+        tight = draw('14', kerning=8)
+        count, labels, stats, centroids = cv2.connectedComponentsWithStats(tight, connectivity=8)
+        self.assertEqual(count - 1, 2)
+        self.assertLess(stats[2, cv2.CC_STAT_LEFT], stats[1, cv2.CC_STAT_LEFT] + stats[1, cv2.CC_STAT_WIDTH])
+
+        # learn the digits from well spaced reads
+        digits = DigitReader('test')
+        for _ in range(DigitReader.LRN_HITS):
+            digits.learn(draw('14'), '14', r'\d+')
+
+        # read the kerned line
+        text, confidence = digits.recognise(tight)
+        self.assertEqual(text, '14')
+        self.assertGreater(confidence, 0.5)
+
+    '''
+    Glyphs stacked one above the other, like the dots of a colon, make a single glyph
+    '''
+    def test_stacked_glyph(self):
+
+        # a colon between two 1s
+        image = draw('11')
+        image = np.hstack([image[:, :20], np.zeros((30, 8), dtype=np.uint8), image[:, 20:]])
+        cv2.rectangle(image, (22, 10), (23, 11), 255, -1)
+        cv2.rectangle(image, (22, 19), (23, 20), 255, -1)
+
+        # three glyphs are found
+        self.assertEqual(len(DigitReader('test')._segment(image)), 3)
+
+    '''
+    Templates learned from a repeated misread are dropped once reads disagree with them, and learned again
+    '''
+    def test_misread_templates_dropped(self):
+
+        # learn the digits from a misread repeated, swapping the characters
+        digits = DigitReader('test')
+        for _ in range(DigitReader.LRN_HITS):
+            digits.learn(draw('14'), '41', r'\d+')
+        self.assertEqual(digits.recognise(draw('14'))[0], '41')
+
+        # reads disagreeing with the templates drop them, and teach the right ones
+        for _ in range(2 * DigitReader.LRN_HITS):
+            digits.learn(draw('14'), '14', r'\d+')
+
+        # the digits are recognised right, and the right templates saved
+        self.assertEqual(digits.recognise(draw('14'))[0], '14')
+        self.assertEqual(DigitReader('test').recognise(draw('41'))[0], '41')
+
+    '''
+    Learned templates are kept with the logs, and loaded by new readers
+    '''
+    def test_templates_saved_outside_data(self):
+
+        # learn the digits
+        digits = DigitReader('test')
+        for _ in range(DigitReader.LRN_HITS):
+            digits.learn(draw('14'), '14', r'\d+')
+
+        # the templates are saved under the logs
+        self.assertEqual(sorted(os.listdir('./logging/data/digits/test')), ['1_0.png', '4_1.png'])
+        self.assertFalse(os.path.exists('./data'))
+
+        # and loaded by a new reader
+        self.assertEqual(DigitReader('test').recognise(draw('41'))[0], '41')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,204 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import cv2
+import numpy as np
+
+from unittest import mock
+
+from app import App
+from frame_source import DirectorySource
+from reader import Reader, OcrEngine
+from slice import Slice
+
+# root of the repository, holding the data folder
+REPO_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+'''
+OCR engine answering with fixed text per OCR config, standing in for tesseract
+Every read takes a while, as it does with tesseract
+'''
+class FakeEngine(OcrEngine):
+
+    NAME = 'fake'
+
+    def readImage(self, image, ocr_config):
+
+        # take as long as a read by tesseract
+        time.sleep(0.2)
+
+        # escalation marker and time of the hunt
+        if 'whitelist=x' in ocr_config:
+            return 'x40'
+        if 'whitelist=0123456789:' in ocr_config:
+            return '12:34'
+
+        # threat level and elite marker
+        if 'whitelist=0' in ocr_config:
+            return '8'
+
+        # deaths
+        if ocr_config == '--psm 13':
+            return 'Died twice'
+
+        # drops, on the base drops slice only
+        if ocr_config == '--psm 11':
+            return 'x3 Gnasher Hide\nx1 +2 Aetherborne Cell' if image.shape[0] > 300 else ''
+
+        # behemoth name
+        return 'Gnasher'
+
+'''
+OCR engine failing on every read with an unexpected exception
+'''
+class BrokenEngine(OcrEngine):
+
+    NAME = 'broken'
+
+    def readImage(self, image, ocr_config):
+        raise RuntimeError('engine crashed')
+
+'''
+OCR engine reading an invalid bounty value, so that the bounty is never read
+'''
+class UnreadableBountyEngine(FakeEngine):
+
+    NAME = 'unreadable bounty'
+
+    def readImage(self, image, ocr_config):
+
+        # bounty value, not of a known rarity
+        if 'whitelist=x0' in ocr_config:
+            return 'x33'
+
+        return super().readImage(image, ocr_config)
+
+'''
+Replays of a recorded folder of screenshots, run away from the game
+'''
+class ReplayTest(unittest.TestCase):
+
+    # screens of the recorded session, None standing for any other screen
+    # the lobby and loot screens are left quickly, before their reads finish
+    SESSION = [None] * 2 + ['lobby/detect'] * 2 + [None] * 3 + ['loot/detect'] * 2 + [None] * 3
+
+    def setUp(self):
+
+        # run in a temporary folder, with the game data of the repository
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.symlink(os.path.join(REPO_PATH, 'data'), os.path.join(self.tmp, 'data'))
+        os.chdir(self.tmp)
+
+        # record the session
+        self.frames = self._record(self.SESSION)
+
+        # keep the OCR engine to restore it
+        self.engine = Reader.ocr_engine
+
+    def tearDown(self):
+        Reader.ocr_engine = self.engine
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp)
+
+    '''
+    Replay runs to the end of the recording without the game, its overlay or tesseract installed,
+    and stores the hunt, as every read finishes before the recording moves on
+    '''
+    def test_replay_directory(self):
+
+        # replay the recording
+        app, logs = self._replay(FakeEngine())
+
+        # the hunt was read and stored
+        self.assertIsNone(app.overlay)
+        self.assertTrue(any('Lobby screen detected' in line for line in logs))
+        self.assertEqual(app.data_store.countHunts(behemoth='Gnasher'), 1)
+
+    '''
+    Unexpected exceptions of reads are logged along with their frame, and the replay goes on
+    '''
+    def test_replay_survives_read_errors(self):
+
+        # replay the recording
+        app, logs = self._replay(BrokenEngine())
+
+        # the errors were logged, and the screens saved
+        self.assertTrue(any('Unexpected error while reading the lobby: engine crashed' in line for line in logs))
+        self.assertGreater(len(os.listdir(App.IMG_PATH)), 0)
+        self.assertEqual(app.data_store.countHunts(), 0)
+
+    '''
+    A draft left before its bounty was read is given up on, and the next lobby is read
+    '''
+    def test_replay_unread_draft(self):
+
+        # a draft with an unreadable bounty, left for other screens, then a lobby
+        session = ['bounty/draft'] * 3 + [None] * App.DRFT_MISS + ['lobby/detect'] * 2 + [None] * 3
+        self.frames = self._record(session, 'draft_frames')
+
+        # replay the recording
+        app, logs = self._replay(UnreadableBountyEngine())
+
+        # the draft was left, and the lobby read
+        self.assertTrue(any('Bounty draft detected' in line for line in logs))
+        self.assertTrue(any('Bounty draft left before the bounty was read' in line for line in logs))
+        self.assertTrue(any('Lobby screen detected' in line for line in logs))
+        self.assertNotEqual(app.state_machine.state, 'draft')
+
+    '''
+    Helper replaying the recording to its end, with requests sent nowhere
+    In: OCR engine to read with
+    Out: the app, list of logged lines
+    '''
+    def _replay(self, engine):
+
+        # requests are sent nowhere
+        with mock.patch.object(App, '_sendRequest'), self.assertLogs('scrapless', level='INFO') as logs:
+
+            # start the app on the recording
+            app = App(DirectorySource(self.frames), patch='1.2.3')
+            Reader.ocr_engine = engine
+
+            # process the recording to its end
+            with self.assertRaises(EOFError):
+                while True:
+                    app.screenCap()
+                    app.processScreen()
+
+        # return the app and the log
+        return app, logs.output
+
+    '''
+    Helper writing a folder of screenshots, with the targets of recognised screens in place
+    In: list of target names, None for a blank screen, name of the folder
+    Out: path to the folder
+    '''
+    def _record(self, session, name='frames'):
+
+        # folder of the recording
+        path = os.path.join(self.tmp, name)
+        os.makedirs(path)
+
+        # iterate over the screens
+        for index, target in enumerate(session):
+
+            # blank screen
+            image = np.full((1080, 1920, 3), 20, dtype=np.uint8)
+
+            # with the target in its slice
+            if target is not None:
+                slc = Slice.fromFile(f'./data/json/screen/{target}.json')
+                image[slc.index] = cv2.imread(f'./data/targets/{target}.png')
+
+            # write the screenshot
+            cv2.imwrite(os.path.join(path, f'{index:04d}.png'), image)
+
+        # return the folder
+        return path
+
+if __name__ == '__main__':
+    unittest.main()
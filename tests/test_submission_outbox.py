@@ -0,0 +1,133 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+
+import requests
+
+from unittest import mock
+
+from submission_outbox import SubmissionOutbox
+
+'''
+Helper building the exception raised for a response code, as the data sender does
+In: response code
+Out: exception
+'''
+def http_error(code):
+    response = requests.Response()
+    response.status_code = code
+    return requests.HTTPError(f'Invalid response code {code}', response=response)
+
+'''
+Connection to the database failing the first time a request is removed
+'''
+class FlakyConnection:
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.failed = False
+
+    def execute(self, sql, *args):
+
+        # fail the first removal
+        if sql.startswith('DELETE') and not self.failed:
+            self.failed = True
+            raise sqlite3.OperationalError('database is locked')
+
+        return self.conn.execute(sql, *args)
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    def __enter__(self):
+        return self.conn.__enter__()
+
+    def __exit__(self, *args):
+        return self.conn.__exit__(*args)
+
+'''
+Retries and dead letters of the outbox of submissions
+'''
+class SubmissionOutboxTest(unittest.TestCase):
+
+    def setUp(self):
+
+        # keep the outbox in a temporary folder
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'outbox.sqlite')
+
+        # requests sent, by idempotency key
+        self.sent = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    '''
+    Requests rejected by the server are given up on at once
+    '''
+    def test_rejected_request_is_dead_lettered(self):
+
+        # a server rejecting every request
+        outbox = SubmissionOutbox(mock.Mock(side_effect=http_error(400)), self.path)
+        outbox.put('bounty', [{'url': 'form'}])
+
+        # the request is moved out of the outbox, and reported
+        self._waitFor(lambda: outbox.dead() == 1)
+        self.assertEqual(outbox.pending(), 0)
+        self.assertIn('giving up', outbox.collectErrors()[0])
+
+    '''
+    Requests failing in ways that may go away are retried until they go through, however long it takes
+    '''
+    def test_failing_request_is_retried_until_sent(self):
+
+        # a server unavailable for a while, then a connection lost, retried without delay
+        send = mock.Mock(side_effect=[http_error(503)] * 5 + [requests.ConnectionError('offline')] * 5 + [None])
+        with mock.patch.object(SubmissionOutbox, 'BKOF_BASE', 0):
+            outbox = SubmissionOutbox(send, self.path)
+            outbox.put('bounty', [{'url': 'form'}])
+
+            # the request goes through in the end
+            self._waitFor(lambda: outbox.pending() == 0)
+
+        self.assertEqual(send.call_count, 11)
+        self.assertEqual(outbox.dead(), 0)
+
+    '''
+    The worker carries on after an error of the database, and reports it
+    '''
+    def test_worker_survives_database_errors(self):
+
+        # a server accepting every request
+        outbox = SubmissionOutbox(lambda request, key: self.sent.append(key), self.path)
+
+        # the database fails once on removing the sent request
+        with mock.patch.object(SubmissionOutbox, 'BKOF_BASE', 0):
+            outbox.conn = FlakyConnection(outbox.conn)
+            outbox.put('bounty', [{'url': 'form'}])
+
+            # the request goes through in the end, and the error was reported
+            self._waitFor(lambda: outbox.pending() == 0)
+
+        self.assertTrue(outbox.worker.is_alive())
+        self.assertIn('database is locked', outbox.collectErrors()[0])
+
+    '''
+    Helper waiting for a condition to hold, failing the test if it does not within a few seconds
+    In: function checking the condition
+    Out: none
+    '''
+    def _waitFor(self, condition):
+
+        # check the condition until time runs out
+        deadline = time.time() + 5
+        while not condition():
+            if time.time() > deadline:
+                self.fail('condition not met in time')
+            time.sleep(0.01)
+
+if __name__ == '__main__':
+    unittest.main()